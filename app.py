@@ -16,39 +16,38 @@ import folium
 from streamlit_folium import st_folium
 
 from sheets_utils import (
-    append_or_update_data,
+    submit_upload_job,
+    get_upload_job,
+    list_upload_jobs,
+    confirm_upload_job,
+    cancel_upload_job,
+    UPLOAD_JOB_FINAL_STATUSES,
+    UPLOAD_JOB_STAGE_LABELS,
     read_master_data,
-    cached_read_master_data,
-    read_log,
+    cached_read_log_page,
     get_filter_options_fast,
     filter_data_efficiently,
     get_data_statistics_fast,
+    get_shared_dashboard_data,
+    filter_aggregate_cube,
+    rollup_dashboard_kpis,
+    rollup_group_counts,
+    rollup_value_counts,
+    rollup_status_aset_counts,
+    build_map_markers,
+    build_map_view,
+    get_filter_positions,
+    build_export_file,
+    EXPORT_FORMATS,
+    DASHBOARD_DERIVED_COLUMNS,
 )
 
-# Cached data loader with TTL so external sheet edits get picked up periodically
-@st.cache_data(ttl=60, show_spinner=False)
-def load_dashboard_data():
-    # Use cached reader to avoid repeated Google Sheets hits on page switches
-    df = cached_read_master_data()
-    # Normalize columns once here
-    df.columns = df.columns.str.strip().str.replace("\u200b", "", regex=False).str.replace("\xa0", "", regex=False).str.upper()
-    filters = get_filter_options_fast(df)
-    return df, filters
-
 st.set_page_config(
     page_title="Dashboard Inspeksi PT. PLN UID Lampung",
     page_icon="⚡",
     layout="wide",
 )
 
-# Simple dataframe signature for change detection (shape + columns + row hash sum)
-def compute_df_signature(df: pd.DataFrame) -> int:
-    try:
-        hashed = pd.util.hash_pandas_object(df.fillna("").astype(str), index=True).sum()
-        return hash((df.shape, tuple(df.columns), int(hashed)))
-    except Exception:
-        return hash((df.shape, tuple(df.columns)))
-
 # Tambahkan CSS untuk styling divider
 st.markdown("""
 <style>
@@ -73,6 +72,91 @@ def image_to_base64(image: Image.Image) -> str:
     image.save(buffered, format="PNG")
     return base64.b64encode(buffered.getvalue()).decode()
 
+def add_temuan_marker(point: dict, target) -> None:
+    # HANYA 2 WARNA: Hijau untuk SELESAI, Merah untuk BELUM SELESAI
+    color = 'green' if point['status_eksekusi'] == 'SELESAI' else 'red'
+    folium.Marker(
+        location=[float(point['lat']), float(point['lon'])],
+        popup=f"""
+        <b>Jenis Temuan:</b> {point['jenis_temuan']}<br>
+        <b>Status:</b> {point['status_eksekusi']}<br>
+        <b>ULP:</b> {point['ulp']}<br>
+        <b>Penyulang:</b> {point['penyulang']}
+        """,
+        tooltip=f"{point['jenis_temuan']} - {point['status_eksekusi']}",  # Sesuai spesifikasi
+        icon=folium.Icon(color=color, icon='info-sign')
+    ).add_to(target)
+
+# Interval polling status job upload (detik)
+UPLOAD_JOB_POLL_SECONDS = 1.0
+
+def render_sync_plan_preview(job: dict) -> None:
+    plan_stats = job["stats"]
+    st.subheader("🔎 Preview Sinkronisasi (belum disimpan)")
+    col_new, col_updated, col_diff, col_skip = st.columns(4)
+    col_new.metric("Baris baru", plan_stats["new_rows"] - plan_stats["duplicate_ids_with_diff_content"])
+    col_updated.metric("Diupdate (kolom kosong)", plan_stats["updated_rows"])
+    col_diff.metric("ID ganda, konten berbeda", plan_stats["duplicate_ids_with_diff_content"])
+    col_skip.metric("Identik (diabaikan)", plan_stats["skipped_duplicates"])
+    plan = job["plan"]
+    if plan is None:
+        return
+    if not plan["new_rows"].empty:
+        with st.expander(f"Baris yang akan ditambahkan ({len(plan['new_rows']):,})"):
+            st.dataframe(plan["new_rows"].head(100), use_container_width=True)
+    if plan["fills"]:
+        with st.expander(f"Sel kosong yang akan diisi ({len(plan['fills']):,})"):
+            fills_df = pd.DataFrame(plan["fills"][:100], columns=["Baris Sheet", "Kolom", "Nilai Baru"])
+            st.dataframe(fills_df, use_container_width=True, hide_index=True)
+
+def render_upload_job_result(job: dict) -> None:
+    success, msg = job["result"] if job["result"] else (False, job["message"])
+    for sheet, error in job["warnings"].items():
+        st.warning(f"Gagal membaca sheet {sheet}: {error}")
+    if job["status"] == "cancelled":
+        st.info(f"Upload {job['file_name']} dibatalkan, tidak ada data yang disimpan.")
+    elif success:
+        # ===== CACHE INVALIDATION =====
+        # Worker sudah menaikkan generation store bersama, sehingga semua sesi memuat data
+        # terbaru pada rerun berikutnya; notifikasi dashboard cukup sekali per job
+        notified_jobs = st.session_state.setdefault("upload_jobs_notified", set())
+        if job["id"] not in notified_jobs:
+            notified_jobs.add(job["id"])
+            if job["stats"] is None or job["stats"]["new_rows"] + job["stats"]["updated_rows"] > 0:
+                st.session_state.data_updated = True
+                st.session_state.last_upload_time = datetime.now()
+        st.success(f" Upload berhasil: {job['file_name']}")
+        if job.get("from_cache"):
+            st.caption("📦 File ini sama dengan upload sebelumnya — parsing dilewati (cache).")
+        st.info(msg)
+        if job["preview"] is not None:
+            st.write(" **Preview data (10 baris pertama):**")
+            st.dataframe(job["preview"], use_container_width=True)
+    else:
+        st.error(f" Upload gagal: {msg}")
+
+@st.fragment(run_every=UPLOAD_JOB_POLL_SECONDS)
+def poll_upload_job(job_id: str) -> None:
+    # Hanya fragment ini yang di-rerun saat polling; halaman lain tetap bisa dibuka
+    job = get_upload_job(job_id)
+    if job is None or job["status"] in UPLOAD_JOB_FINAL_STATUSES:
+        st.rerun()
+    st.progress(job["progress"], text=f"{job['file_name']}: {job['message']} ({job['progress']}%)")
+    if job.get("from_cache"):
+        st.caption("📦 File ini sama dengan upload sebelumnya — parsing dilewati (cache).")
+    if job["status"] == "awaiting_confirmation":
+        render_sync_plan_preview(job)
+        col_confirm, col_cancel = st.columns(2)
+        if col_confirm.button("💾 Simpan ke Database", key=f"confirm_{job_id}", type="primary"):
+            confirm_upload_job(job_id)
+            st.rerun()
+        if col_cancel.button("✖️ Batalkan", key=f"cancel_{job_id}"):
+            cancel_upload_job(job_id)
+            st.rerun()
+    else:
+        st.caption("⏳ Upload berjalan di latar belakang. Anda bisa berpindah ke halaman lain; "
+                   "upload lain akan mengantre.")
+
 try:
     logo_dinantara = Image.open("assets/LOGO DANANTARA.png")
     logo_pln = Image.open("assets/LOGO PLN.png")
@@ -170,85 +254,65 @@ if st.session_state.page == "upload":
         "Pilih file:",
         type=["xlsx", "xls", "xlsm", "csv"]
     )
+    streaming_upload = st.checkbox(
+        "⚡ Mode streaming (hemat memori untuk file besar)",
+        help="File dibaca dan disinkronkan per potongan baris; perubahan tiap potongan langsung "
+             "ditulis ke database tanpa preview"
+    )
 
+    # Upload dijalankan worker latar belakang; ID job disimpan di URL agar progress tetap
+    # bisa dipantau setelah browser di-refresh atau setelah berpindah halaman.
+    # Job hanya diajukan lewat tombol: mengubah checkbox saja tidak pernah memicu penulisan.
     if uploaded_file is not None:
-        progress_bar = st.progress(0, text="Memulai...")
-        all_sheets = {}
-        try:
-            progress_bar.progress(10, text="Validasi file 10%...")
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file, dtype=str, na_filter=False)
-                all_sheets["CSV"] = df
-            else:
-                xls = pd.ExcelFile(uploaded_file)
-                for idx, sheet in enumerate(xls.sheet_names):
-                    try:
-                        progress_bar.progress(10 + int(15 * (idx+1)/len(xls.sheet_names)), text=f"Membaca sheet {sheet}...")
-                        df = pd.read_excel(
-                            xls,
-                            sheet_name=sheet,
-                            header=0,
-                            dtype=str,
-                            na_filter=False
-                        )
-                        df.columns = (
-                            df.columns.str.strip()
-                            .str.replace("\u200b", "", regex=False)
-                            .str.replace("\xa0", "", regex=False)
-                            .str.upper()
-                        )
-                        all_sheets[sheet] = df
-                    except Exception as e:
-                        st.warning(f"Gagal membaca sheet {sheet}: {str(e)}")
-                        continue
-            progress_bar.progress(30, text="Gabung semua sheet 30%...")
-            if not all_sheets:
-                st.error(" Tidak ada sheet yang dapat dibaca!")
-                progress_bar.empty()
-                st.stop()
-            combined_df = pd.concat(all_sheets.values(), ignore_index=True)
-            if "ID SURVEY" not in combined_df.columns:
-                st.error(" Kolom 'ID SURVEY' tidak ditemukan!")
-                progress_bar.empty()
-                st.stop()
-            combined_df = combined_df.fillna("")
-            progress_bar.progress(50, text="Proses data & validasi 50%...")
-            try:
-                success, msg = append_or_update_data(combined_df)
-                progress_bar.progress(70, text="Simpan ke database 70%...")
-                progress_bar.progress(100, text="Selesai 100%!")
-                progress_bar.empty()
-                # ===== CACHE INVALIDATION =====
-                if success:
-                    # Clear manual caches and TTL cache
-                    cache_keys = ['dashboard_data_cache', 'master_data_cache', 'filter_options_cache']
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                    try:
-                        load_dashboard_data.clear()  # invalidate TTL cache immediately after upload
-                        # Also clear low-level cached reader to force fresh fetch
-                        from sheets_utils import cached_read_master_data
-                        cached_read_master_data.clear()
-                    except Exception:
-                        pass
-                    # Reset last known signature to force recompute and recognition
-                    st.session_state.dashboard_data_signature = None
-                    st.session_state.data_updated = True
-                    st.session_state.last_upload_time = datetime.now()
-                    st.success(f" Upload berhasil: {uploaded_file.name}")
-                    st.info(msg)
-                    st.write(" **Preview data (10 baris pertama):**")
-                    st.dataframe(combined_df.head(10), use_container_width=True)
-                else:
-                    st.error(f" Upload gagal: {msg}")
-            except Exception as upload_error:
-                progress_bar.empty()
-                st.error(f" Error saat upload: {str(upload_error)}")
-                st.write(" **Debug info:**", str(upload_error))
-        except Exception as file_error:
-            progress_bar.empty()
-            st.error(f" Gagal memproses file: {str(file_error)}")
+        submitted_jobs = st.session_state.setdefault("upload_job_ids", {})
+        previous_job_id = submitted_jobs.get(uploaded_file.file_id)
+        previous_job = get_upload_job(previous_job_id) if previous_job_id else None
+        job_busy = previous_job is not None and previous_job["status"] in ("queued", "running")
+        if streaming_upload:
+            submit_label = "⚡ Proses & Simpan (streaming)"
+            submit_help = "Data langsung ditulis ke database per potongan baris, tanpa preview"
+        else:
+            submit_label = "🔎 Proses & Tampilkan Preview"
+            submit_help = "Data dibandingkan dulu dengan database; penyimpanan perlu konfirmasi"
+        if st.button(submit_label, type="primary", disabled=job_busy, help=submit_help):
+            # Preview lama untuk file yang sama dibatalkan agar tidak ada dua job menunggu konfirmasi
+            if previous_job is not None and previous_job["status"] == "awaiting_confirmation":
+                cancel_upload_job(previous_job["id"])
+            submitted_jobs[uploaded_file.file_id] = submit_upload_job(
+                uploaded_file.getvalue(), uploaded_file.name, streaming=streaming_upload
+            )
+            st.query_params["upload_job"] = submitted_jobs[uploaded_file.file_id]
+
+    active_job_id = st.query_params.get("upload_job")
+    if active_job_id:
+        active_job = get_upload_job(active_job_id)
+        if active_job is None:
+            st.warning("Job upload tidak ditemukan (server mungkin di-restart). Silakan upload ulang file.")
+            del st.query_params["upload_job"]
+        elif active_job["status"] in UPLOAD_JOB_FINAL_STATUSES:
+            render_upload_job_result(active_job)
+        else:
+            poll_upload_job(active_job_id)
+
+    recent_jobs = list_upload_jobs()
+    if recent_jobs:
+        with st.expander("📋 Antrean upload"):
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "ID": job["id"],
+                        "File": job["file_name"],
+                        "Status": job["status"],
+                        "Tahap": UPLOAD_JOB_STAGE_LABELS.get(job["stage"], "-"),
+                        "Progress": job["progress"],
+                        "Diajukan": datetime.fromtimestamp(job["submitted_at"]).strftime("%H:%M:%S"),
+                    }
+                    for job in recent_jobs
+                ]),
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=100)},
+            )
 
 # Halaman Dashboard
 elif st.session_state.page == "dashboard":
@@ -345,42 +409,34 @@ elif st.session_state.page == "dashboard":
     
     # Auto-refresh info caption removed per request
 
-    # Load data untuk dashboard via TTL cache (hindari spinner jika sudah ada cache)
-    df_dashboard = None
+    # Load data dashboard dari store bersama (satu frame per proses, sesi hanya menyimpan generation)
+    df_dashboard = pd.DataFrame()
     filter_options_dashboard = {}
-    if (
-        st.session_state.get("dashboard_ready")
-        and st.session_state.get("dashboard_data_cache") is not None
-        and not getattr(st.session_state, "force_dashboard_reload", False)
-    ):
-        # Pakai cache session agar pindah halaman instan
-        df_dashboard = st.session_state.dashboard_data_cache
-        filter_options_dashboard = st.session_state.dashboard_filter_cache or {}
-    else:
-        # Hanya tampilkan spinner saat first-load atau forced reload
-        with st.spinner("Memuat data dashboard..."):
-            try:
-                df_dashboard, filter_options_dashboard = load_dashboard_data()
-                st.session_state.dashboard_data_cache = df_dashboard
-                st.session_state.dashboard_filter_cache = filter_options_dashboard
-                st.session_state.dashboard_ready = True
-                st.session_state.force_dashboard_reload = False
-            except Exception as e:
-                st.error(f"❌ Error loading dashboard data: {str(e)}")
-                df_dashboard = pd.DataFrame()
-                filter_options_dashboard = {}
+    filter_index_dashboard = None
+    data_generation = None
+    dashboard_loaded = False
+    try:
+        if st.session_state.get("dashboard_generation") is None:
+            # Hanya tampilkan spinner saat first-load sesi ini
+            with st.spinner("Memuat data dashboard..."):
+                shared_data = get_shared_dashboard_data()
+        else:
+            shared_data = get_shared_dashboard_data()
+        df_dashboard = shared_data["frame"]
+        filter_options_dashboard = shared_data["filters"]
+        filter_index_dashboard = shared_data["filter_index"]
+        data_generation = shared_data["generation"]
+        dashboard_loaded = True
+    except Exception as e:
+        st.error(f"❌ Error loading dashboard data: {str(e)}")
 
-    # Deteksi perubahan data: simpan dan bandingkan signature
-    if 'dashboard_data_signature' not in st.session_state:
-        st.session_state.dashboard_data_signature = None
-    current_sig = compute_df_signature(df_dashboard) if not df_dashboard.empty else None
-    data_changed = (current_sig is not None and current_sig != st.session_state.dashboard_data_signature)
-    if data_changed:
-        st.session_state.dashboard_data_signature = current_sig
-        # Tandai bahwa data baru terdeteksi dari sumber eksternal (bukan upload)
-        st.session_state.external_data_changed = True
-    else:
-        st.session_state.external_data_changed = False
+    # Deteksi perubahan data: bandingkan generation store dengan yang terakhir dilihat sesi ini
+    last_generation = st.session_state.get("dashboard_generation")
+    st.session_state.external_data_changed = (
+        last_generation is not None and data_generation is not None and data_generation != last_generation
+    )
+    if data_generation is not None:
+        st.session_state.dashboard_generation = data_generation
 
     # ===== FILTER DATA DASHBOARD (MENGIKUTI STYLE REKAPITULASI) =====
     if not df_dashboard.empty:
@@ -580,7 +636,8 @@ elif st.session_state.page == "dashboard":
                 st.markdown('<div class="filter-header">📅 PROGRAM HAR</div>', unsafe_allow_html=True)
                 # Ambil data PROGRAM HAR yang valid dari dataset
                 if 'PROGRAM HAR' in df_dashboard.columns:
-                    program_har_options = df_dashboard['PROGRAM HAR'].fillna('').replace('', '(blank)').unique().tolist()
+                    program_har_values = pd.Series(df_dashboard['PROGRAM HAR'].unique(), dtype=object).fillna('')
+                    program_har_options = program_har_values.replace('', '(blank)').unique().tolist()
                     option_order = ['AGRESSI', 'HAR RUTIN / 4DX', 'HAR PDKB', '(blank)']
                     program_har_options = [opt for opt in option_order if opt in program_har_options] + [opt for opt in program_har_options if opt not in option_order]
                     program_har_options = ['Semua'] + program_har_options
@@ -612,22 +669,6 @@ elif st.session_state.page == "dashboard":
                     st.rerun()
                 st.markdown('</div>', unsafe_allow_html=True)
             
-    # ===== SUPER FAST LOADING DENGAN SMART CACHE =====
-    if "dashboard_data_cache" not in st.session_state:
-        st.session_state.dashboard_data_cache = None
-        st.session_state.dashboard_filter_cache = None
-        st.session_state.dashboard_ready = False
-    
-    # Pre-load indicator untuk UX yang lebih baik
-    if not st.session_state.dashboard_ready:
-        # Background loading tanpa UI yang mengganggu
-        pass
-    else:
-        # Data sudah ready - langsung tampilkan
-        pass
-    
-    # (Pengambilan data kedua dihapus agar tidak duplikat)
-    
     # ===== CHECK FOR RECENT DATA UPDATES =====
     if hasattr(st.session_state, 'data_updated') and st.session_state.data_updated:
         if hasattr(st.session_state, 'last_upload_time'):
@@ -642,25 +683,8 @@ elif st.session_state.page == "dashboard":
     if st.session_state.get('external_data_changed'):
         st.info("🔁 Perubahan terbaru pada database terdeteksi. Tampilan sudah memuat data terbaru.")
     
-    # Gunakan cached data untuk INSTANT ACCESS
-    if st.session_state.dashboard_data_cache is not None and st.session_state.dashboard_ready:
-        df_dashboard = st.session_state.dashboard_data_cache
-        filter_options_dashboard = st.session_state.dashboard_filter_cache or {}
-        
-        # DEBUG: Print data info (REMOVED FOR INSTANT LOADING)
-        # Auto-load data if cache is empty or problematic
-        if df_dashboard.empty or 'STATUS EKSEKUSI' not in df_dashboard.columns:
-            try:
-                df_dashboard, filter_options_dashboard = load_dashboard_data()
-                # Update cache
-                st.session_state.dashboard_data_cache = df_dashboard
-                st.session_state.dashboard_filter_cache = filter_options_dashboard
-                st.session_state.dashboard_ready = True
-            except Exception as e:
-                st.error(f"❌ Error loading data: {str(e)}")
-                df_dashboard = pd.DataFrame()
-                filter_options_dashboard = {}
-        
+    # Frame dari store bersama untuk INSTANT ACCESS
+    if dashboard_loaded:
         if not df_dashboard.empty:
             
             # ===== INSTANT FILTERING WITHOUT PROGRESS INDICATORS =====
@@ -683,9 +707,13 @@ elif st.session_state.page == "dashboard":
                 filter_conditions['JENIS TEMUAN'] = st.session_state.dashboard_filter_state['jenis_temuan']
             if st.session_state.dashboard_filter_state['nama_penyulang'] != 'Semua':
                 filter_conditions['NAMA PENYULANG'] = st.session_state.dashboard_filter_state['nama_penyulang']
+            # PROGRAM HAR: '(blank)' dijawab index sebagai baris kosong (NaN atau '')
+            selected_program_har = st.session_state.dashboard_filter_state.get('program_har', 'Semua')
+            if selected_program_har != 'Semua':
+                filter_conditions['PROGRAM HAR'] = selected_program_har
             
-            # Apply filters efficiently
-            df_filtered = filter_data_efficiently(df_dashboard, filter_conditions, limit=None)
+            # Apply filters efficiently: irisan inverted index + satu kali take
+            df_filtered = filter_data_efficiently(df_dashboard, filter_conditions, limit=None, index=filter_index_dashboard)
             
             # Date filtering
             if st.session_state.dashboard_filter_state['tanggal_survey'] is not None and 'TANGGAL_SURVEY_DT' in df_filtered.columns:
@@ -697,56 +725,25 @@ elif st.session_state.page == "dashboard":
                     mask = (df_filtered['TANGGAL_SURVEY_DT'] >= start_datetime) & (df_filtered['TANGGAL_SURVEY_DT'] <= end_datetime)
                     df_filtered = df_filtered[mask]
             
-            # PROGRAM HAR filtering
-            if 'PROGRAM HAR' in df_filtered.columns:
-                selected_program_har = st.session_state.dashboard_filter_state.get('program_har', 'Semua')
-                if selected_program_har == '(blank)':
-                    df_filtered = df_filtered[df_filtered['PROGRAM HAR'].isna() | (df_filtered['PROGRAM HAR'] == '')]
-                elif selected_program_har != 'Semua':
-                    df_filtered = df_filtered[df_filtered['PROGRAM HAR'] == selected_program_har]
-            
-            # Cache filtered result
-            st.session_state.cached_filtered_data = df_filtered
-            st.session_state.filter_cache_time = time.time()
-            
             # ===== INSTANT KPI CALCULATIONS =====
             st.markdown('<div class="main-dashboard">', unsafe_allow_html=True)
             
-            # Pre-filter data untuk performa (hanya kolom yang diperlukan)
-            essential_cols = ['JENIS TEMUAN', 'STATUS EKSEKUSI', 'STATUS ASET']
-            available_cols = [col for col in essential_cols if col in df_filtered.columns]
-            df_metrics = df_filtered[available_cols].copy() if available_cols else df_filtered.copy()
-            
-            # STREAMLINED KPI CALCULATIONS - langsung tanpa debugging
+            # KPI dijawab dari aggregate cube (dibangun sekali per data generation),
+            # bukan dari scan baris df_filtered
+            cube_filtered = filter_aggregate_cube(shared_data["cube"], filter_conditions)
+            dashboard_kpis = rollup_dashboard_kpis(cube_filtered)
             
             # KPI 1: Total Temuan
-            valid_temuan_mask = df_metrics['JENIS TEMUAN'].notna() & (df_metrics['JENIS TEMUAN'].astype(str).str.strip() != '')
-            total_temuan = valid_temuan_mask.sum()
+            total_temuan = dashboard_kpis["total_temuan"]
             
-            # KPI 2 & 3: STATUS EKSEKUSI calculations
-            if 'STATUS EKSEKUSI' in df_metrics.columns:
-                # Normalisasi STATUS EKSEKUSI
-                df_metrics['STATUS_EKSEKUSI_CLEAN'] = df_metrics['STATUS EKSEKUSI'].astype(str).str.strip().str.upper()
-                
-                # Hitung KPI
-                valid_status_mask = df_metrics['STATUS_EKSEKUSI_CLEAN'].isin(['SELESAI', 'BELUM SELESAI'])
-                total_status_valid = valid_status_mask.sum()
-                
-                selesai_count = (df_metrics['STATUS_EKSEKUSI_CLEAN'] == 'SELESAI').sum()
-                pct_temuan_selesai = (selesai_count / total_status_valid * 100) if total_status_valid > 0 else 0
-                
-                temuan_belum_ditindaklanjuti = (df_metrics['STATUS_EKSEKUSI_CLEAN'] == 'BELUM SELESAI').sum()
-            else:
-                pct_temuan_selesai = 0
-                temuan_belum_ditindaklanjuti = 0
-                selesai_count = 0
+            # KPI 2 & 3: STATUS EKSEKUSI (strip + upper: SELESAI / BELUM SELESAI)
+            selesai_count = dashboard_kpis["selesai"]
+            temuan_belum_ditindaklanjuti = dashboard_kpis["belum_selesai"]
+            total_status_valid = dashboard_kpis["status_valid"]
+            pct_temuan_selesai = (selesai_count / total_status_valid * 100) if total_status_valid > 0 else 0
             
             # KPI 4: Total Aset Buruk (menghitung jumlah STATUS ASET == BURUK)
-            if 'STATUS ASET' in df_metrics.columns:
-                status_aset_norm = df_metrics['STATUS ASET'].astype(str).str.strip().str.upper()
-                buruk_count = int((status_aset_norm == 'BURUK').sum())
-            else:
-                buruk_count = 0
+            buruk_count = dashboard_kpis["aset_buruk"]
             
             # Display NEW KPI metrics in modern cards with WHITE background
             col1, col2, col3, col4 = st.columns(4)
@@ -793,20 +790,20 @@ elif st.session_state.page == "dashboard":
             
             # ===== INSTANT CHART VISUALIZATION =====
             
-            # Persiapan data untuk visualisasi (menggunakan df_filtered yang sudah ter-filter)
+            # Persiapan data untuk visualisasi (grafik di-rollup dari cube_filtered)
             if len(df_filtered) > 0:
                 
                 # ===== 1. % TEMUAN SELESAI PER UP3 - COMBINED BAR + LINE CHART =====
-                # Filter data yang valid sekali saja
-                valid_temuan_mask = df_filtered['JENIS TEMUAN'].notna() & (df_filtered['JENIS TEMUAN'] != '')
-                df_valid_temuan = df_filtered[valid_temuan_mask]
+                # Filter sel cube yang valid sekali saja
+                valid_temuan_mask = cube_filtered['JENIS TEMUAN'].notna() & (cube_filtered['JENIS TEMUAN'] != '')
+                cube_valid_temuan = cube_filtered[valid_temuan_mask]
                 
-                # Hitung total temuan per UP3 dengan groupby yang efisien
-                total_temuan_per_up3 = df_valid_temuan.groupby('UP3').size().reset_index(name='Total Temuan')
+                # Hitung total temuan per UP3 dari cube
+                total_temuan_per_up3 = rollup_group_counts(cube_valid_temuan, ['UP3'], 'Total Temuan')
                 
                 # Hitung temuan selesai per UP3 dengan filter boolean
-                selesai_mask = df_valid_temuan['STATUS EKSEKUSI'] == 'SELESAI'
-                temuan_selesai_per_up3 = df_valid_temuan[selesai_mask].groupby('UP3').size().reset_index(name='Jumlah Selesai')
+                selesai_mask = cube_valid_temuan['STATUS EKSEKUSI'] == 'SELESAI'
+                temuan_selesai_per_up3 = rollup_group_counts(cube_valid_temuan[selesai_mask], ['UP3'], 'Jumlah Selesai')
                 
                 # Gabungkan data dan hitung persentase dengan operasi vectorized
                 combined_data = total_temuan_per_up3.merge(temuan_selesai_per_up3, on='UP3', how='left')
@@ -921,8 +918,8 @@ elif st.session_state.page == "dashboard":
                 
                 with col_left:
                     # ===== 2. PROPORSI STATUS EKSEKUSI - DONUT CHART (OPTIMIZED) =====
-                    # Gunakan value_counts yang sudah efisien
-                    status_counts = df_filtered['STATUS EKSEKUSI'].value_counts().reset_index()
+                    # value_counts dijawab dari cube
+                    status_counts = rollup_value_counts(cube_filtered, 'STATUS EKSEKUSI').loc[lambda counts: counts > 0].reset_index()
                     status_counts.columns = ['Status', 'Jumlah']
                     
                     if not status_counts.empty:
@@ -982,13 +979,8 @@ elif st.session_state.page == "dashboard":
                     # Header removed
                     
                     if 'STATUS ASET' in df_filtered.columns:
-                        # Bersihkan dan standardisasi data STATUS ASET
-                        df_filtered['STATUS_ASET_CLEAN'] = df_filtered['STATUS ASET'].astype(str).str.strip().str.upper()
-                        
-                        # Filter hanya data yang valid (BURUK/KURANG)
-                        valid_status_aset = df_filtered[df_filtered['STATUS_ASET_CLEAN'].isin(['BURUK', 'KURANG'])]
-                        aset_counts = valid_status_aset['STATUS_ASET_CLEAN'].value_counts().reset_index()
-                        aset_counts.columns = ['Status Aset', 'Jumlah']
+                        # Jumlah BURUK/KURANG (STATUS ASET sudah di-strip + upper saat cube dibangun)
+                        aset_counts = rollup_status_aset_counts(cube_filtered)
                         
                         if not aset_counts.empty:
                             fig_donut_aset = px.pie(
@@ -1029,11 +1021,11 @@ elif st.session_state.page == "dashboard":
                 
                 # ===== 3. % TEMUAN PER KATEGORI TEMUAN - STACKED BAR CHART (OPTIMIZED) =====
                 
-                temuan_status_data = df_filtered.groupby(['JENIS TEMUAN', 'STATUS EKSEKUSI']).size().reset_index(name='Jumlah')
+                temuan_status_data = rollup_group_counts(cube_filtered, ['JENIS TEMUAN', 'STATUS EKSEKUSI'], 'Jumlah')
                 
                 if not temuan_status_data.empty:
                     # Hitung jumlah temuan per jenis temuan dan status untuk TOP 20
-                    temuan_total = temuan_status_data.groupby('JENIS TEMUAN')['Jumlah'].sum().reset_index()
+                    temuan_total = temuan_status_data.groupby('JENIS TEMUAN', observed=True)['Jumlah'].sum().reset_index()
                     temuan_total = temuan_total.sort_values('Jumlah', ascending=False)
                     top_20_temuan = temuan_total.head(20)['JENIS TEMUAN'].tolist()
                     
@@ -1045,7 +1037,8 @@ elif st.session_state.page == "dashboard":
                         index='JENIS TEMUAN', 
                         columns='STATUS EKSEKUSI', 
                         values='Jumlah', 
-                        aggfunc='sum'
+                        aggfunc='sum',
+                        observed=True
                     ).reset_index().fillna(0)
                     
                     # Pastikan kedua kolom status ada (sesuai data asli - HURUF BESAR)
@@ -1178,7 +1171,7 @@ elif st.session_state.page == "dashboard":
                 # ===== 4. % TEMUAN SELESAI PER ULP - DUAL AXIS CHART (OPTIMIZED) =====
                 
                 # Ambil data sesuai STATUS EKSEKUSI per ULP
-                ulp_status_data = df_filtered.groupby(['ULP', 'STATUS EKSEKUSI']).size().reset_index(name='Jumlah')
+                ulp_status_data = rollup_group_counts(cube_filtered, ['ULP', 'STATUS EKSEKUSI'], 'Jumlah')
                 
                 if not ulp_status_data.empty:
                     # Pivot data untuk memudahkan perhitungan persentase
@@ -1186,7 +1179,8 @@ elif st.session_state.page == "dashboard":
                         index='ULP', 
                         columns='STATUS EKSEKUSI', 
                         values='Jumlah',
-                        fill_value=0
+                        fill_value=0,
+                        observed=True
                     ).reset_index()
                     
                     # Pastikan kolom 'SELESAI' dan 'BELUM SELESAI' ada (HURUF BESAR sesuai data asli)
@@ -1315,9 +1309,6 @@ elif st.session_state.page == "dashboard":
                 
                 # ===== 5. JUMLAH TEMUAN PER PENYULANG - HORIZONTAL BAR CHART (OPTIMIZED) =====
                 
-                # Gunakan semua data dari df_filtered
-                df_penyulang = df_filtered.copy()
-                
                 # Set default top N value tanpa slider
                 top_n = 15
                 
@@ -1326,7 +1317,7 @@ elif st.session_state.page == "dashboard":
                 selected_ulp = 'Semua ULP'
                 
                 # Hitung total temuan per penyulang
-                penyulang_all_counts = df_penyulang['NAMA PENYULANG'].value_counts().reset_index()
+                penyulang_all_counts = rollup_value_counts(cube_filtered, 'NAMA PENYULANG').loc[lambda counts: counts > 0].reset_index()
                 penyulang_all_counts.columns = ['Nama Penyulang', 'Jumlah Temuan']
                 
                 # Hitung total keseluruhan untuk persentase
@@ -1415,21 +1406,16 @@ elif st.session_state.page == "dashboard":
                 # ===== 7. TREN TEMUAN BULANAN - MULTI-LINE CHART (OPTIMIZED) =====
                 
                 if 'TANGGAL SURVEY' in df_filtered.columns:
-                    # Convert tanggal survey ke datetime dengan pemrosesan yang lebih rapi
-                    df_filtered['TANGGAL_SURVEY_DT'] = pd.to_datetime(df_filtered['TANGGAL SURVEY'], errors='coerce')
-                    # Buat kolom BULAN_SURVEY dengan format yang lebih baik untuk plotting
-                    df_filtered['BULAN_SURVEY'] = df_filtered['TANGGAL_SURVEY_DT'].dt.to_period('M').dt.to_timestamp()
-                    
-                    # Filter data yang memiliki tanggal valid
-                    df_trend = df_filtered[df_filtered['TANGGAL_SURVEY_DT'].notna()]
+                    # BULAN_SURVEY sudah menjadi dimensi cube; ambil sel dengan tanggal valid
+                    cube_trend = cube_filtered[cube_filtered['BULAN_SURVEY'].notna()]
                     
-                    if not df_trend.empty:
+                    if not cube_trend.empty:
                         # Kelompokkan data per bulan dan jenis temuan
-                        trend_data = df_trend.groupby(['BULAN_SURVEY', 'JENIS TEMUAN']).size().reset_index(name='Jumlah')
+                        trend_data = rollup_group_counts(cube_trend, ['BULAN_SURVEY', 'JENIS TEMUAN'], 'Jumlah')
                         
                         if not trend_data.empty:
                             # Ambil 15 jenis temuan teratas untuk clarity di grafik
-                            top_jenis_temuan = df_trend['JENIS TEMUAN'].value_counts().nlargest(15).index.tolist()
+                            top_jenis_temuan = rollup_value_counts(cube_trend, 'JENIS TEMUAN').nlargest(15).index.tolist()
                             trend_data_top = trend_data[trend_data['JENIS TEMUAN'].isin(top_jenis_temuan)]
                             
                             # Buat grafik dengan go.Figure untuk kontrol lebih besar
@@ -1498,43 +1484,85 @@ elif st.session_state.page == "dashboard":
                 st.markdown("""
                 <hr style=\"height:3px;border:none;color:#333;background-color:#5e5e5e;margin:10px 0;\"/>
                 """, unsafe_allow_html=True)
+                # Mode Marker: maks 1000 titik pertama; mode Cluster: semua temuan diringkas per sel grid
+                map_mode = st.radio(
+                    "Mode peta",
+                    ["📍 Marker (maks 1000)", "🔷 Cluster (semua temuan)"],
+                    horizontal=True,
+                    key="map_mode",
+                    label_visibility="collapsed"
+                )
                 # Info jumlah lokasi dan footer akan ditampilkan di bawah peta
                 # SESUAI SPESIFIKASI: Hanya gunakan KOORDINAT TEMUAN
-                if 'KOORDINAT TEMUAN' in df_filtered.columns:
+                if 'KOORDINAT TEMUAN' in df_filtered.columns and map_mode == "🔷 Cluster (semua temuan)":
                     try:
-                        # Proses seluruh data untuk info; batasi marker 1000 untuk visualisasi
-                        total_data_count = len(df_filtered)
-                        map_markers = []  # disimpan maks 1000 untuk ditampilkan
-                        valid_coords_count = 0  # hitung total baris dengan koordinat valid
-                        for idx, row in df_filtered.iterrows():
-                            lat, lon = None, None
-                            # HANYA GUNAKAN KOORDINAT TEMUAN sesuai spesifikasi (dengan spasi)
-                            koordinat_value = row.get('KOORDINAT TEMUAN', None)
-                            if pd.notna(koordinat_value) and str(koordinat_value).strip():
-                                coord_str = str(koordinat_value).strip()
-                                if ',' in coord_str:
-                                    parts = coord_str.split(',')
-                                    if len(parts) >= 2:
-                                        try:
-                                            lat = float(parts[0].strip())
-                                            lon = float(parts[1].strip())
-                                        except:
-                                            continue
+                        # Viewport terakhir (bounds + zoom) dari st_folium; kosong saat pertama dibuka
+                        map_viewport = st.session_state.get('peta_temuan_cluster') or {}
+                        filter_positions = get_filter_positions(df_dashboard, filter_conditions, filter_index_dashboard)
+                        map_view = build_map_view(
+                            df_dashboard,
+                            shared_data["map_grid"],
+                            zoom=map_viewport.get('zoom') or 8,
+                            bounds=map_viewport.get('bounds'),
+                            positions=filter_positions
+                        )
+                        if map_view["total_valid"] > 0:
+                            # Peta dasar tetap sama selama filter tidak berubah; hanya layer
+                            # cluster/titik di viewport yang dikirim ulang saat peta digeser/di-zoom
+                            m = folium.Map(location=list(map_view["center"]), zoom_start=8, tiles='OpenStreetMap')
+                            temuan_layer = folium.FeatureGroup(name="Temuan")
+                            if map_view["markers"]:
+                                for point in map_view["markers"]:
+                                    add_temuan_marker(point, temuan_layer)
+                            else:
+                                max_cluster = int(map_view["clusters"]['jumlah'].max())
+                                for cluster in map_view["clusters"].itertuples(index=False):
+                                    pct_selesai = cluster.selesai / cluster.jumlah * 100
+                                    folium.CircleMarker(
+                                        location=[float(cluster.lat), float(cluster.lon)],
+                                        radius=6 + 18 * np.sqrt(cluster.jumlah / max_cluster),
+                                        color='green' if pct_selesai >= 50 else 'red',
+                                        fill=True,
+                                        fill_opacity=0.6,
+                                        tooltip=f"{cluster.jumlah:,} temuan • {pct_selesai:.0f}% selesai"
+                                    ).add_to(temuan_layer)
+                            st.markdown('<div class="fullwidth-map">', unsafe_allow_html=True)
+                            st_folium(
+                                m,
+                                width=None,
+                                height=500,
+                                use_container_width=True,
+                                key="peta_temuan_cluster",
+                                feature_group_to_add=temuan_layer,
+                                returned_objects=["bounds", "zoom"]
+                            )
+                            st.markdown('</div>', unsafe_allow_html=True)
                             
-                            # Validasi koordinat dalam range Indonesia
-                            if lat and lon and -11 <= lat <= 6 and 95 <= lon <= 141:
-                                valid_coords_count += 1
-                                if len(map_markers) < 1000:
-                                    map_markers.append({
-                                        'lat': lat,
-                                        'lon': lon,
-                                        'jenis_temuan': row.get('JENIS TEMUAN', 'Unknown'),
-                                        'status_eksekusi': str(row.get('STATUS EKSEKUSI', 'Unknown')).strip().upper(),  # Normalisasi
-                                        'ulp': row.get('ULP', 'Unknown'),
-                                        'penyulang': row.get('NAMA PENYULANG', 'Unknown')
-                                    })
-                        # Gunakan hingga 1000 lokasi untuk visualisasi
-                        map_data = map_markers
+                            if map_view["markers"]:
+                                view_detail = f"Titik di viewport: {len(map_view['markers']):,}"
+                            else:
+                                view_detail = f"Cluster di viewport: {len(map_view['clusters']):,} (grid zoom {map_view['level']})"
+                            st.info(f"📍 **Peta Lokasi Temuan** | Data: KOORDINAT TEMUAN | "
+                                   f"Semua lokasi valid: {map_view['total_valid']:,} dari {len(df_filtered):,} data | "
+                                   f"Di viewport: {map_view['in_view']:,} | {view_detail}")
+                            st.markdown("""
+                            <hr style=\"height:3px;border:none;color:#333;background-color:#5e5e5e;margin:10px 0 0 0;\"/>
+                            """, unsafe_allow_html=True)
+                            st.caption("© 2025 – Sistem Monitoring Inspeksi • Dibuat untuk Magang MBKM PLN UID Lampung oleh Ganiya Syazwa")
+                        else:
+                            st.warning("📍 Tidak ditemukan KOORDINAT TEMUAN yang valid untuk ditampilkan di peta")
+                            st.caption("© 2025 – Sistem Monitoring Inspeksi • Dibuat untuk Magang MBKM PLN UID Lampung oleh Ganiya Syazwa")
+                    except Exception as e:
+                        st.error(f"❌ Error dalam membuat peta: {str(e)}")
+                        st.caption("© 2025 – Sistem Monitoring Inspeksi • Dibuat untuk Magang MBKM PLN UID Lampung oleh Ganiya Syazwa")
+                elif 'KOORDINAT TEMUAN' in df_filtered.columns:
+                    try:
+                        # Koordinat sudah diparsing & divalidasi sekali per data generation
+                        # (KOORDINAT_LAT/LON/VALID); di sini cukup ambil maks 1000 marker
+                        total_data_count = len(df_filtered)
+                        map_summary = build_map_markers(df_filtered)
+                        valid_coords_count = map_summary["valid_count"]
+                        map_data = map_summary["markers"]
                         if map_data:
                             center_lat = float(np.mean([point['lat'] for point in map_data]))
                             center_lon = float(np.mean([point['lon'] for point in map_data]))
@@ -1544,23 +1572,7 @@ elif st.session_state.page == "dashboard":
                                 tiles='OpenStreetMap'
                             )
                             for point in map_data:
-                                # HANYA 2 WARNA: Hijau untuk SELESAI, Merah untuk BELUM SELESAI
-                                if point['status_eksekusi'] == 'SELESAI':
-                                    color = 'green'  # Hijau untuk SELESAI
-                                else:  # BELUM SELESAI
-                                    color = 'red'    # Merah untuk BELUM SELESAI
-                                
-                                folium.Marker(
-                                    location=[float(point['lat']), float(point['lon'])],
-                                    popup=f"""
-                                    <b>Jenis Temuan:</b> {point['jenis_temuan']}<br>
-                                    <b>Status:</b> {point['status_eksekusi']}<br>
-                                    <b>ULP:</b> {point['ulp']}<br>
-                                    <b>Penyulang:</b> {point['penyulang']}
-                                    """,
-                                    tooltip=f"{point['jenis_temuan']} - {point['status_eksekusi']}",  # Sesuai spesifikasi
-                                    icon=folium.Icon(color=color, icon='info-sign')
-                                ).add_to(m)
+                                add_temuan_marker(point, m)
                             
                             st.markdown("""
                             <style>
@@ -1578,8 +1590,8 @@ elif st.session_state.page == "dashboard":
                             # Garis pembatas, info, dan footer langsung di bawah peta tanpa spasi kosong
                             
                             # Statistik sesuai spesifikasi
-                            selesai_count = sum(1 for point in map_data if point['status_eksekusi'] == 'SELESAI')
-                            belum_selesai_count = sum(1 for point in map_data if point['status_eksekusi'] == 'BELUM SELESAI')
+                            selesai_count = map_summary["selesai"]
+                            belum_selesai_count = map_summary["belum_selesai"]
                             
                             st.info(f"📍 **Peta Lokasi Temuan** | Data: KOORDINAT TEMUAN | "
                                    f"Ditampilkan: {len(map_data)} dari {total_data_count} data | "
@@ -1621,34 +1633,22 @@ elif st.session_state.page == "dashboard":
 elif st.session_state.page == "rekap":
     st.header("📋 Rekapitulasi & Integrasi Data", divider="rainbow")
     
-    # SUPER FAST LOADING - INSTANT ACCESS untuk Rekapitulasi
-    if "master_data_cache" not in st.session_state:
-        st.session_state.master_data_cache = None
-        st.session_state.filter_options_cache = None
-        st.session_state.initial_load_done = False
-    
-    # INSTANT LOADING tanpa progress bar yang lambat
-    if not st.session_state.initial_load_done:
-        try:
-            # Background loading tanpa UI spinner
-            from sheets_utils import cached_read_master_data
-            df_master = cached_read_master_data()
-            filter_options = get_filter_options_fast(df_master)
-            
-            # Cache untuk akses instant
-            st.session_state.master_data_cache = df_master
-            st.session_state.filter_options_cache = filter_options
-            st.session_state.initial_load_done = True
-            
-        except Exception as e:
-            df_master = pd.DataFrame()
-            filter_options = {}
-            st.session_state.initial_load_done = True
+    # INSTANT ACCESS: pakai frame yang sama dengan dashboard dari store bersama
+    try:
+        shared_data = get_shared_dashboard_data()
+        df_master = shared_data["frame"]
+        filter_options = shared_data["filters"]
+        filter_index = shared_data["filter_index"]
+        rekap_loaded = True
+    except Exception as e:
+        df_master = pd.DataFrame()
+        filter_options = {}
+        filter_index = None
+        rekap_loaded = False
     
-    # Gunakan cached data jika tersedia
-    if st.session_state.master_data_cache is not None:
-        df_master = st.session_state.master_data_cache
-        filter_options = st.session_state.filter_options_cache or {}
+    if rekap_loaded:
+        # Kolom turunan dashboard (lat/lon float) tidak ditampilkan maupun diexport
+        rekap_columns = [col for col in df_master.columns if col not in DASHBOARD_DERIVED_COLUMNS]
         
         if not df_master.empty:
             
@@ -1851,16 +1851,23 @@ elif st.session_state.page == "rekap":
                 filter_dict['STATUS EKSEKUSI'] = st.session_state.filter_state['status_eksekusi']
                 active_filters.append(f"Status: {st.session_state.filter_state['status_eksekusi']}")
             
-            # Filter data dengan optimasi untuk tampilan (limit untuk performa)
-            filtered_df_display = filter_data_efficiently(df_master, filter_dict, limit=2000)
+            # Filter data LENGKAP untuk export (tanpa limit), dihitung sekali dari inverted index
+            filtered_df_full = filter_data_efficiently(df_master, filter_dict, limit=None, index=filter_index)
             
-            # Filter data LENGKAP untuk export (tanpa limit)
-            filtered_df_full = filter_data_efficiently(df_master, filter_dict, limit=None)
+            # Tampilan cukup 2000 baris pertama dari hasil yang sama (limit untuk performa)
+            filtered_df_display = filtered_df_full.head(2000)
             
             # Export button dengan data LENGKAP (tidak di-limit)
             with col_action3:
                 if not filtered_df_full.empty:
-                    csv = filtered_df_full.to_csv(index=False)
+                    export_format = st.selectbox(
+                        "Format export",
+                        list(EXPORT_FORMATS.keys()),
+                        format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                        key="rekap_export_format",
+                        label_visibility="collapsed"
+                    )
+                    export_label, export_ext, export_mime = EXPORT_FORMATS[export_format]
                     export_count = len(filtered_df_full)
                     display_count = len(filtered_df_display)
                     
@@ -1870,11 +1877,12 @@ elif st.session_state.page == "rekap":
                     else:
                         help_text = f"Export semua {export_count:,} data hasil filter"
                     
+                    # File baru dibangun saat tombol diklik (callable), ditulis per chunk ke file sementara
                     st.download_button(
                         label=f"📥 Export Data ({export_count:,})",
-                        data=csv,
-                        file_name=f"inspeksi_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
+                        data=lambda: build_export_file(filtered_df_full, export_format, rekap_columns),
+                        file_name=f"inspeksi_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}{export_ext}",
+                        mime=export_mime,
                         help=help_text,
                         use_container_width=True
                     )
@@ -1920,6 +1928,7 @@ elif st.session_state.page == "rekap":
                     filtered_df_display,
                     use_container_width=True,
                     column_config=column_config,
+                    column_order=rekap_columns,
                     hide_index=True,
                     height=500
                 )
@@ -1941,7 +1950,9 @@ elif st.session_state.page == "rekap":
 elif st.session_state.page == "log":
     st.header("📝 Log Aktivitas", divider="rainbow")
     try:
-        log_df = read_log()
+        # Hanya satu halaman (LOG_PAGE_SIZE entri) yang dibaca dari sheet per tampilan
+        log_page = cached_read_log_page(max(int(st.session_state.get("log_page_number", 1)) - 1, 0))
+        log_df = log_page["rows"]
         if not log_df.empty:
             # Konfigurasi kolom untuk tampilan yang lebih baik
             log_column_config = {
@@ -1958,7 +1969,20 @@ elif st.session_state.page == "log":
                 hide_index=True,
                 height=400
             )
-            st.success(f"✅ Total log aktivitas: *{len(log_df)}* entri")
+            if log_page["pages"] > 1:
+                if st.session_state.get("log_page_number", 1) > log_page["pages"]:
+                    st.session_state.log_page_number = log_page["pages"]
+                st.number_input(
+                    f"Halaman (1–{log_page['pages']})",
+                    min_value=1,
+                    max_value=log_page["pages"],
+                    step=1,
+                    key="log_page_number",
+                )
+            st.success(
+                f"✅ Total log aktivitas: *{log_page['total']}* entri "
+                f"(halaman {log_page['page'] + 1} dari {log_page['pages']})"
+            )
         else:
             st.info("📝 Belum ada aktivitas yang tercatat dalam sistem.")
             st.markdown("💡 *Tip*: Log akan otomatis tercatat setiap kali Anda melakukan upload data.")
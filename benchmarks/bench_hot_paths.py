@@ -0,0 +1,217 @@
+"""
+Benchmark hot path sheets_utils dengan data inspeksi sintetis (gspread di-mock).
+
+Case yang diukur per ukuran data:
+- read_master_data          : post-processing hasil get_all_values (worksheet palsu)
+- validate_and_sync_data    : upload 10% ukuran master, campuran 4 case sync
+- normalization_targeted / normalization_comprehensive
+- get_filter_options_fast, build_filter_index
+- filter_scan / filter_indexed : filter_data_efficiently tanpa / dengan inverted index
+- build_dashboard_frame, build_aggregate_cube, dashboard_rollups (filter cube + KPI + grafik)
+- build_map_grid, build_map_view
+
+Hasil (detik terbaik dari --repeat kali) ditulis ke JSON bersama metadata environment,
+sehingga dua run bisa dibandingkan dengan --baseline untuk mendeteksi regresi.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --sizes 10000 100000 --repeat 3
+    python benchmarks/bench_hot_paths.py --sizes 10000 --baseline benchmarks/results/hot_paths-20250101-120000.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import sheets_utils  # noqa: E402
+from synthetic_data import make_inspection_frame, make_upload_frame, to_sheet_values  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Rasio waktu terhadap baseline yang dianggap regresi
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+UPLOAD_RATIO = 0.1
+
+
+def fake_spreadsheet(values: List[List[str]]) -> mock.MagicMock:
+    """Spreadsheet palsu: worksheet(...).get_all_values() mengembalikan `values`."""
+    spreadsheet = mock.MagicMock()
+    spreadsheet.worksheet.return_value.get_all_values.return_value = values
+    return spreadsheet
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Waktu terbaik dari `repeat` kali pemanggilan (output print fungsi dibuang)."""
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pick_filters(df: pd.DataFrame) -> Dict[str, Any]:
+    """Filter dashboard yang realistis: satu UP3, dua ULP di UP3 tersebut, satu status."""
+    up3 = df["UP3"].value_counts().index[0]
+    ulps = df.loc[df["UP3"] == up3, "ULP"].value_counts().index[:2].tolist()
+    status = df["STATUS EKSEKUSI"].value_counts().index[0]
+    return {"UP3": up3, "ULP": ulps, "STATUS EKSEKUSI": [status]}
+
+
+def run_size(n_rows: int, repeat: int, cases: List[str] | None) -> List[Dict[str, Any]]:
+    raw = make_inspection_frame(n_rows)
+    values = to_sheet_values(raw)
+    upload = make_upload_frame(raw, max(1, int(n_rows * UPLOAD_RATIO)))
+    with mock.patch.object(sheets_utils, "get_spreadsheet", return_value=fake_spreadsheet(values)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            master = sheets_utils.read_master_data()
+    del values
+    dashboard = sheets_utils.build_dashboard_frame(master)
+    filters = pick_filters(master)
+    index = sheets_utils.build_filter_index(master)
+    cube = sheets_utils.build_aggregate_cube(dashboard)
+    grid = sheets_utils.build_map_grid(dashboard)
+
+    def read_master():
+        with mock.patch.object(sheets_utils, "get_spreadsheet", return_value=fake_spreadsheet(to_sheet_values(raw))):
+            sheets_utils.read_master_data()
+
+    def sync():
+        try:
+            sheets_utils.validate_and_sync_data(upload, master)
+        finally:
+            sheets_utils.recently_uploaded_ids.clear()
+
+    def rollups():
+        filtered = sheets_utils.filter_aggregate_cube(cube, filters)
+        sheets_utils.rollup_dashboard_kpis(filtered)
+        sheets_utils.rollup_group_counts(filtered, ["UP3"], "Total Temuan")
+        sheets_utils.rollup_group_counts(filtered, ["ULP", "STATUS EKSEKUSI"], "Jumlah")
+        sheets_utils.rollup_value_counts(filtered, "NAMA PENYULANG")
+        sheets_utils.rollup_status_aset_counts(filtered)
+
+    def map_view():
+        positions = sheets_utils.get_filter_positions(dashboard, filters, None)
+        sheets_utils.build_map_view(dashboard, grid, zoom=8, positions=positions)
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        # to_sheet_values ikut terukur agar tiap run memakai list baru (seperti respons API)
+        "read_master_data": read_master,
+        "validate_and_sync_data": sync,
+        "normalization_targeted": lambda: sheets_utils.apply_targeted_normalization(raw.copy()),
+        "normalization_comprehensive": lambda: sheets_utils.apply_comprehensive_normalization(raw.copy()),
+        "get_filter_options_fast": lambda: sheets_utils.get_filter_options_fast(master),
+        "build_filter_index": lambda: sheets_utils.build_filter_index(master),
+        "filter_scan": lambda: sheets_utils.filter_data_efficiently(master, filters, limit=None),
+        "filter_indexed": lambda: sheets_utils.filter_data_efficiently(master, filters, limit=None, index=index),
+        "build_dashboard_frame": lambda: sheets_utils.build_dashboard_frame(master),
+        "build_aggregate_cube": lambda: sheets_utils.build_aggregate_cube(dashboard),
+        "dashboard_rollups": rollups,
+        "build_map_grid": lambda: sheets_utils.build_map_grid(dashboard),
+        "build_map_view": map_view,
+    }
+
+    results = []
+    for case, func in benchmarks.items():
+        if cases and case not in cases:
+            continue
+        seconds = time_call(func, repeat)
+        results.append({
+            "case": case,
+            "rows": n_rows,
+            "seconds": round(seconds, 6),
+            "rows_per_second": round(n_rows / seconds) if seconds > 0 else None,
+        })
+        print(f"{case:<30} {n_rows:>10,} {seconds:>10.4f} {n_rows / max(seconds, 1e-9):>14,.0f}", flush=True)
+    return results
+
+
+def get_git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_metadata(repeat: int) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": get_git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+    }
+
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """Cetak rasio waktu terhadap baseline; return jumlah case yang melewati threshold."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(item["case"], item["rows"]): item["seconds"] for item in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nPerbandingan dengan {baseline_path} (threshold {threshold:.2f}x)")
+    print(f"{'case':<30} {'baris':>10} {'baseline':>10} {'sekarang':>10} {'rasio':>8}")
+    for item in results:
+        before = baseline.get((item["case"], item["rows"]))
+        if not before:
+            continue
+        ratio = item["seconds"] / before
+        flag = "  ⚠ REGRESI" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{item['case']:<30} {item['rows']:>10,} {before:>10.4f} {item['seconds']:>10.4f} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def run(sizes: List[int], repeat: int, output: str | None, cases: List[str] | None,
+        baseline: str | None, threshold: float) -> int:
+    logging.getLogger(sheets_utils.__name__).setLevel(logging.WARNING)
+    print(f"{'case':<30} {'baris':>10} {'detik':>10} {'baris/detik':>14}")
+    results = []
+    for n_rows in sizes:
+        results.extend(run_size(n_rows, repeat, cases))
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"hot_paths-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": get_metadata(repeat), "results": results}, f, indent=2)
+    print(f"\n💾 Hasil disimpan ke {output}")
+
+    if baseline:
+        return compare_with_baseline(results, baseline, threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hot path sheets_utils dengan data sintetis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="Jumlah pengulangan per case (diambil yang tercepat)")
+    parser.add_argument("--cases", nargs="+", help="Hanya jalankan case tertentu")
+    parser.add_argument("--output", help="Path file JSON hasil (default: benchmarks/results/hot_paths-<waktu>.json)")
+    parser.add_argument("--baseline", help="File JSON hasil run sebelumnya untuk perbandingan")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+    # Exit code 1 jika ada regresi, agar bisa dipakai di CI
+    sys.exit(1 if run(args.sizes, args.repeat, args.output, args.cases, args.baseline, args.threshold) else 0)
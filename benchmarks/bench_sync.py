@@ -0,0 +1,50 @@
+"""
+Benchmark sync engine validate_and_sync_data.
+
+Mengukur waktu sinkronisasi untuk beberapa ukuran data (upload : master = 2 : 15,
+seperti upload bulanan 20k baris terhadap MasterData 150k baris) dan menampilkan
+waktu per baris. Jika engine linear, kolom "µs/baris" relatif konstan. Data dibuat
+dengan benchmarks/synthetic_data.py, sama seperti bench_hot_paths.py.
+
+Jalankan dari root proyek:
+    python benchmarks/bench_sync.py
+    python benchmarks/bench_sync.py --sizes 2000 20000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import sheets_utils  # noqa: E402
+from sheets_utils import validate_and_sync_data  # noqa: E402
+from synthetic_data import make_inspection_frame, make_upload_frame  # noqa: E402
+
+
+def run(sizes):
+    logging.getLogger(sheets_utils.__name__).setLevel(logging.WARNING)
+    print(f"{'upload':>10} {'master':>10} {'detik':>10} {'µs/baris':>10}")
+    for upload_rows in sizes:
+        master_rows = upload_rows * 15 // 2
+        master = make_inspection_frame(master_rows)
+        upload = make_upload_frame(master, upload_rows)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            validate_and_sync_data(upload, master)
+        elapsed = time.perf_counter() - start
+        sheets_utils.recently_uploaded_ids.clear()
+        per_row = elapsed / (upload_rows + master_rows) * 1e6
+        print(f"{upload_rows:>10,} {master_rows:>10,} {elapsed:>10.3f} {per_row:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark validate_and_sync_data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000, 20000])
+    args = parser.parse_args()
+    run(args.sizes)
@@ -0,0 +1,180 @@
+"""
+Generator data inspeksi sintetis untuk benchmark.
+
+Baris mengikuti skema VALID_COLUMNS (semua nilai string, seperti hasil baca Google Sheet)
+dengan distribusi yang mendekati data nyata UID Lampung:
+- UP3 berbobot (TANJUNG KARANG terbesar) dan ULP sesuai UP3-nya
+- Penyulang per ULP dengan sebaran Zipf (beberapa penyulang mendominasi temuan)
+- Variasi penulisan status/equipment (SELESAI / Selesai / blm selesai, TRF / Trafo, ...)
+- Tanggal dengan format campuran (ISO, DD/MM/YYYY, DD-MM-YY, ISO datetime, kosong)
+- Koordinat di wilayah Lampung, sebagian kosong/tidak valid
+
+Semua kolom dibangun vektor (numpy/pandas) sehingga 1 juta baris bisa dibuat dalam hitungan detik.
+"""
+import os
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sheets_utils import VALID_COLUMNS  # noqa: E402
+
+UP3_ULP = {
+    "TANJUNG KARANG": ["WAY HALIM", "TELUK BETUNG", "KEDATON", "KARANG", "SUTAMI", "NATAR", "KALIANDA", "SIDOMULYO"],
+    "METRO": ["METRO KOTA", "KOTA GAJAH", "SRIBHAWONO", "SUKADANA", "RUMBIA", "TULANG BAWANG"],
+    "KOTABUMI": ["KOTABUMI KOTA", "BUKIT KEMUNING", "LIWA", "MENGGALA", "BLAMBANGAN UMPU", "DAYA MURNI"],
+    "PRINGSEWU": ["PRINGSEWU KOTA", "TALANG PADANG", "KOTA AGUNG", "GEDONG TATAAN"],
+}
+UP3_WEIGHTS = [0.38, 0.24, 0.22, 0.16]
+FEEDERS_PER_ULP = 18
+FEEDER_NAMES = [
+    "ANGGREK", "MAWAR", "MELATI", "KENANGA", "CEMPAKA", "DAHLIA", "TERATAI", "FLAMBOYAN",
+    "RAJAWALI", "MERPATI", "KUTILANG", "CENDRAWASIH", "BELIBIS", "KASUARI", "NURI", "PELIKAN",
+    "DURIAN", "MANGGA", "RAMBUTAN", "SALAK", "DUKU", "NANGKA", "JAMBU", "SAWO",
+]
+
+EQUIPMENT = ["TRAFO", "TRF", "Trafo Distribusi", "TIANG", "KABEL", "RECLOSER", "ARRESTER", "ISOLATOR", "CO", "LBS"]
+EQUIPMENT_WEIGHTS = [0.14, 0.06, 0.04, 0.22, 0.16, 0.05, 0.09, 0.14, 0.06, 0.04]
+JENIS_TEMUAN = [
+    "ISOLATOR PECAH", "TIANG MIRING", "POHON DEKAT JARINGAN", "ARRESTER RUSAK", "KABEL TERKELUPAS",
+    "KONDUKTOR KENDOR", "CROSS ARM KEROPOS", "LAYANG-LAYANG", "BEKAS SAMBUNGAN PANAS", "TDK ADA TEMUAN",
+]
+STATUS_EKSEKUSI = ["SELESAI", "Selesai", "BELUM SELESAI", "blm selesai", "Proses", "DONE", ""]
+STATUS_EKSEKUSI_WEIGHTS = [0.42, 0.08, 0.3, 0.05, 0.08, 0.03, 0.04]
+STATUS_ASET = ["BAIK", "KURANG", "BURUK", "Rusak", ""]
+STATUS_ASET_WEIGHTS = [0.45, 0.25, 0.2, 0.05, 0.05]
+ROLES = ["INSPEKTOR", "PENGAWAS", "VENDOR"]
+PROGRAM_HAR = ["AGRESSI", "HAR PDKB", "HAR RUTIN", ""]
+INSPECTOR_FIRST = ["BUDI", "ANDI", "SITI", "RINA", "AGUS", "DEWI", "HENDRA", "YUSUF", "RAHMAT", "FITRI"]
+INSPECTOR_LAST = ["SANTOSO", "PRATAMA", "WIJAYA", "SAPUTRA", "LESTARI", "HIDAYAT", "NUGROHO", "PURNAMA"]
+
+# Format tanggal campuran seperti isian lapangan (None = kosong)
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y-%m-%d %H:%M:%S", None]
+DATE_FORMAT_WEIGHTS = [0.45, 0.25, 0.1, 0.05, 0.1, 0.05]
+
+# Bounding box kasar Provinsi Lampung
+LAMPUNG_LAT = (-6.0, -3.7)
+LAMPUNG_LON = (103.5, 106.0)
+
+
+def _pick(rng: np.random.Generator, options: List[str], n_rows: int, weights=None) -> np.ndarray:
+    weights = None if weights is None else np.asarray(weights) / np.sum(weights)
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=n_rows, p=weights)]
+
+
+def _format_dates(rng: np.random.Generator, days: np.ndarray) -> np.ndarray:
+    """Tanggal (hari sejak 2024-01-01) -> string dengan format campuran per baris."""
+    stamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D")
+    stamps = stamps + pd.to_timedelta(rng.integers(7 * 3600, 17 * 3600, size=len(days)), unit="s")
+    formats = rng.choice(len(DATE_FORMATS), size=len(days), p=DATE_FORMAT_WEIGHTS)
+    result = np.full(len(days), "", dtype=object)
+    for idx, fmt in enumerate(DATE_FORMATS):
+        mask = formats == idx
+        if fmt is not None and mask.any():
+            result[mask] = stamps[mask].strftime(fmt).to_numpy(dtype=object)
+    return result
+
+
+def _format_coordinates(rng: np.random.Generator, n_rows: int) -> tuple:
+    lat = rng.uniform(*LAMPUNG_LAT, size=n_rows)
+    lon = rng.uniform(*LAMPUNG_LON, size=n_rows)
+    lat_text = pd.Series(lat).map("{:.6f}".format).to_numpy(dtype=object)
+    lon_text = pd.Series(lon).map("{:.6f}".format).to_numpy(dtype=object)
+    combined = (pd.Series(lat_text) + ", " + pd.Series(lon_text)).to_numpy(dtype=object)
+    # 10% kosong, 3% tidak valid
+    kind = rng.random(n_rows)
+    combined[kind < 0.10] = ""
+    invalid = (kind >= 0.10) & (kind < 0.13)
+    combined[invalid] = _pick(rng, ["0,0", "-", "belum ada", "-5.1"], int(invalid.sum()))
+    return lat_text, lon_text, combined
+
+
+def make_inspection_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """DataFrame MasterData sintetis (kolom VALID_COLUMNS, semua string, NO = 1..n)."""
+    rng = np.random.default_rng(seed)
+    up3_names = list(UP3_ULP)
+    up3_idx = rng.choice(len(up3_names), size=n_rows, p=UP3_WEIGHTS)
+    up3 = np.asarray(up3_names, dtype=object)[up3_idx]
+
+    # ULP sesuai UP3, penyulang Zipf per ULP
+    ulp = np.empty(n_rows, dtype=object)
+    for idx, name in enumerate(up3_names):
+        mask = up3_idx == idx
+        ulp[mask] = _pick(rng, UP3_ULP[name], int(mask.sum()))
+    feeder_rank = np.minimum(rng.zipf(1.6, size=n_rows), FEEDERS_PER_ULP) - 1
+    all_ulp = [name for names in UP3_ULP.values() for name in names]
+    ulp_code = pd.Categorical(ulp, categories=all_ulp).codes.astype(np.int64)
+    feeder_name = pd.Series(np.asarray(FEEDER_NAMES, dtype=object)[(ulp_code * 5 + feeder_rank) % len(FEEDER_NAMES)])
+    penyulang = (feeder_name + " " + (feeder_rank + 1).astype(str)).to_numpy(dtype=object)
+
+    survey_days = rng.integers(0, 730, size=n_rows)
+    wo_days = survey_days + rng.integers(0, 30, size=n_rows)
+    har_days = wo_days + rng.integers(0, 60, size=n_rows)
+    lat_text, lon_text, coordinates = _format_coordinates(rng, n_rows)
+
+    ids = pd.Series(np.arange(n_rows)).map("SRV{:08d}".format).to_numpy(dtype=object)
+    inspector = (
+        pd.Series(_pick(rng, INSPECTOR_FIRST, n_rows)) + " " + pd.Series(_pick(rng, INSPECTOR_LAST, n_rows))
+    ).to_numpy(dtype=object)
+    status = _pick(rng, STATUS_EKSEKUSI, n_rows, STATUS_EKSEKUSI_WEIGHTS)
+    har_dates = _format_dates(rng, har_days)
+    har_dates[rng.random(n_rows) < 0.35] = ""
+
+    data = {col: np.full(n_rows, "", dtype=object) for col in VALID_COLUMNS}
+    data.update({
+        "NO": np.arange(1, n_rows + 1).astype(str).astype(object),
+        "ID SURVEY": ids,
+        "ROLE": _pick(rng, ROLES, n_rows, [0.7, 0.2, 0.1]),
+        "NAMA INSPEKTOR": inspector,
+        "UP3": up3,
+        "ID ULP": pd.Series(18100 + ulp_code).astype(str).to_numpy(dtype=object),
+        "ULP": ulp,
+        "NAMA PENYULANG": penyulang,
+        "ID ASET": pd.Series(rng.integers(0, n_rows * 2, size=n_rows)).map("AST{:09d}".format).to_numpy(dtype=object),
+        "NAMA ASET": _pick(rng, EQUIPMENT, n_rows, EQUIPMENT_WEIGHTS),
+        "JENIS INSPEKSI": _pick(rng, ["VISUAL", "THERMOVISI", "PATROLI"], n_rows),
+        "EQUIPMENT": _pick(rng, EQUIPMENT, n_rows, EQUIPMENT_WEIGHTS),
+        "JENIS TEMUAN": _pick(rng, JENIS_TEMUAN, n_rows),
+        "KETERANGAN": _pick(rng, ["", "PERLU PENGGANTIAN", "SEGERA DITINDAKLANJUTI", "dekat pemukiman"], n_rows),
+        "PENUNJUK LOC": _pick(rng, ["Jl. Soekarno Hatta", "JL Ahmad Yani", "Dusun Sukamaju", "Desa Way Kandis", ""], n_rows),
+        "STATUS ASET": _pick(rng, STATUS_ASET, n_rows, STATUS_ASET_WEIGHTS),
+        "TANGGAL SURVEY": _format_dates(rng, survey_days),
+        "TANGGAL WO": _format_dates(rng, wo_days),
+        "KOORDINAT X": lat_text,
+        "KOORDINAT Y": lon_text,
+        "TANGGAL HAR": har_dates,
+        "TINDAKAN": _pick(rng, ["", "PENGGANTIAN", "PERBAIKAN", "PEMANGKASAN"], n_rows),
+        "PROGRAM HAR": _pick(rng, PROGRAM_HAR, n_rows),
+        "STATUS EKSEKUSI": status,
+        "KOORDINAT TEMUAN": coordinates,
+    })
+    return pd.DataFrame(data, columns=VALID_COLUMNS)
+
+
+def make_upload_frame(master: pd.DataFrame, n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """
+    Upload sintetis dari data master dengan campuran 4 case sync: 40% baru, 20% isi kolom
+    kosong (TANGGAL HAR), 20% konten berbeda (STATUS EKSEKUSI), 20% duplikasi absolut.
+    """
+    rng = np.random.default_rng(seed)
+    upload = master.drop(columns=["NO"], errors="ignore").iloc[
+        rng.integers(0, len(master), size=n_rows)
+    ].reset_index(drop=True)
+    pick = rng.random(n_rows)
+    new_rows = pick < 0.4
+    upload.loc[new_rows, "ID SURVEY"] = pd.Series(np.flatnonzero(new_rows)).map("NEW{:08d}".format).to_numpy()
+    fill_rows = (pick >= 0.4) & (pick < 0.6) & (upload["TANGGAL HAR"] == "").to_numpy()
+    upload.loc[fill_rows, "TANGGAL HAR"] = "2025-12-31"
+    diff_rows = (pick >= 0.6) & (pick < 0.8)
+    upload.loc[diff_rows, "STATUS EKSEKUSI"] = np.where(
+        upload.loc[diff_rows, "STATUS EKSEKUSI"] == "SELESAI", "BELUM SELESAI", "SELESAI"
+    )
+    return upload
+
+
+def to_sheet_values(df: pd.DataFrame) -> List[List[str]]:
+    """DataFrame -> list baris seperti worksheet.get_all_values() (header di baris pertama)."""
+    return [list(df.columns)] + df.astype(str).to_numpy(dtype=object).tolist()
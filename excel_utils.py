@@ -0,0 +1,409 @@
+"""
+Pembacaan file upload: Excel multi-sheet secara paralel dan CSV lewat reader Arrow.
+
+Modul ini sengaja hanya bergantung pada pandas agar proses worker di
+ProcessPoolExecutor tidak ikut meng-import streamlit/gspread (dan tidak
+membuka koneksi Google Sheet) saat dijalankan dengan start method spawn.
+"""
+import io
+import os
+import csv
+import hashlib
+import logging
+import importlib.util
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Reader xlsx read-only berbasis Rust (python-calamine), dipakai otomatis jika terpasang
+CALAMINE_AVAILABLE = importlib.util.find_spec("python_calamine") is not None
+# Reader CSV multithread Arrow (pyarrow.csv), dipakai otomatis jika terpasang
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# progress_callback(sheet_selesai, total_sheet, nama_sheet)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def normalize_column_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Strip, hapus zero-width space / non-breaking space, dan upper-case nama kolom."""
+    df.columns = (
+        df.columns.str.strip()
+        .str.replace("\u200b", "", regex=False)
+        .str.replace("\xa0", "", regex=False)
+        .str.upper()
+    )
+    return df
+
+
+def normalize_column_name(name: str) -> str:
+    """Versi satu nama dari normalize_column_names (urutan operasi sama)."""
+    return name.strip().replace("\u200b", "").replace("\xa0", "").upper()
+
+
+def get_excel_engine() -> str | None:
+    """Engine pd.read_excel: calamine jika tersedia, selain itu default pandas (openpyxl/xlrd)."""
+    return "calamine" if CALAMINE_AVAILABLE else None
+
+
+def read_excel_sheet(file_bytes: bytes, sheet_name: str, engine: str | None = None) -> pd.DataFrame:
+    """
+    Baca satu sheet sebagai string (format asli dipertahankan) dengan nama kolom ternormalisasi.
+    Fungsi level-modul agar bisa dikirim ke proses worker.
+    """
+    df = pd.read_excel(
+        io.BytesIO(file_bytes),
+        sheet_name=sheet_name,
+        header=0,
+        dtype=str,  # Baca semua kolom sebagai string
+        na_filter=False,  # Mencegah konversi NaN
+        engine=engine,
+    )
+    return normalize_column_names(df)
+
+
+def _read_sheets_sequential(
+    file_bytes: bytes,
+    sheet_names: List[str],
+    engine: str | None,
+    progress_callback: ProgressCallback | None,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+    sheets, errors = {}, {}
+    for done, sheet_name in enumerate(sheet_names, start=1):
+        try:
+            sheets[sheet_name] = read_excel_sheet(file_bytes, sheet_name, engine)
+        except Exception as e:
+            errors[sheet_name] = str(e)
+        if progress_callback:
+            progress_callback(done, len(sheet_names), sheet_name)
+    return sheets, errors
+
+
+def read_excel_sheets_parallel(
+    file_bytes: bytes,
+    sheet_names: List[str] | None = None,
+    progress_callback: ProgressCallback | None = None,
+    max_workers: int | None = None,
+    engine: str | None = None,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+    """
+    Parsing beberapa sheet sekaligus di process pool (satu sheet per proses).
+
+    Args:
+        file_bytes: isi file Excel
+        sheet_names: sheet yang dibaca (None = semua sheet)
+        progress_callback: dipanggil setiap satu sheet selesai (urutan selesai, bukan urutan sheet)
+        max_workers: jumlah proses (default: min(jumlah sheet, jumlah CPU))
+        engine: engine pd.read_excel (default: get_excel_engine())
+
+    Returns:
+        (sheets, errors): dict nama sheet -> DataFrame (urutan sesuai workbook)
+        dan dict nama sheet -> pesan error untuk sheet yang gagal dibaca.
+    """
+    engine = engine if engine is not None else get_excel_engine()
+    if sheet_names is None:
+        with pd.ExcelFile(io.BytesIO(file_bytes), engine=engine) as xls:
+            sheet_names = list(xls.sheet_names)
+    if not sheet_names:
+        return {}, {}
+
+    workers = max_workers or min(len(sheet_names), os.cpu_count() or 1)
+    if workers <= 1 or len(sheet_names) == 1:
+        return _read_sheets_sequential(file_bytes, sheet_names, engine, progress_callback)
+
+    sheets, errors = {}, {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(read_excel_sheet, file_bytes, sheet_name, engine): sheet_name
+                for sheet_name in sheet_names
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                sheet_name = futures[future]
+                try:
+                    sheets[sheet_name] = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    errors[sheet_name] = str(e)
+                if progress_callback:
+                    progress_callback(done, len(sheet_names), sheet_name)
+    except (BrokenProcessPool, OSError) as e:
+        # Lingkungan yang tidak mengizinkan proses baru -> baca berurutan
+        logger.warning(f"⚠️ Process pool tidak tersedia ({e}), membaca sheet secara berurutan")
+        return _read_sheets_sequential(file_bytes, sheet_names, engine, progress_callback)
+
+    ordered = {name: sheets[name] for name in sheet_names if name in sheets}
+    return ordered, errors
+
+
+# ===== PEMBACAAN CSV UPLOAD (ARROW) =====
+# Ukuran blok parsing Arrow; setiap blok diparsing di thread terpisah
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def read_csv_header(file_bytes: bytes) -> List[str]:
+    """Baris header CSV (BOM UTF-8 dibuang), nama kosong/ganda diberi nama seperti pandas."""
+    text = io.TextIOWrapper(io.BytesIO(file_bytes), encoding="utf-8-sig", newline="")
+    return _dedupe_header(next(csv.reader(text), []))
+
+
+def _read_csv_arrow(file_bytes: bytes, columns: List[str] | None) -> pd.DataFrame:
+    """
+    Parsing CSV dengan pyarrow.csv (blok paralel). Nama kolom dinormalisasi sebelum parsing
+    dan hanya kolom yang diminta yang dikonversi; semua nilai string, tanpa nilai null.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    names = [normalize_column_name(name) for name in read_csv_header(file_bytes)]
+    if len(set(names)) != len(names):
+        raise ValueError("nama kolom ganda setelah normalisasi")
+    wanted = names if columns is None else [col for col in columns if col in names]
+    table = pa_csv.read_csv(
+        pa.py_buffer(file_bytes),
+        read_options=pa_csv.ReadOptions(
+            column_names=names, skip_rows=1, use_threads=True, block_size=CSV_BLOCK_SIZE
+        ),
+        # Nilai bertanda kutip boleh berisi baris baru (KETERANGAN dari aplikasi lapangan)
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        # Setara dtype=str + na_filter=False: semua kolom string, sel kosong tetap ""
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in wanted},
+            include_columns=wanted,
+            null_values=[],
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    # Konversi ke pandas hanya sekali di akhir; buffer Arrow dilepas per kolom selama konversi
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_csv_upload(file_bytes: bytes, columns: List[str] | None = None) -> pd.DataFrame:
+    """
+    Baca CSV upload sebagai string dengan nama kolom ternormalisasi.
+
+    Args:
+        columns: proyeksi kolom (mis. VALID_COLUMNS); kolom lain tidak dibaca ke pandas.
+            Urutan hasil mengikuti `columns`. None = semua kolom sesuai urutan file.
+
+    Memakai pyarrow.csv jika terpasang; jika tidak, atau file tidak bisa diparsing Arrow
+    (mis. jumlah kolom per baris tidak konsisten), memakai pd.read_csv seperti sebelumnya.
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            return _read_csv_arrow(file_bytes, columns)
+        except Exception as e:
+            logger.warning(f"⚠️ CSV tidak bisa dibaca dengan Arrow ({e}), memakai pandas")
+    df = normalize_column_names(pd.read_csv(io.BytesIO(file_bytes), dtype=str, na_filter=False))
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+# ===== PEMBACAAN UPLOAD PER CHUNK (STREAMING) =====
+# Jumlah baris data per chunk pada mode upload streaming
+UPLOAD_CHUNK_ROWS = 5000
+
+
+def _excel_cell_to_str(value) -> str:
+    """Konversi nilai sel openpyxl ke string seperti read_excel(dtype=str) (float bulat -> int)."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def _dedupe_header(header: List[str]) -> List[str]:
+    """Nama kolom kosong -> 'Unnamed: i', nama ganda -> 'NAMA.1', 'NAMA.2' (seperti pandas)."""
+    seen: Dict[str, int] = {}
+    result = []
+    for idx, name in enumerate(header):
+        name = f"Unnamed: {idx}" if name == "" else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        result.append(name)
+    return result
+
+
+def _iter_xlsx_sheet_chunks(workbook, sheet_name: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Stream satu sheet lewat openpyxl read-only; baris yang seluruhnya kosong dilewati."""
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    header_row = next(rows, None)
+    if header_row is None:
+        return
+    header = _dedupe_header([_excel_cell_to_str(value) for value in header_row])
+    buffer: List[List[str]] = []
+    for row in rows:
+        values = [_excel_cell_to_str(value) for value in row[:len(header)]]
+        if not any(values):
+            continue
+        values.extend([""] * (len(header) - len(values)))
+        buffer.append(values)
+        if len(buffer) >= chunk_rows:
+            yield normalize_column_names(pd.DataFrame(buffer, columns=header, dtype=object))
+            buffer = []
+    if buffer:
+        yield normalize_column_names(pd.DataFrame(buffer, columns=header, dtype=object))
+
+
+def iter_upload_chunks(
+    file_bytes: bytes,
+    file_name: str,
+    chunk_rows: int = UPLOAD_CHUNK_ROWS,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Baca file upload per potongan `chunk_rows` baris tanpa memuat seluruh file ke DataFrame.
+
+    - CSV: pd.read_csv(chunksize=...) dengan dtype=str
+    - xlsx/xlsm: openpyxl read-only (baris di-stream dari XML)
+    - xls: tidak bisa di-stream; sheet dibaca utuh lalu dipotong per chunk
+
+    Yields:
+        (nama sheet, DataFrame chunk berisi string) - nama sheet "CSV" untuk file CSV
+    """
+    name = file_name.lower()
+    if name.endswith(".csv"):
+        for chunk in pd.read_csv(io.BytesIO(file_bytes), dtype=str, na_filter=False, chunksize=chunk_rows):
+            yield "CSV", normalize_column_names(chunk)
+        return
+
+    if name.endswith(".xls"):
+        with pd.ExcelFile(io.BytesIO(file_bytes)) as xls:
+            for sheet_name in xls.sheet_names:
+                df = read_excel_sheet(file_bytes, sheet_name)
+                for start in range(0, len(df), chunk_rows):
+                    yield sheet_name, df.iloc[start:start + chunk_rows].reset_index(drop=True)
+        return
+
+    from openpyxl import load_workbook  # dependency upload xlsx
+
+    workbook = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            for chunk in _iter_xlsx_sheet_chunks(workbook, sheet_name, chunk_rows):
+                yield sheet_name, chunk
+    finally:
+        workbook.close()
+
+
+def read_upload_headers(file_bytes: bytes, file_name: str) -> Dict[str, List[str]]:
+    """
+    Header (nama kolom ternormalisasi) setiap sheet file upload tanpa membaca baris data,
+    agar struktur semua sheet bisa divalidasi sebelum chunk pertama ditulis.
+
+    Returns:
+        dict nama sheet -> list nama kolom, urutan sheet sama dengan iter_upload_chunks
+    """
+    name = file_name.lower()
+    if name.endswith(".csv"):
+        return {"CSV": [normalize_column_name(col) for col in read_csv_header(file_bytes)]}
+
+    if name.endswith(".xls"):
+        with pd.ExcelFile(io.BytesIO(file_bytes)) as xls:
+            return {
+                sheet_name: list(normalize_column_names(xls.parse(sheet_name, header=0, nrows=0)).columns)
+                for sheet_name in xls.sheet_names
+            }
+
+    from openpyxl import load_workbook  # dependency upload xlsx
+
+    workbook = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+    try:
+        headers = {}
+        for sheet_name in workbook.sheetnames:
+            header_row = next(workbook[sheet_name].iter_rows(max_row=1, values_only=True), None)
+            if header_row is not None:
+                header = _dedupe_header([_excel_cell_to_str(value) for value in header_row])
+                headers[sheet_name] = [normalize_column_name(col) for col in header]
+        return headers
+    finally:
+        workbook.close()
+
+
+# ===== CACHE FILE UPLOAD (CONTENT-ADDRESSED) =====
+# Hasil parsing upload disimpan sebagai Parquet dengan nama = SHA-256 isi file, sehingga
+# upload ulang file yang sama (retry setelah timeout) tidak perlu diparsing lagi
+UPLOAD_CACHE_DIR = os.path.join(
+    os.environ.get("INSPEKSI_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")),
+    "uploads",
+)
+# Batas total ukuran cache; file yang paling lama tidak dipakai dihapus lebih dulu (LRU)
+UPLOAD_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def compute_upload_hash(file_bytes: bytes) -> str:
+    """SHA-256 isi file upload, dipakai sebagai kunci cache parsing dan rencana sinkronisasi."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def upload_cache_path(cache_key: str) -> str:
+    return os.path.join(UPLOAD_CACHE_DIR, f"{cache_key}.parquet")
+
+
+def load_cached_upload(cache_key: str) -> pd.DataFrame | None:
+    """Baca frame upload dari cache (None jika tidak ada/rusak). Waktu akses diperbarui untuk LRU."""
+    path = upload_cache_path(cache_key)
+    try:
+        df = pd.read_parquet(path)
+        os.utime(path)
+        return df
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"⚠️ Cache upload {cache_key[:12]} tidak bisa dibaca, parsing ulang: {e}")
+        return None
+
+
+def save_cached_upload(cache_key: str, df: pd.DataFrame, max_bytes: int = UPLOAD_CACHE_MAX_BYTES) -> bool:
+    """Simpan frame upload ke cache (tulis atomik) lalu jalankan eviction LRU."""
+    path = upload_cache_path(cache_key)
+    try:
+        os.makedirs(UPLOAD_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"⚠️ Gagal menyimpan cache upload: {e}")
+        return False
+    evict_upload_cache(max_bytes)
+    return True
+
+
+def evict_upload_cache(max_bytes: int = UPLOAD_CACHE_MAX_BYTES) -> int:
+    """
+    Hapus file cache yang paling lama tidak dipakai (mtime) sampai total ukuran <= max_bytes.
+
+    Returns:
+        int: Jumlah file yang dihapus
+    """
+    try:
+        entries = [entry for entry in os.scandir(UPLOAD_CACHE_DIR) if entry.name.endswith(".parquet")]
+    except FileNotFoundError:
+        return 0
+    files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
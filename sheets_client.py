@@ -0,0 +1,212 @@
+"""
+Lapisan klien HTTP untuk Google Sheets / Drive API (dipakai gspread).
+
+- Satu sesi terotorisasi dipakai bersama oleh semua pemanggil dalam satu proses
+- Retry dengan exponential backoff + jitter untuk error kuota (429, 403 usageLimits),
+  timeout (408) dan error server (5xx). Request yang tidak idempotent (values:append,
+  spreadsheets:batchUpdate seperti hapus/tambah baris) hanya di-retry jika pasti ditolak
+  sebelum dijalankan (kuota, koneksi gagal dibuka), agar baris tidak ter-append/terhapus dua kali
+- Token bucket per jenis request (baca/tulis) sesuai kuota per menit Sheets API
+- Counter request/retry untuk monitoring
+
+Set env `SHEETS_API_BASE_URL` (mis. http://127.0.0.1:8765) untuk mengarahkan semua
+request ke server Sheets palsu lokal saat pengujian; kredensial tidak diperlukan.
+"""
+import os
+import time
+import random
+import logging
+import threading
+from http import HTTPStatus
+from typing import Any, Dict
+
+import requests
+import gspread
+from gspread.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+# Base URL pengganti untuk server Sheets palsu (kosong = Google API asli)
+SHEETS_API_BASE_URL = os.environ.get("SHEETS_API_BASE_URL", "").rstrip("/")
+GOOGLE_API_HOSTS = ("https://sheets.googleapis.com", "https://www.googleapis.com")
+
+# Kuota default Sheets API per user (service account) per menit, terpisah untuk baca dan tulis
+SHEETS_READ_QUOTA_PER_MINUTE = 60
+SHEETS_WRITE_QUOTA_PER_MINUTE = 60
+# Request yang boleh langsung dikirim beruntun sebelum dibatasi laju isi ulang bucket
+SHEETS_BURST_REQUESTS = 10
+
+# Retry: delay = acak(0, min(MAX, BASE * 2^percobaan)) ("full jitter")
+RETRY_MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 64.0
+RETRYABLE_STATUS_CODES = {
+    HTTPStatus.REQUEST_TIMEOUT,
+    HTTPStatus.TOO_MANY_REQUESTS,
+}
+# POST yang hasilnya sama jika dikirim ulang: tulis nilai ke range A1 tetap / kosongkan range
+IDEMPOTENT_POST_SUFFIXES = ("values:batchUpdate", "values:batchClear", "values:batchGet", ":clear")
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe. Kapasitas = burst, laju isi ulang dipilih agar jumlah
+    request dalam jendela 60 detik mana pun tidak melebihi `per_minute`.
+    """
+
+    def __init__(self, per_minute: int, burst: int = SHEETS_BURST_REQUESTS):
+        self.capacity = max(1, min(burst, per_minute))
+        self.rate = max(per_minute - self.capacity, 1) / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Ambil satu token, tidur jika bucket kosong. Return lama menunggu (detik)."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def rewrite_endpoint(endpoint: str) -> str:
+    """Arahkan URL Google API ke SHEETS_API_BASE_URL jika di-set."""
+    if SHEETS_API_BASE_URL:
+        for host in GOOGLE_API_HOSTS:
+            if endpoint.startswith(host):
+                return SHEETS_API_BASE_URL + endpoint[len(host):]
+    return endpoint
+
+
+def is_idempotent_request(method: str, endpoint: str) -> bool:
+    """
+    True jika request aman dikirim ulang meskipun server mungkin sudah menjalankannya.
+    values:append dan spreadsheets:batchUpdate (hapus/tambah baris, sembunyikan kolom)
+    tidak idempotent: mengulanginya bisa menambah baris dua kali atau menghapus range
+    yang sudah bergeser.
+    """
+    if method.lower() != "post":
+        return True
+    path = endpoint.split("?", 1)[0]
+    return path.endswith(IDEMPOTENT_POST_SUFFIXES)
+
+
+def is_retryable_error(status_code: int, error: Dict[str, Any] | None, idempotent: bool = True) -> bool:
+    """
+    Error kuota (429 / 403 usageLimits dari Drive), timeout, atau 5xx.
+    Untuk request tidak idempotent hanya error kuota: request ditolak sebelum dijalankan,
+    sedangkan 408/5xx bisa terjadi setelah penulisan diterapkan.
+    """
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        return True
+    if idempotent and (status_code in RETRYABLE_STATUS_CODES or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR):
+        return True
+    if status_code == HTTPStatus.FORBIDDEN and error:
+        errors = error.get("errors") or []
+        return bool(errors) and (
+            errors[0].get("domain") == "usageLimits"
+            or errors[0].get("reason") in ("rateLimitExceeded", "userRateLimitExceeded")
+        )
+    return False
+
+
+class QuotaAwareHTTPClient(gspread.HTTPClient):
+    """
+    HTTPClient gspread dengan token bucket baca/tulis, retry backoff + jitter, dan counter.
+    Dibuat sekali lewat gspread.authorize(..., http_client=QuotaAwareHTTPClient).
+    """
+
+    def __init__(self, auth, session: requests.Session | None = None) -> None:
+        super().__init__(auth, session)
+        self.read_bucket = TokenBucket(SHEETS_READ_QUOTA_PER_MINUTE)
+        self.write_bucket = TokenBucket(SHEETS_WRITE_QUOTA_PER_MINUTE)
+        self.stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "throttled": 0,
+            "throttle_wait_seconds": 0.0,
+            "backoff_wait_seconds": 0.0,
+            "status_codes": {},
+        }
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Salinan counter request (aman dibaca dari thread lain)."""
+        with self.stats_lock:
+            stats = dict(self.stats)
+            stats["status_codes"] = dict(self.stats["status_codes"])
+        return stats
+
+    def _acquire_quota(self, method: str, endpoint: str) -> None:
+        # Drive API (revisi, metadata) punya kuota jauh lebih longgar -> tidak dibatasi
+        if "/drive/" in endpoint:
+            return
+        bucket = self.read_bucket if method.lower() == "get" else self.write_bucket
+        waited = bucket.acquire()
+        if waited > 0:
+            self._count("throttled")
+            self._count("throttle_wait_seconds", waited)
+
+    def request(self, method: str, endpoint: str, *args: Any, **kwargs: Any) -> requests.Response:
+        endpoint = rewrite_endpoint(endpoint)
+        idempotent = is_idempotent_request(method, endpoint)
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            self._acquire_quota(method, endpoint)
+            self._count("requests")
+            retry_after = None
+            try:
+                response = super().request(method, endpoint, *args, **kwargs)
+                self._record_status(response.status_code)
+                return response
+            except APIError as e:
+                status_code = e.response.status_code
+                self._record_status(status_code)
+                if not is_retryable_error(status_code, e.error, idempotent) or attempt == RETRY_MAX_ATTEMPTS - 1:
+                    self._count("failures")
+                    raise
+                retry_after = e.response.headers.get("Retry-After")
+                reason = f"HTTP {status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # Koneksi yang gagal dibuka berarti request belum terkirim; selain itu
+                # (read timeout, koneksi putus) penulisan tidak idempotent mungkin sudah diterapkan
+                sent = not isinstance(e, requests.ConnectTimeout)
+                if (sent and not idempotent) or attempt == RETRY_MAX_ATTEMPTS - 1:
+                    self._count("failures")
+                    raise
+                reason = type(e).__name__
+
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            logger.warning(f"⚠️ {reason} pada {method.upper()} {endpoint}, retry {attempt + 1} dalam {delay:.1f} detik")
+            self._count("retries")
+            self._count("backoff_wait_seconds", delay)
+            time.sleep(delay)
+
+    def _record_status(self, status_code: int) -> None:
+        with self.stats_lock:
+            codes = self.stats["status_codes"]
+            codes[status_code] = codes.get(status_code, 0) + 1
+
+
+def authorize(credentials=None) -> gspread.Client:
+    """
+    Buat gspread.Client dengan QuotaAwareHTTPClient. Jika SHEETS_API_BASE_URL di-set dan
+    credentials None, dipakai sesi requests biasa tanpa otorisasi (server palsu lokal).
+    """
+    if credentials is None and SHEETS_API_BASE_URL:
+        return gspread.Client(auth=None, session=requests.Session(), http_client=QuotaAwareHTTPClient)
+    return gspread.authorize(credentials, http_client=QuotaAwareHTTPClient)
@@ -1,13 +1,38 @@
 import pandas as pd
+import numpy as np
 import gspread
 from datetime import datetime
 from google.oauth2.service_account import Credentials
 import json
-from typing import List, Tuple, Dict, Any, Set
+from typing import List, Tuple, Dict, Any, Set, Callable
 import re
 import logging
 import os
 import traceback
+import threading
+import time
+import uuid
+import io
+import gzip
+import tempfile
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from sheets_client import SHEETS_API_BASE_URL, QuotaAwareHTTPClient, authorize as authorize_sheets_client
+from excel_utils import (
+    ProgressCallback,
+    UPLOAD_CHUNK_ROWS,
+    compute_upload_hash,
+    get_excel_engine,
+    iter_upload_chunks,
+    load_cached_upload,
+    normalize_column_names,
+    read_csv_upload,
+    read_excel_sheets_parallel,
+    read_upload_headers,
+    save_cached_upload,
+)
 import streamlit as st
 
 # Setup logging
@@ -21,8 +46,23 @@ recently_uploaded_ids: Set[str] = set()
 SPREADSHEET_ID = "1BUFojSbcnXCCDOZJ5oB0uvmDFvhWO69HvdcxhSoQwtM"
 MASTER_SHEET_NAME = "MasterData"
 LOG_SHEET_NAME = "LogAktivitas"
+# Sheet tersembunyi berisi versi MasterData + jurnal baris yang berubah per versi
+MASTER_META_SHEET_NAME = "_MasterMeta"
 
-SCOPE = ["https://www.googleapis.com/auth/spreadsheets"]
+SCOPE = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    # Hanya untuk membaca modifiedTime (penanda revisi snapshot lokal)
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+
+# Snapshot lokal MasterData (Parquet) agar startup tidak selalu fetch seluruh sheet
+SNAPSHOT_DIR = os.environ.get(
+    "INSPEKSI_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+MASTER_SNAPSHOT_FILE = os.path.join(SNAPSHOT_DIR, "master_snapshot.parquet")
+MASTER_SNAPSHOT_META_FILE = os.path.join(SNAPSHOT_DIR, "master_snapshot.json")
+# Batas umur snapshot yang hanya diperbarui inkremental sebelum dipaksa baca penuh
+MASTER_FULL_REFRESH_SECONDS = 6 * 60 * 60
 
 # Sheet dan Header yang Valid
 VALID_SHEETS = ["TGK", "PSW", "KTB", "MTR"]
@@ -55,6 +95,30 @@ DATE_COLUMNS = ["TANGGAL SURVEY", "TANGGAL WO", "TANGGAL HAR"]
 # Format tanggal standard untuk dashboard (YYYY-MM-DD)
 STANDARD_DATE_FORMAT = "%Y-%m-%d"
 
+# Nilai tanggal yang dianggap kosong
+DATE_PLACEHOLDERS = ['', 'nan', 'none', 'null', '-', 'n/a']
+
+# Format ISO dengan jam (dicoba untuk nilai yang mengandung 'T' atau lebih dari 10 karakter)
+ISO_DATETIME_FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f']
+
+# Format tanggal umum, dicoba BERURUTAN (urutan menentukan hasil untuk tanggal ambigu)
+DATE_INPUT_FORMATS = [
+    # DD/MM/YYYY variants
+    '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
+    # MM/DD/YYYY variants
+    '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',
+    # YYYY/MM/DD variants
+    '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',
+    # DD/MM/YY variants (2-digit year)
+    '%d/%m/%y', '%d-%m-%y', '%d.%m.%y',
+    # MM/DD/YY variants
+    '%m/%d/%y', '%m-%d-%y', '%m.%d.%y',
+    # Indonesian format variants
+    '%d %m %Y', '%d %m %y',
+    # Other common formats
+    '%Y%m%d', '%d%m%Y'
+]
+
 # ===== KAMUS NORMALISASI TEKS UNTUK MENGHINDARI DUPLIKASI =====
 # Kamus untuk standarisasi kata-kata yang sering typo atau variasi penulisan
 
@@ -125,148 +189,324 @@ NORMALIZATION_DICTIONARY = {
     'TIDAK DIKETAHUI': ['TDK DIKETAHUI', 'UNKNOWN', 'NOT FOUND', 'NULL', 'KOSONG'],
 }
 
-def normalize_text_advanced(text: str) -> str:
-    """
-    Normalisasi teks advanced dengan kamus untuk menghindari duplikasi data.
-    
-    Fungsi ini mengatasi:
-    - Typo dan variasi penulisan
-    - Singkatan vs kata lengkap
-    - Case sensitivity
-    - Spasi berlebih
-    - Karakter khusus
-    
-    Args:
-        text: Teks yang akan dinormalisasi
-        
-    Returns:
-        str: Teks yang sudah dinormalisasi
-    """
-    if pd.isna(text) or text == "":
-        return ""
-    
+# ===== ENGINE NORMALISASI (DIBANGUN SEKALI SAAT IMPORT) =====
+# Ukuran cache LRU per fungsi normalisasi (kunci = string mentah)
+NORMALIZATION_CACHE_SIZE = 100_000
+
+# Singkatan lokasi yang hanya diganti di awal teks (urutan penting: dengan spasi dulu)
+LOCATION_PREFIX_ABBREVIATIONS = {
+    'JL. ': 'JALAN ',
+    'JL.': 'JALAN',
+    'KP. ': 'KAMPUNG ',
+    'KP.': 'KAMPUNG',
+    'DS. ': 'DESA ',
+    'DS.': 'DESA',
+    'KEL. ': 'KELURAHAN ',
+    'KEL.': 'KELURAHAN',
+    'KEC. ': 'KECAMATAN ',
+    'KEC.': 'KECAMATAN',
+    'DSN. ': 'DUSUN ',
+    'DSN.': 'DUSUN',
+}
+
+# Bentuk standar lokasi yang sudah ditangani LOCATION_PREFIX_ABBREVIATIONS
+LOCATION_STANDARD_FORMS = {'JALAN', 'KAMPUNG', 'DESA', 'KELURAHAN', 'KECAMATAN', 'DUSUN'}
+
+# Tambahan khusus untuk equipment
+EQUIPMENT_NORMALIZATION_DICTIONARY = {
+    'RECLOSER': ['RC', 'RECLOSER OTOMATIS', 'AUTO RECLOSER'],
+    'SECTIONALIZER': ['SC', 'SECTION SWITCH'],
+    'LBS': ['LOAD BREAK SWITCH', 'SWITCH PEMISAH'],
+    'ARRESTER': ['ARESTER', 'PENANGKAL PETIR'],
+    'KAPASITOR': ['CAPASITOR', 'CAPACITOR', 'CAP BANK'],
+    'ISOLATOR': ['SWITCH ISOLASI', 'PEMISAH'],
+    'BUSHING': ['BUSHING TRAFO', 'ISOLATOR BUSHING'],
+    'GROUNDING': ['PEMBUMIAN', 'EARTHING', 'TANAH'],
+}
+
+# Kata kunci status eksekusi dengan prioritas "BELUM SELESAI" lebih tinggi
+STATUS_BELUM_KEYWORDS = ['BELUM', 'PENDING', 'PROSES', 'PROGRESS', 'ONGOING', 'BLM', 'BLUM']
+STATUS_SELESAI_KEYWORDS = ['SELESAI', 'DONE', 'FINISH', 'COMPLETE', 'SUDAH', 'FINISHED']
+
+# Kata kunci status aset - cek pola kata (jangan map 'OK' dan 'YA' ke BAIK karena ambigu)
+ASSET_BURUK_KEYWORDS = ['BURUK', 'RUSAK', 'JELEK', 'BAD', 'POOR']
+ASSET_KURANG_KEYWORDS = ['KURANG']
+ASSET_BAIK_KEYWORDS = ['BAIK', 'BAGUS', 'AMAN', 'NORMAL']
+
+
+def _compile_alternation(words: List[str], word_boundary: bool = False) -> "re.Pattern[str]":
+    """Satu regex alternation untuk sekumpulan kata (terpanjang dulu)."""
+    body = '|'.join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+    if word_boundary:
+        return re.compile(r'\b(?:' + body + r')\b')
+    return re.compile(body)
+
+
+_SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s.-]')
+
+# Inverted map variant → bentuk standar untuk exact match (standar pertama yang cocok menang)
+_EXACT_VARIANT_LOOKUP: Dict[str, str] = {}
+for _standard, _variations in NORMALIZATION_DICTIONARY.items():
+    for _variant in _variations:
+        _EXACT_VARIANT_LOOKUP.setdefault(_variant, _standard)
+    _EXACT_VARIANT_LOOKUP.setdefault(_standard, _standard)
+
+# Aturan partial match berurutan dengan pola word-boundary yang sudah dikompilasi
+_PARTIAL_VARIANT_RULES = [
+    (_standard, [(_variant, re.compile(r'\b' + re.escape(_variant) + r'\b')) for _variant in _variations])
+    for _standard, _variations in NORMALIZATION_DICTIONARY.items()
+    if _standard not in LOCATION_STANDARD_FORMS
+]
+# Pre-filter: jika tidak ada satu pun variant utuh di teks, partial match tidak mengubah apa pun
+_ANY_PARTIAL_VARIANT_PATTERN = _compile_alternation(
+    [_variant for _, _rules in _PARTIAL_VARIANT_RULES for _variant, _ in _rules], word_boundary=True
+)
+
+_EQUIPMENT_VARIANT_PATTERN = _compile_alternation(
+    [_variant for _variants in EQUIPMENT_NORMALIZATION_DICTIONARY.values() for _variant in _variants]
+)
+_STATUS_BELUM_PATTERN = _compile_alternation(STATUS_BELUM_KEYWORDS)
+_STATUS_SELESAI_PATTERN = _compile_alternation(STATUS_SELESAI_KEYWORDS)
+_ASSET_BURUK_PATTERN = _compile_alternation(ASSET_BURUK_KEYWORDS)
+_ASSET_KURANG_PATTERN = _compile_alternation(ASSET_KURANG_KEYWORDS)
+_ASSET_BAIK_PATTERN = _compile_alternation(ASSET_BAIK_KEYWORDS)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_text_cached(raw_text: str) -> str:
+    """Inti normalize_text_advanced, di-cache per string mentah."""
     # Konversi ke string dan bersihkan
-    text = str(text).strip().upper()
+    text = raw_text.strip().upper()
     
     # Hapus karakter khusus yang tidak perlu
-    import re
-    text = re.sub(r'[^\w\s.-]', ' ', text)
+    text = _SPECIAL_CHAR_PATTERN.sub(' ', text)
     
     # Normalisasi spasi berlebih
     text = ' '.join(text.split())
     
     # KHUSUS: Handle singkatan lokasi dulu untuk menghindari konflik
-    location_abbreviations = {
-        'JL. ': 'JALAN ',
-        'JL.': 'JALAN',
-        'KP. ': 'KAMPUNG ',
-        'KP.': 'KAMPUNG',
-        'DS. ': 'DESA ',
-        'DS.': 'DESA',
-        'KEL. ': 'KELURAHAN ',
-        'KEL.': 'KELURAHAN',
-        'KEC. ': 'KECAMATAN ',
-        'KEC.': 'KECAMATAN',
-        'DSN. ': 'DUSUN ',
-        'DSN.': 'DUSUN',
-    }
-    
-    # Apply location abbreviations first (at the beginning of text)
-    for abbrev, full in location_abbreviations.items():
+    for abbrev, full in LOCATION_PREFIX_ABBREVIATIONS.items():
         if text.startswith(abbrev):
             text = text.replace(abbrev, full, 1)
             break
     
-    # Cari di kamus normalisasi - exact match dulu
-    for standard_form, variations in NORMALIZATION_DICTIONARY.items():
-        if text in variations or text == standard_form:
-            return standard_form
+    # Cari di kamus normalisasi - exact match dulu (O(1) lewat inverted map)
+    standard_form = _EXACT_VARIANT_LOOKUP.get(text)
+    if standard_form is not None:
+        return standard_form
+    
+    if not _ANY_PARTIAL_VARIANT_PATTERN.search(text):
+        return text
     
     # Cari partial match untuk frasa yang mengandung kata kunci (skip location abbreviations)
-    for standard_form, variations in NORMALIZATION_DICTIONARY.items():
-        # Skip JALAN, KAMPUNG etc yang sudah dihandle di atas
-        if standard_form in ['JALAN', 'KAMPUNG', 'DESA', 'KELURAHAN', 'KECAMATAN', 'DUSUN']:
-            continue
-            
-        for variant in variations:
+    for standard_form, rules in _PARTIAL_VARIANT_RULES:
+        for variant, pattern in rules:
             if variant in text:
                 # Replace hanya jika kata utuh (word boundary)
-                pattern = r'\b' + re.escape(variant) + r'\b'
-                if re.search(pattern, text):
-                    text = re.sub(pattern, standard_form, text)
+                if pattern.search(text):
+                    text = pattern.sub(standard_form, text)
                 break
     
     return text
 
-def normalize_equipment_name(equipment: str) -> str:
-    """Normalisasi nama equipment dengan fokus pada peralatan listrik PLN."""
-    if pd.isna(equipment) or equipment == "":
+
+def normalize_text_advanced(text: str) -> str:
+    """
+    Normalisasi teks advanced dengan kamus untuk menghindari duplikasi data.
+    
+    Fungsi ini mengatasi:
+    - Typo dan variasi penulisan
+    - Singkatan vs kata lengkap
+    - Case sensitivity
+    - Spasi berlebih
+    - Karakter khusus
+    
+    Tabel dan regex dibangun sekali saat import; hasil di-cache (LRU) per string mentah.
+    
+    Args:
+        text: Teks yang akan dinormalisasi
+        
+    Returns:
+        str: Teks yang sudah dinormalisasi
+    """
+    if pd.isna(text) or text == "":
         return ""
     
+    return _normalize_text_cached(str(text))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_equipment_cached(raw_equipment: str) -> str:
+    """Inti normalize_equipment_name, di-cache per string mentah."""
     # Gunakan normalisasi advanced dulu
-    normalized = normalize_text_advanced(equipment)
-    
-    # Tambahan khusus untuk equipment
-    equipment_specific = {
-        'RECLOSER': ['RC', 'RECLOSER OTOMATIS', 'AUTO RECLOSER'],
-        'SECTIONALIZER': ['SC', 'SECTION SWITCH'],
-        'LBS': ['LOAD BREAK SWITCH', 'SWITCH PEMISAH'],
-        'ARRESTER': ['ARESTER', 'PENANGKAL PETIR'],
-        'KAPASITOR': ['CAPASITOR', 'CAPACITOR', 'CAP BANK'],
-        'ISOLATOR': ['SWITCH ISOLASI', 'PEMISAH'],
-        'BUSHING': ['BUSHING TRAFO', 'ISOLATOR BUSHING'],
-        'GROUNDING': ['PEMBUMIAN', 'EARTHING', 'TANAH'],
-    }
+    normalized = _normalize_text_cached(raw_equipment)
     
-    for standard, variants in equipment_specific.items():
+    if not _EQUIPMENT_VARIANT_PATTERN.search(normalized):
+        return normalized
+    
+    for standard, variants in EQUIPMENT_NORMALIZATION_DICTIONARY.items():
         for variant in variants:
             if variant in normalized:
                 normalized = normalized.replace(variant, standard)
     
     return normalized
 
-def normalize_status_execution(status: str) -> str:
-    """Normalisasi khusus untuk STATUS EKSEKUSI."""
-    if pd.isna(status) or status == "":
+
+def normalize_equipment_name(equipment: str) -> str:
+    """Normalisasi nama equipment dengan fokus pada peralatan listrik PLN."""
+    if pd.isna(equipment) or equipment == "":
         return ""
     
-    normalized = normalize_text_advanced(status)
-    
-    # Mapping khusus untuk status eksekusi dengan prioritas "BELUM SELESAI" lebih tinggi
-    belum_keywords = ['BELUM', 'PENDING', 'PROSES', 'PROGRESS', 'ONGOING', 'BLM', 'BLUM']
-    selesai_keywords = ['SELESAI', 'DONE', 'FINISH', 'COMPLETE', 'SUDAH', 'FINISHED']
+    return _normalize_equipment_cached(str(equipment))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_status_execution_cached(raw_status: str) -> str:
+    """Inti normalize_status_execution, di-cache per string mentah."""
+    normalized = _normalize_text_cached(raw_status)
     
     # Cek BELUM SELESAI dulu (prioritas tinggi)
-    for keyword in belum_keywords:
-        if keyword in normalized:
-            return 'BELUM SELESAI'
+    if _STATUS_BELUM_PATTERN.search(normalized):
+        return 'BELUM SELESAI'
     
     # Baru cek SELESAI
-    for keyword in selesai_keywords:
-        if keyword in normalized:
-            return 'SELESAI'
+    if _STATUS_SELESAI_PATTERN.search(normalized):
+        return 'SELESAI'
     
     return normalized
 
-def normalize_asset_status(status: str) -> str:
-    """Normalisasi khusus untuk STATUS ASET."""
+
+def normalize_status_execution(status: str) -> str:
+    """Normalisasi khusus untuk STATUS EKSEKUSI."""
     if pd.isna(status) or status == "":
         return ""
     
+    return _normalize_status_execution_cached(str(status))
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_asset_status_cached(raw_status: str) -> str:
+    """Inti normalize_asset_status, di-cache per string mentah."""
     # Gunakan normalisasi advanced dulu
-    normalized = normalize_text_advanced(status)
+    normalized = _normalize_text_cached(raw_status)
     
-    # Mapping khusus untuk status aset - cek pola kata
-    if any(word in normalized for word in ['BURUK', 'RUSAK', 'JELEK', 'BAD', 'POOR']):
+    if _ASSET_BURUK_PATTERN.search(normalized):
         return 'BURUK'
-    elif any(word in normalized for word in ['KURANG']):
+    elif _ASSET_KURANG_PATTERN.search(normalized):
         return 'KURANG'
-    elif any(word in normalized for word in ['BAIK', 'BAGUS', 'AMAN', 'NORMAL']):
+    elif _ASSET_BAIK_PATTERN.search(normalized):
         return 'BAIK'
-    # Jangan map 'OK' dan 'YA' ke BAIK karena bisa ambigu
     
     return normalized
 
+
+def normalize_asset_status(status: str) -> str:
+    """Normalisasi khusus untuk STATUS ASET."""
+    if pd.isna(status) or status == "":
+        return ""
+    
+    return _normalize_asset_status_cached(str(status))
+
+def normalize_series_unique(series: pd.Series, func: Callable[[Any], str]) -> pd.Series:
+    """
+    Terapkan fungsi normalisasi sekali per nilai unik (bukan per baris) via pd.factorize.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    mapped = np.array([func(val) for val in uniques] + [func("")], dtype=object)
+    # Sentinel -1 (NaN) jatuh ke elemen terakhir = hasil normalisasi string kosong
+    return pd.Series(mapped[codes], index=series.index, dtype=object)
+
+
+
+# ===== NORMALISASI PARALEL (PROCESS POOL) =====
+# Di bawah jumlah baris ini normalisasi dijalankan serial (overhead pool lebih besar dari manfaatnya)
+PARALLEL_NORMALIZATION_MIN_ROWS = 50_000
+# Ukuran minimum shard nilai unik per task worker
+NORMALIZATION_MIN_SHARD = 2_000
+
+NormalizationTasks = Dict[str, Tuple[pd.Series, Callable[[Any], str]]]
+
+
+def _map_normalization_shard(func: Callable[[Any], str], values: List[Any]) -> List[str]:
+    """Jalankan fungsi normalisasi pada satu shard nilai unik (dieksekusi di proses worker)."""
+    return [func(val) for val in values]
+
+
+def _normalize_series_serial(tasks: NormalizationTasks) -> Tuple[Dict[str, pd.Series], Dict[str, str]]:
+    results, errors = {}, {}
+    for name, (series, func) in tasks.items():
+        try:
+            results[name] = normalize_series_unique(series, func)
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
+
+
+def normalize_series_batch(
+    tasks: NormalizationTasks,
+    max_workers: int | None = None,
+    min_rows: int | None = None,
+) -> Tuple[Dict[str, pd.Series], Dict[str, str]]:
+    """
+    Normalisasi beberapa Series sekaligus dengan hasil identik normalize_series_unique.
+    
+    Di atas `min_rows` baris, nilai unik setiap Series dibagi menjadi shard yang dipetakan
+    paralel di process pool, lalu disusun kembali sesuai urutan shard dan dipetakan ke baris
+    lewat kode pd.factorize. Di bawah ambang (atau jika pool tidak tersedia) berjalan serial.
+    
+    Args:
+        tasks: nama hasil -> (Series sumber, fungsi normalisasi level-modul)
+        max_workers: jumlah proses (default: jumlah CPU)
+        min_rows: ambang baris jalur paralel (default: PARALLEL_NORMALIZATION_MIN_ROWS)
+    
+    Returns:
+        (hasil, errors): dict nama -> Series ternormalisasi dan dict nama -> pesan error
+    """
+    min_rows = PARALLEL_NORMALIZATION_MIN_ROWS if min_rows is None else min_rows
+    total_rows = max((len(series) for series, _ in tasks.values()), default=0)
+    workers = max_workers or os.cpu_count() or 1
+    if total_rows < min_rows or workers <= 1:
+        return _normalize_series_serial(tasks)
+    
+    factorized = {}
+    for name, (series, func) in tasks.items():
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        # Elemen terakhir = hasil untuk sentinel NaN (-1), sama seperti normalize_series_unique
+        factorized[name] = (series.index, codes, list(uniques) + [""], func)
+    
+    shards: Dict[str, Dict[int, List[str]]] = {name: {} for name in factorized}
+    errors: Dict[str, str] = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for name, (_, _, values, func) in factorized.items():
+                shard_size = max(-(-len(values) // workers), NORMALIZATION_MIN_SHARD)
+                for start in range(0, len(values), shard_size):
+                    future = executor.submit(_map_normalization_shard, func, values[start:start + shard_size])
+                    futures[future] = (name, start)
+            for future in as_completed(futures):
+                name, start = futures[future]
+                try:
+                    shards[name][start] = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    errors[name] = str(e)
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"⚠️ Process pool normalisasi tidak tersedia ({e}), berjalan serial")
+        return _normalize_series_serial(tasks)
+    
+    results = {}
+    for name, (index, codes, _, _) in factorized.items():
+        if name in errors:
+            continue
+        mapped = np.array(
+            [value for start in sorted(shards[name]) for value in shards[name][start]], dtype=object
+        )
+        results[name] = pd.Series(mapped[codes], index=index, dtype=object)
+    return results, errors
+
+
 # Inisialisasi koneksi Google Sheets - SIMPLE VERSION
 def get_google_sheet_connection():
     """
@@ -284,13 +524,14 @@ def get_google_sheet_connection():
         except Exception:
             pass
 
-        # 2) Fallback ke  credentials.json (untuk lokal)
-        if credentials is None:
+        # 2) Fallback ke  credentials.json (untuk lokal); server Sheets palsu tidak butuh kredensial
+        if credentials is None and not SHEETS_API_BASE_URL:
             credentials_path = os.path.join(os.path.dirname(__file__), "credentials.json")
             if not os.path.exists(credentials_path):
                 raise FileNotFoundError(f"File credentials.json tidak ditemukan di: {credentials_path}")
             credentials = Credentials.from_service_account_file(credentials_path, scopes=SCOPE)
-        gc = gspread.authorize(credentials)
+        # Client dengan retry/backoff + token bucket kuota (sheets_client)
+        gc = authorize_sheets_client(credentials)
         
         # Buka spreadsheet
         spreadsheet = gc.open_by_key(SPREADSHEET_ID)
@@ -302,14 +543,32 @@ def get_google_sheet_connection():
         logger.error(f"❌ Error connecting to Google Sheet: {str(e)}")
         raise Exception(f"Gagal koneksi ke Google Sheet: {str(e)}")
 
-# Initialize connection
-try:
-    sh = get_google_sheet_connection()
-    logger.info("✅ Koneksi Google Sheet berhasil diinisialisasi")
-except Exception as e:
-    sh = None
-    logger.warning(f"⚠️ Google Sheet connection failed: {str(e)}")
-    logger.info("ℹ️ Koneksi akan dicoba ulang saat dibutuhkan")
+# Spreadsheet bersama per proses; dibuka lazy saat pertama dibutuhkan (bukan saat import)
+sh = None
+_spreadsheet_lock = threading.Lock()
+
+
+def get_spreadsheet():
+    """
+    Spreadsheet bersama untuk semua sesi dalam satu proses. Koneksi (sesi HTTP terotorisasi)
+    dibuat sekali; jika gagal, percobaan berikutnya membuka ulang.
+    """
+    global sh
+    if sh is None:
+        with _spreadsheet_lock:
+            if sh is None:
+                sh = get_google_sheet_connection()
+    return sh
+
+
+def get_sheets_request_stats() -> Dict[str, Any]:
+    """Counter request/retry/throttle klien Sheets (kosong jika belum terkoneksi)."""
+    spreadsheet = sh
+    http_client = getattr(spreadsheet, "client", None)
+    if isinstance(http_client, QuotaAwareHTTPClient):
+        return http_client.get_stats()
+    return {}
+
 
 def standardize_date_format(date_val: Any) -> str:
     """
@@ -335,7 +594,7 @@ def standardize_date_format(date_val: Any) -> str:
     date_str = str(date_val).strip()
     
     # Skip jika sudah kosong atau placeholder
-    if date_str.lower() in ['', 'nan', 'none', 'null', '-', 'n/a']:
+    if date_str.lower() in DATE_PLACEHOLDERS:
         return ""
     
     try:
@@ -360,7 +619,7 @@ def standardize_date_format(date_val: Any) -> str:
         # Case 3: ISO format with time (YYYY-MM-DD HH:MM:SS)
         if 'T' in date_str or len(date_str) > 10:
             # Try parsing ISO format first
-            for fmt in ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f']:
+            for fmt in ISO_DATETIME_FORMATS:
                 try:
                     parsed_date = datetime.strptime(date_str, fmt)
                     return parsed_date.strftime(STANDARD_DATE_FORMAT)
@@ -368,24 +627,7 @@ def standardize_date_format(date_val: Any) -> str:
                     continue
         
         # Case 4: Common date formats
-        date_formats = [
-            # DD/MM/YYYY variants
-            '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
-            # MM/DD/YYYY variants  
-            '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',
-            # YYYY/MM/DD variants
-            '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',
-            # DD/MM/YY variants (2-digit year)
-            '%d/%m/%y', '%d-%m-%y', '%d.%m.%y',
-            # MM/DD/YY variants
-            '%m/%d/%y', '%m-%d-%y', '%m.%d.%y',
-            # Indonesian format variants
-            '%d %m %Y', '%d %m %y',
-            # Other common formats
-            '%Y%m%d', '%d%m%Y'
-        ]
-        
-        for fmt in date_formats:
+        for fmt in DATE_INPUT_FORMATS:
             try:
                 parsed_date = datetime.strptime(date_str, fmt)
                 
@@ -417,6 +659,171 @@ def standardize_date_format(date_val: Any) -> str:
         return ""
 
 
+# Pola "bentuk" token strptime. Sengaja lebih longgar dari regex strptime sendiri,
+# sehingga string yang bisa diparsing sebuah format PASTI cocok dengan pola bentuknya.
+_STRPTIME_SHAPE_TOKENS = {
+    '%d': r'\s?\d{1,2}', '%m': r'\s?\d{1,2}', '%H': r'\s?\d{1,2}',
+    '%M': r'\s?\d{1,2}', '%S': r'\s?\d{1,2}', '%Y': r'\d{4}', '%y': r'\d{2}',
+    '%f': r'\d{1,6}',
+}
+
+
+def _compile_date_shape(fmt: str) -> re.Pattern:
+    """Ubah format strptime menjadi regex bentuk (digit/pemisah) untuk sniffing."""
+    parts = []
+    for token in re.findall(r'%.|\s+|.', fmt):
+        if token in _STRPTIME_SHAPE_TOKENS:
+            parts.append(_STRPTIME_SHAPE_TOKENS[token])
+        elif token.isspace():
+            parts.append(r'\s+')
+        else:
+            parts.append(re.escape(token))
+    return re.compile(''.join(parts), re.IGNORECASE)
+
+
+_DATE_FORMAT_SHAPES = {
+    fmt: _compile_date_shape(fmt) for fmt in ISO_DATETIME_FORMATS + DATE_INPUT_FORMATS
+}
+
+
+def _format_parsed_dates(parsed: pd.Series, two_digit_year_fix: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Format hasil parsing ke YYYY-MM-DD.
+    Returns (nilai string, mask baris yang aman dipakai); tahun < 1000 diserahkan ke versi per-sel.
+    """
+    years = parsed.dt.year.to_numpy()
+    valid_year = years >= 1  # strptime menolak tahun 0
+    formatted = parsed.dt.strftime(STANDARD_DATE_FORMAT).to_numpy(dtype=object)
+    short_year = years < 1000
+    if short_year.any():
+        # strftime tidak selalu mem-padding tahun < 1000, susun manual dari komponennya
+        months = parsed.dt.month.to_numpy()[short_year]
+        days = parsed.dt.day.to_numpy()[short_year]
+        formatted[short_year] = [
+            f"{year:04d}-{month:02d}-{day:02d}" for year, month, day in zip(years[short_year], months, days)
+        ]
+    if two_digit_year_fix:
+        # Sama seperti versi per-sel: tahun < 1950 dianggap tahun 2 digit -> 20xx
+        low_year = years < 1950
+        if low_year.any():
+            years = np.where(low_year, years + 2000, years)
+            formatted[low_year] = [
+                f"{year:04d}{text[4:]}" for year, text in zip(years[low_year], formatted[low_year])
+            ]
+    return formatted, valid_year & (years >= 1000)
+
+
+def standardize_date_series(series: pd.Series) -> pd.Series:
+    """
+    Versi vectorized dari standardize_date_format untuk satu kolom penuh.
+
+    Urutan kasus sama persis dengan versi per-sel (ISO, serial Excel, ISO dengan jam,
+    lalu DATE_INPUT_FORMATS berurutan), tetapi tiap format diparsing sekaligus dengan
+    pd.to_datetime(format=...). Bentuk nilai (digit/pemisah) di-sniff dulu sehingga
+    sebuah format hanya dicoba pada baris yang mungkin cocok. Baris yang tidak
+    terselesaikan diserahkan ke standardize_date_format agar hasilnya identik.
+    """
+    result = np.full(len(series), "", dtype=object)
+    if len(series) == 0:
+        return pd.Series(result, index=series.index, name=series.name)
+
+    text = series.astype(str).str.strip()
+    values = text.to_numpy(dtype=object)
+    pending = ~series.isna().to_numpy() & ~text.str.lower().isin(DATE_PLACEHOLDERS).to_numpy()
+    fallback = np.zeros(len(series), dtype=bool)
+
+    def resolve(positions: np.ndarray, formatted: np.ndarray, usable: np.ndarray) -> None:
+        result[positions[usable]] = formatted[usable]
+        fallback[positions[~usable]] = True
+        pending[positions] = False
+
+    # Case 1: Sudah dalam format standard YYYY-MM-DD (tanggal invalid -> versi per-sel)
+    candidates = pending & text.str.fullmatch(r'\d{4}-\d{2}-\d{2}').to_numpy(dtype=bool)
+    if candidates.any():
+        positions = np.flatnonzero(candidates)
+        parsed = pd.to_datetime(text.iloc[positions], format=STANDARD_DATE_FORMAT, errors='coerce')
+        resolve(positions, values[positions], (parsed.dt.year >= 1000).to_numpy())
+
+    # Case 2: Excel date serial number, dikonversi dengan aritmatika sekaligus
+    if pending.any():
+        digit_like = (
+            text.str.replace('.', '', regex=False).str.replace('-', '', regex=False).str.isdigit()
+        )
+        candidates = pending & digit_like.to_numpy(dtype=bool)
+        if candidates.any():
+            positions = np.flatnonzero(candidates)
+            serials = pd.to_numeric(text.iloc[positions], errors='coerce').to_numpy(dtype=float)
+            in_range = (serials >= 1) & (serials <= 100000)
+            if in_range.any():
+                positions = positions[in_range]
+                parsed = pd.Series(pd.to_datetime(serials[in_range], origin='1899-12-30', unit='D'))
+                formatted, usable = _format_parsed_dates(parsed, two_digit_year_fix=False)
+                resolve(positions, formatted, usable)
+
+    if not pending.any():
+        return pd.Series(result, index=series.index, name=series.name)
+
+    # Sniff bentuk nilai sekali, lalu tentukan format mana yang mungkin cocok per bentuk
+    shape_codes, shapes = pd.factorize(text.str.replace(r'\d', '9', regex=True))
+    long_or_time = (text.str.contains('T', regex=False) | (text.str.len() > 10)).to_numpy(dtype=bool)
+    leap_seconds = text.str.contains(r':6[01](?:\.\d*)?$').to_numpy(dtype=bool)
+
+    stages = [(fmt, long_or_time, False) for fmt in ISO_DATETIME_FORMATS]
+    stages += [(fmt, None, True) for fmt in DATE_INPUT_FORMATS]
+    for fmt, eligible, two_digit_year_fix in stages:
+        pattern = _DATE_FORMAT_SHAPES[fmt]
+        shape_ok = np.fromiter((pattern.fullmatch(shape) is not None for shape in shapes),
+                               dtype=bool, count=len(shapes))
+        candidates = pending & shape_ok[shape_codes]
+        if eligible is not None:
+            candidates &= eligible
+        if not candidates.any():
+            continue
+        if '%S' in fmt:
+            # strptime mengenali detik 60/61 tetapi datetime menolaknya -> versi per-sel
+            leap_second = candidates & leap_seconds
+            fallback |= leap_second
+            pending &= ~leap_second
+            candidates &= ~leap_second
+        positions = np.flatnonzero(candidates)
+        parsed = pd.to_datetime(text.iloc[positions], format=fmt, errors='coerce')
+        parsed_ok = parsed.notna().to_numpy()
+        if not parsed_ok.any():
+            continue
+        positions = positions[parsed_ok]
+        formatted, usable = _format_parsed_dates(parsed[parsed_ok], two_digit_year_fix)
+        resolve(positions, formatted, usable)
+        if not pending.any():
+            break
+
+    # Sisa (Case 5 dan nilai yang tidak bisa diparsing) memakai versi per-sel
+    leftovers = np.flatnonzero(pending | fallback)
+    if len(leftovers):
+        result[leftovers] = [standardize_date_format(value) for value in series.iloc[leftovers]]
+
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def get_comparison_normalizer(column: str) -> Callable[[Any], str]:
+    """
+    Pilih fungsi normalisasi yang dipakai untuk membandingkan isi sebuah kolom.
+    Dipakai bersama oleh are_rows_identical dan sync engine agar aturannya sama.
+    """
+    col_upper = column.upper()
+    if 'LOKASI' in col_upper or 'ALAMAT' in col_upper:
+        return normalize_location_name
+    elif 'INSPEKTUR' in col_upper or 'PETUGAS' in col_upper:
+        return normalize_inspector_name
+    elif 'EQUIPMENT' in col_upper or 'ASET' in col_upper or 'PERALATAN' in col_upper:
+        return normalize_equipment_name
+    elif 'STATUS EKSEKUSI' in col_upper or 'STATUS PEKERJAAN' in col_upper:
+        return normalize_status_execution
+    elif 'STATUS ASET' in col_upper or 'KONDISI' in col_upper:
+        return normalize_asset_status
+    # Gunakan normalisasi umum untuk kolom lainnya
+    return normalize_text_advanced
+
+
 def are_rows_identical(row1: pd.Series, row2: pd.Series) -> bool:
     """
     CASE 4: Membandingkan SEMUA kolom validasi apakah identik persis.
@@ -437,26 +844,9 @@ def are_rows_identical(row1: pd.Series, row2: pd.Series) -> bool:
             raw_val2 = row2[col] if pd.notna(row2[col]) else ""
             
             # Tentukan fungsi normalisasi yang sesuai berdasarkan nama kolom
-            col_upper = col.upper()
-            if 'LOKASI' in col_upper or 'ALAMAT' in col_upper:
-                val1 = normalize_location_name(raw_val1)
-                val2 = normalize_location_name(raw_val2)
-            elif 'INSPEKTUR' in col_upper or 'PETUGAS' in col_upper:
-                val1 = normalize_inspector_name(raw_val1)
-                val2 = normalize_inspector_name(raw_val2)
-            elif 'EQUIPMENT' in col_upper or 'ASET' in col_upper or 'PERALATAN' in col_upper:
-                val1 = normalize_equipment_name(raw_val1)
-                val2 = normalize_equipment_name(raw_val2)
-            elif 'STATUS EKSEKUSI' in col_upper or 'STATUS PEKERJAAN' in col_upper:
-                val1 = normalize_status_execution(raw_val1)
-                val2 = normalize_status_execution(raw_val2)
-            elif 'STATUS ASET' in col_upper or 'KONDISI' in col_upper:
-                val1 = normalize_asset_status(raw_val1)
-                val2 = normalize_asset_status(raw_val2)
-            else:
-                # Gunakan normalisasi umum untuk kolom lainnya
-                val1 = normalize_text_advanced(raw_val1)
-                val2 = normalize_text_advanced(raw_val2)
+            normalizer = get_comparison_normalizer(col)
+            val1 = normalizer(raw_val1)
+            val2 = normalizer(raw_val2)
             
             if val1 != val2:
                 return False  # Ada perbedaan setelah normalisasi
@@ -664,6 +1054,10 @@ def normalize_location_name(text: str) -> str:
     
     return normalized
 
+# Gelar akademik/profesi yang dihapus dari nama inspektur (urutan dipertahankan)
+ACADEMIC_TITLES = ['IR.', 'IR', 'S.T.', 'ST.', 'ST', 'S.KOM.', 'S.KOM', ',S.T', ',ST', ',S.KOM', 'MT', 'M.T.']
+_ACADEMIC_TITLE_PATTERNS = [re.compile(r'\b' + re.escape(title) + r'\b') for title in ACADEMIC_TITLES]
+
 def normalize_inspector_name(name: str) -> str:
     """
     Normalisasi nama inspektur untuk menghindari duplikasi data.
@@ -694,13 +1088,9 @@ def normalize_inspector_name(name: str) -> str:
             continue
         break  # Stop setelah replacement pertama
     
-    # Hapus gelar akademik/profesi (tapi normalisasi dulu)
-    academic_titles = ['IR.', 'IR', 'S.T.', 'ST.', 'ST', 'S.KOM.', 'S.KOM', ',S.T', ',ST', ',S.KOM', 'MT', 'M.T.']
-    for title in academic_titles:
-        import re
-        # Remove with word boundary
-        pattern = r'\b' + re.escape(title) + r'\b'
-        normalized = re.sub(pattern, '', normalized)
+    # Hapus gelar akademik/profesi (tapi normalisasi dulu) - pola sudah dikompilasi
+    for pattern in _ACADEMIC_TITLE_PATTERNS:
+        normalized = pattern.sub('', normalized)
     
     # Bersihkan spasi berlebih
     normalized = ' '.join(normalized.split())
@@ -773,18 +1163,19 @@ def apply_comprehensive_normalization(df: pd.DataFrame) -> pd.DataFrame:
         'PROGRAM': normalize_text_advanced,
     }
     
-    # Apply normalization untuk setiap kolom yang ada di DataFrame
-    for column in df_normalized.columns:
-        if column in normalization_mapping:
-            try:
-                print(f"Normalizing column: {column}")
-                df_normalized[column] = df_normalized[column].apply(
-                    normalization_mapping[column]
-                )
-            except Exception as e:
-                print(f"Warning: Error normalizing column {column}: {e}")
-                # Jika error, tetap gunakan nilai asli
-                continue
+    # Apply normalization untuk setiap kolom yang ada di DataFrame (paralel untuk data besar)
+    columns = [column for column in df_normalized.columns if column in normalization_mapping]
+    for column in columns:
+        print(f"Normalizing column: {column}")
+    results, errors = normalize_series_batch(
+        {column: (df_normalized[column], normalization_mapping[column]) for column in columns}
+    )
+    for column in columns:
+        if column in errors:
+            print(f"Warning: Error normalizing column {column}: {errors[column]}")
+            # Jika error, tetap gunakan nilai asli
+            continue
+        df_normalized[column] = results[column]
     
     return df_normalized
 
@@ -807,16 +1198,21 @@ def preprocess_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     
     # Normalisasi minimal hanya untuk keperluan pencarian duplikat
-    if 'NAMA INSPEKTOR' in df.columns:
-        df['_NAMA_INSPEKTOR_NORM'] = df['NAMA INSPEKTOR'].apply(normalize_inspector_name)
-    if 'NAMA INSPEKTOR HAR' in df.columns:
-        df['_NAMA_INSPEKTOR_HAR_NORM'] = df['NAMA INSPEKTOR HAR'].apply(normalize_inspector_name)
-    
-    if 'NAMA ASET' in df.columns:
-        df['_NAMA_ASET_NORM'] = df['NAMA ASET'].apply(normalize_asset_name)
-    
-    if 'PENUNJUK LOC' in df.columns:
-        df['_PENUNJUK_LOC_NORM'] = df['PENUNJUK LOC'].apply(normalize_location_name)
+    helper_columns = {
+        '_NAMA_INSPEKTOR_NORM': ('NAMA INSPEKTOR', normalize_inspector_name),
+        '_NAMA_INSPEKTOR_HAR_NORM': ('NAMA INSPEKTOR HAR', normalize_inspector_name),
+        '_NAMA_ASET_NORM': ('NAMA ASET', normalize_asset_name),
+        '_PENUNJUK_LOC_NORM': ('PENUNJUK LOC', normalize_location_name),
+    }
+    results, errors = normalize_series_batch({
+        target: (df[source], func)
+        for target, (source, func) in helper_columns.items()
+        if source in df.columns
+    })
+    if errors:
+        raise ValueError(f"Gagal normalisasi kolom: {errors}")
+    for target, series in results.items():
+        df[target] = series
     
     # Bersihkan nilai NaN menjadi string kosong
     return df.fillna("")
@@ -838,6 +1234,92 @@ def validate_sheet_structure(df: pd.DataFrame) -> Tuple[bool, str]:
     
     return True, "Validasi berhasil"
 
+def select_upload_sheets(headers: Dict[str, List[str]]) -> List[str]:
+    """
+    Pilih sheet upload streaming dari header-nya (nama sheet -> nama kolom) dengan aturan
+    yang sama dengan load_upload_frame: hanya ID SURVEY yang wajib. Sheet tanpa ID SURVEY
+    dilewati (di mode biasa barisnya terbuang karena ID SURVEY kosong); kolom lain yang
+    tidak ada diisi kosong seperti di mode biasa.
+    
+    Raises:
+        ValueError: tidak ada sheet dengan kolom ID SURVEY
+    """
+    selected = []
+    for sheet_name, columns in headers.items():
+        if "ID SURVEY" not in columns:
+            print(f"⚠️ Sheet {sheet_name}: kolom ID SURVEY tidak ditemukan, sheet dilewati")
+            continue
+        selected.append(sheet_name)
+    if not selected:
+        raise ValueError("Kolom 'ID SURVEY' tidak ditemukan!")
+    return selected
+
+def process_master_values(
+    headers: List[str], rows: List[List[str]], row_numbers: List[int] | None = None
+) -> pd.DataFrame:
+    """
+    Ubah nilai mentah MasterData (list baris) menjadi DataFrame yang sudah diproses.
+    
+    Args:
+        headers: Header sheet (baris 1)
+        rows: Baris data
+        row_numbers: Nomor baris sheet tiap baris (default: baris 2, 3, ...). Index hasil
+            selalu nomor baris sheet - 2, sehingga potongan hasil range read bisa digabung
+            dengan frame hasil baca penuh.
+    """
+    if row_numbers is None:
+        index = pd.RangeIndex(len(rows))
+    else:
+        index = pd.Index([row_num - 2 for row_num in row_numbers], dtype="int64")
+    # Samakan panjang baris dengan header (respons range read tidak di-pad)
+    width = len(headers)
+    rows = [list(row[:width]) + [''] * (width - len(row)) for row in rows]
+    df = pd.DataFrame(rows, columns=headers, index=index)
+    # Kolom versi baris hanya untuk refresh inkremental, tidak ikut ke frame
+    df = df.drop(columns=[ROW_VERSION_COLUMN], errors='ignore')
+    df.attrs["master_header"] = list(headers)
+    
+    if df.empty:
+        return df
+    
+    # Optimasi: Proses hanya kolom yang diperlukan untuk performa
+    essential_columns = [
+        'NO', 'ID SURVEY', 'UP3', 'ULP', 'NAMA PENYULANG', 'EQUIPMENT', 
+        'JENIS TEMUAN', 'STATUS EKSEKUSI', 'TANGGAL SURVEY', 'TANGGAL WO', 
+        'TANGGAL HAR', 'NAMA ASET', 'NAMA INSPEKTOR'
+    ]
+    
+    # MINIMAL PROCESSING - PERTAHANKAN FORMAT ASLI DATA
+    for col in df.columns:
+        if col in essential_columns:
+            if col in ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']:
+                # Koordinat: hanya bersihkan tanpa mengubah format
+                df[col] = df[col].astype(str).apply(clean_coordinate)
+            elif col in DATE_COLUMNS:
+                # Tanggal: HANYA standardisasi untuk dashboard (diperlukan sistem)
+                df[col] = standardize_date_series(df[col])
+            else:
+                # Kolom lain: HANYA strip spasi, TIDAK mengubah konten
+                df[col] = df[col].astype(str).str.strip()
+                # JANGAN replace empty string - biarkan nilai asli
+        else:
+            # Kolom non-essential: MINIMAL processing - hanya konversi ke string
+            df[col] = df[col].astype(str)
+    
+    # NORMALISASI DATA UNTUK MENCEGAH DUPLIKASI
+    # Terapkan normalisasi comprehensive hanya pada kolom yang perlu
+    df = apply_targeted_normalization(df)
+    
+    # Tambahkan kolom NO jika tidak ada (nomor urut = posisi baris data)
+    if "NO" not in df.columns:
+        df.insert(0, "NO", df.index + 1)
+    
+    # Hapus baris kosong
+    df = df.dropna(how='all')
+    df = df[df.apply(lambda x: x.str.strip().ne('').any(), axis=1)]
+    df.attrs["master_header"] = list(headers)
+    return df
+
 def read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
     """
     Baca data master dari Google Sheets.
@@ -847,9 +1329,7 @@ def read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
     """
     try:
         # Initialize connection if needed
-        global sh
-        if sh is None:
-            sh = get_google_sheet_connection()
+        sh = get_spreadsheet()
         
         worksheet = sh.worksheet(MASTER_SHEET_NAME)
         
@@ -862,51 +1342,7 @@ def read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
         if not data:
             return pd.DataFrame()
         
-        # Buat DataFrame dengan header dari baris pertama
-        headers = data[0]
-        rows = data[1:]
-        
-        if not rows:  # Jika tidak ada data setelah header
-            return pd.DataFrame(columns=headers)
-        
-        df = pd.DataFrame(rows, columns=headers)
-        
-        # Optimasi: Proses hanya kolom yang diperlukan untuk performa
-        essential_columns = [
-            'NO', 'ID SURVEY', 'UP3', 'ULP', 'NAMA PENYULANG', 'EQUIPMENT', 
-            'JENIS TEMUAN', 'STATUS EKSEKUSI', 'TANGGAL SURVEY', 'TANGGAL WO', 
-            'TANGGAL HAR', 'NAMA ASET', 'NAMA INSPEKTOR'
-        ]
-        
-        # MINIMAL PROCESSING - PERTAHANKAN FORMAT ASLI DATA
-        for col in df.columns:
-            if col in essential_columns:
-                if col in ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']:
-                    # Koordinat: hanya bersihkan tanpa mengubah format
-                    df[col] = df[col].astype(str).apply(clean_coordinate)
-                elif col in DATE_COLUMNS:
-                    # Tanggal: HANYA standardisasi untuk dashboard (diperlukan sistem)
-                    df[col] = df[col].apply(standardize_date_format)
-                else:
-                    # Kolom lain: HANYA strip spasi, TIDAK mengubah konten
-                    df[col] = df[col].astype(str).str.strip()
-                    # JANGAN replace empty string - biarkan nilai asli
-            else:
-                # Kolom non-essential: MINIMAL processing - hanya konversi ke string
-                df[col] = df[col].astype(str)
-        
-        # NORMALISASI DATA UNTUK MENCEGAH DUPLIKASI
-        # Terapkan normalisasi comprehensive hanya pada kolom yang perlu
-        df = apply_targeted_normalization(df)
-        
-        # Tambahkan kolom NO jika tidak ada
-        if not df.empty and "NO" not in df.columns:
-            df.insert(0, "NO", range(1, len(df) + 1))
-        
-        # Hapus baris kosong
-        df = df.dropna(how='all')
-        df = df[df.apply(lambda x: x.str.strip().ne('').any(), axis=1)]
-        
+        df = process_master_values(data[0], data[1:])
         print(f"📊 Data loaded: {len(df)} records")
         
         return df
@@ -914,33 +1350,415 @@ def read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
     except Exception as e:
         raise Exception(f"Gagal membaca data master: {str(e)}")
 
-# Lightweight cache wrapper to avoid repeated Google Sheets fetches across pages/reruns
-@st.cache_data(ttl=60, show_spinner=False)
-def cached_read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
+# ===== VERSI BARIS MASTERDATA (REFRESH INKREMENTAL) =====
+# Kolom tersembunyi paling kanan MasterData: versi terakhir yang menulis baris tersebut
+ROW_VERSION_COLUMN = "_ROW_VERSION"
+# Sheet meta: baris 1 = ["VERSION", v, "EPOCH", e], baris 2 = header jurnal, lalu satu entri per versi.
+# REVISION = revisi spreadsheet tepat sebelum penulisan, GRID_ROWS = jumlah baris grid MasterData
+# setelah penulisan; keduanya dipakai reader untuk mendeteksi edit langsung di sela penulisan aplikasi
+MASTER_JOURNAL_HEADER = ["VERSION", "APPEND_FROM", "APPEND_TO", "UPDATED_ROWS", "WAKTU", "REVISION", "GRID_ROWS"]
+MASTER_JOURNAL_LAST_COL = gspread.utils.rowcol_to_a1(1, len(MASTER_JOURNAL_HEADER)).rstrip("1")
+# Entri jurnal untuk versi v ada di baris v + MASTER_JOURNAL_OFFSET
+MASTER_JOURNAL_OFFSET = 2
+
+
+def get_master_meta_worksheet(create: bool = False):
     """
-    Cached wrapper over read_master_data to speed up page switches and initial load.
-    TTL ensures external edits are picked up periodically or can be cleared on upload.
+    Ambil sheet meta versi MasterData. Jika belum ada: buat sheet tersembunyi dengan
+    versi 0 saat create=True, selain itu return None.
     """
-    return read_master_data(limit_rows)
+    sh = get_spreadsheet()
+    try:
+        return sh.worksheet(MASTER_META_SHEET_NAME)
+    except gspread.exceptions.WorksheetNotFound:
+        if not create:
+            return None
+    meta_ws = sh.add_worksheet(MASTER_META_SHEET_NAME, rows=100, cols=len(MASTER_JOURNAL_HEADER))
+    meta_ws.update([["VERSION", 0, "EPOCH", 0], MASTER_JOURNAL_HEADER], "A1", value_input_option="RAW")
+    meta_ws.hide()
+    return meta_ws
 
-def apply_targeted_normalization(df: pd.DataFrame) -> pd.DataFrame:
+
+def read_master_version(meta_ws=None) -> Dict[str, int] | None:
     """
-    Aplikasikan normalisasi secara targeted untuk mencegah duplikasi tanpa mengubah data asli.
-    Hanya normalisasi kolom yang memang perlu untuk konsistensi data.
+    Baca versi dan epoch MasterData dari sheet meta (satu range A1:D1).
+    Versi naik setiap penulisan lewat aplikasi; epoch naik jika posisi baris bergeser
+    (hapus baris) sehingga jurnal sebelumnya tidak bisa dipakai lagi.
     
-    Args:
-        df: DataFrame yang akan dinormalisasi
-        
     Returns:
-        pd.DataFrame: DataFrame dengan kolom tertentu yang sudah dinormalisasi
+        {"version": int, "epoch": int} atau None jika sheet meta belum ada / gagal dibaca
     """
-    if df.empty:
-        return df
+    try:
+        if meta_ws is None:
+            meta_ws = get_master_meta_worksheet()
+        if meta_ws is None:
+            return None
+        values = meta_ws.get_values("A1:D1")
+        row = values[0] if values else []
+        return {"version": int(row[1]), "epoch": int(row[3])}
+    except Exception as e:
+        logger.warning(f"⚠️ Gagal membaca versi MasterData: {str(e)}")
+        return None
+
+
+def open_master_version() -> Tuple[Any, Dict[str, int] | None]:
+    """
+    Siapkan penulisan versi baru: (sheet meta, versi saat ini). Kegagalan tidak
+    menggagalkan penulisan data; reader akan jatuh ke baca penuh via revisi spreadsheet.
+    """
+    try:
+        meta_ws = get_master_meta_worksheet(create=True)
+        return meta_ws, read_master_version(meta_ws) or {"version": 0, "epoch": 0}
+    except Exception as e:
+        logger.warning(f"⚠️ Sheet meta versi MasterData tidak tersedia: {str(e)}")
+        return None, None
+
+
+def row_ranges(row_numbers) -> List[List[int]]:
+    """Gabungkan nomor baris menjadi rentang berurutan [[awal, akhir], ...]."""
+    ranges = []
+    for row_num in sorted(set(row_numbers)):
+        if ranges and row_num == ranges[-1][1] + 1:
+            ranges[-1][1] = row_num
+        else:
+            ranges.append([row_num, row_num])
+    return ranges
+
+
+def format_row_ranges(row_numbers) -> str:
+    """Nomor baris -> teks ringkas untuk jurnal, mis. [5, 6, 7, 10] -> "5-7,10"."""
+    return ",".join(
+        str(start_row) if start_row == end_row else f"{start_row}-{end_row}"
+        for start_row, end_row in row_ranges(row_numbers)
+    )
+
+
+def parse_row_ranges(text: str) -> List[int]:
+    """Kebalikan format_row_ranges: "5-7,10" -> [5, 6, 7, 10]."""
+    row_numbers = []
+    for part in str(text).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_row, _, end_row = part.partition("-")
+        row_numbers.extend(range(int(start_row), int(end_row or start_row) + 1))
+    return row_numbers
+
+
+def record_master_change(
+    meta_ws,
+    current: Dict[str, int],
+    appended: Tuple[int, int] | None = None,
+    updated_rows: List[int] | None = None,
+    structural: bool = False,
+    revision: str | None = None,
+    grid_rows: int | None = None,
+) -> int:
+    """
+    Catat versi baru (current["version"] + 1) di sheet meta: entri jurnal berisi rentang
+    baris yang di-append dan baris yang di-update, lalu versi/epoch di baris 1.
     
-    # Buat copy untuk menghindari SettingWithCopyWarning
-    df_normalized = df.copy()
+    Args:
+        structural: True jika posisi baris bergeser (hapus baris) -> epoch naik
+        revision: Revisi spreadsheet yang terlihat tepat sebelum penulisan
+        grid_rows: Jumlah baris grid MasterData setelah penulisan
     
-    # Mapping kolom yang WAJIB dinormalisasi untuk mencegah duplikasi
+    Returns:
+        int: Versi baru
+    """
+    version = current["version"] + 1
+    epoch = current["epoch"] + (1 if structural else 0)
+    journal_row = version + MASTER_JOURNAL_OFFSET
+    if journal_row > meta_ws.row_count:
+        meta_ws.add_rows(max(100, journal_row - meta_ws.row_count))
+    append_from, append_to = appended if appended else ("", "")
+    data = [
+        {
+            "range": f"A{journal_row}:{MASTER_JOURNAL_LAST_COL}{journal_row}",
+            "values": [[
+                version, append_from, append_to, format_row_ranges(updated_rows or []),
+                datetime.now().isoformat(timespec="seconds"),
+                revision or "", "" if grid_rows is None else grid_rows,
+            ]],
+        },
+        {"range": "A1:D1", "values": [["VERSION", version, "EPOCH", epoch]]},
+    ]
+    # Sheet meta lama (jurnal 5 kolom) -> tambah kolom dan perbarui header jurnal
+    if meta_ws.col_count < len(MASTER_JOURNAL_HEADER):
+        meta_ws.add_cols(len(MASTER_JOURNAL_HEADER) - meta_ws.col_count)
+        data.append({"range": f"A2:{MASTER_JOURNAL_LAST_COL}2", "values": [MASTER_JOURNAL_HEADER]})
+    meta_ws.batch_update(data, value_input_option="RAW")
+    return version
+
+
+def read_master_changes(
+    snapshot_df: pd.DataFrame, meta: Dict[str, Any], version_info: Dict[str, int]
+) -> pd.DataFrame | None:
+    """
+    Perbarui frame snapshot dengan baris yang berubah sejak versi snapshot.
+    Yang di-fetch hanya entri jurnal versi baru dan baris yang tercatat di jurnal
+    (satu batch_get berisi range per rentang baris), bukan seluruh sheet.
+    
+    Jurnal hanya dipakai jika tidak ada edit langsung di sheet yang terselip:
+    - entri pertama ditulis tepat di atas revisi snapshot (REVISION = revisi snapshot)
+    - jumlah baris grid bersambung antar entri (GRID_ROWS sebelumnya + baris append)
+      dan sama dengan jumlah baris grid MasterData sekarang (hapus/sisip baris dari luar)
+    
+    Returns:
+        Frame hasil merge, atau None jika jurnal tidak bisa dipakai (epoch berbeda,
+        entri hilang, rantai revisi/jumlah baris putus) sehingga caller harus baca penuh.
+    """
+    header = meta.get("header")
+    start_version = meta.get("version")
+    end_version = version_info["version"]
+    if not header or start_version is None or meta.get("epoch") != version_info["epoch"]:
+        return None
+    if end_version <= start_version:
+        return None
+    
+    meta_ws = get_master_meta_worksheet()
+    entries = meta_ws.get_values(
+        f"A{start_version + 1 + MASTER_JOURNAL_OFFSET}:"
+        f"{MASTER_JOURNAL_LAST_COL}{end_version + MASTER_JOURNAL_OFFSET}"
+    )
+    if len(entries) != end_version - start_version:
+        return None
+    
+    row_numbers = set()
+    grid_rows = None
+    for expected_version, entry in enumerate(entries, start=start_version + 1):
+        entry = [str(value).strip() for value in entry]
+        entry += [""] * (len(MASTER_JOURNAL_HEADER) - len(entry))
+        if entry[0] != str(expected_version) or not entry[6]:
+            return None
+        if expected_version == start_version + 1 and (not meta.get("revision") or entry[5] != meta["revision"]):
+            print(f"🔀 Sheet diubah di luar aplikasi sebelum v{expected_version}, jurnal tidak dipakai")
+            return None
+        appended_rows = 0
+        if entry[1] and entry[2]:
+            row_numbers.update(range(int(entry[1]), int(entry[2]) + 1))
+            appended_rows = int(entry[2]) - int(entry[1]) + 1
+        if grid_rows is not None and int(entry[6]) - appended_rows != grid_rows:
+            print(f"🔀 Jumlah baris MasterData berubah di luar aplikasi sebelum v{expected_version}")
+            return None
+        grid_rows = int(entry[6])
+        row_numbers.update(parse_row_ranges(entry[3]))
+    
+    worksheet = get_spreadsheet().worksheet(MASTER_SHEET_NAME)
+    if worksheet.row_count != grid_rows:
+        print(f"🔀 Jumlah baris MasterData ({worksheet.row_count}) berbeda dengan jurnal ({grid_rows})")
+        return None
+    if not row_numbers:
+        return snapshot_df
+    
+    ranges = row_ranges(row_numbers)
+    last_col = gspread.utils.rowcol_to_a1(1, len(header)).rstrip("1")
+    blocks = worksheet.batch_get([f"A{start_row}:{last_col}{end_row}" for start_row, end_row in ranges])
+    
+    rows, fetched_rows = [], []
+    for (start_row, end_row), block in zip(ranges, blocks):
+        for offset, row_num in enumerate(range(start_row, end_row + 1)):
+            rows.append(block[offset] if offset < len(block) else [])
+            fetched_rows.append(row_num)
+    changed_df = process_master_values(header, rows, fetched_rows)
+    
+    # Baris yang di-fetch menggantikan versi lamanya (baris yang kini kosong ikut terhapus)
+    stale_index = [row_num - 2 for row_num in fetched_rows]
+    merged = pd.concat([snapshot_df.drop(index=stale_index, errors="ignore"), changed_df]).sort_index()
+    print(f"🔁 Refresh inkremental v{start_version}→v{end_version}: {len(fetched_rows)} baris di-fetch")
+    return merged
+
+
+# ===== SNAPSHOT LOKAL MASTERDATA =====
+# Worker upload (commit_sync_session) dan refresh dashboard bisa menyimpan snapshot bersamaan;
+# lock menjaga pasangan Parquet + metadata tetap berasal dari penulis yang sama
+_snapshot_lock = threading.Lock()
+
+
+def _write_snapshot_file(path: str, write: Callable[[str], None]) -> None:
+    """Tulis ke file sementara unik di folder yang sama lalu os.replace (atomic) ke `path`."""
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_file)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def get_master_revision() -> str | None:
+    """
+    Ambil penanda revisi spreadsheet (modifiedTime dari Drive API).
+    Return None jika tidak bisa dibaca, sehingga snapshot dianggap stale.
+    """
+    try:
+        sh = get_spreadsheet()
+        return sh.get_lastUpdateTime()
+    except Exception as e:
+        logger.warning(f"⚠️ Gagal membaca revisi spreadsheet: {str(e)}")
+        return None
+
+
+def load_master_snapshot_meta() -> Dict[str, Any]:
+    """Baca metadata snapshot lokal (revisi, jumlah baris, waktu simpan)."""
+    try:
+        with open(MASTER_SNAPSHOT_META_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_master_snapshot(
+    df: pd.DataFrame,
+    revision: str | None,
+    version_info: Dict[str, int] | None = None,
+    header: List[str] | None = None,
+    full_read_at: str | None = None,
+) -> bool:
+    """
+    Simpan DataFrame master yang sudah diproses ke Parquet beserta metadata revisi.
+    Index ikut disimpan karena dipakai untuk memetakan baris ke nomor baris sheet.
+    Versi/epoch dan header sheet disimpan agar refresh berikutnya bisa inkremental.
+    Aman dipanggil dari beberapa thread: file sementara unik per penulis, ditulis di bawah lock.
+    """
+    def write_meta(path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        saved_at = datetime.now().isoformat(timespec="seconds")
+        meta = {
+            "revision": revision,
+            "rows": len(df),
+            "saved_at": saved_at,
+            "version": version_info["version"] if version_info else None,
+            "epoch": version_info["epoch"] if version_info else None,
+            "header": header or df.attrs.get("master_header"),
+            "full_read_at": full_read_at or saved_at,
+        }
+        with _snapshot_lock:
+            _write_snapshot_file(MASTER_SNAPSHOT_FILE, lambda path: df.to_parquet(path, index=True))
+            _write_snapshot_file(MASTER_SNAPSHOT_META_FILE, write_meta)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Gagal menyimpan snapshot master: {str(e)}")
+        return False
+
+
+def is_master_snapshot_stale(revision: str | None = None) -> bool:
+    """
+    Cek apakah snapshot lokal sudah tidak sesuai dengan revisi spreadsheet.
+    
+    Args:
+        revision: Revisi terbaru (None = ambil dari Google Sheets)
+    """
+    if not os.path.exists(MASTER_SNAPSHOT_FILE):
+        return True
+    if revision is None:
+        revision = get_master_revision()
+    meta = load_master_snapshot_meta()
+    return revision is None or meta.get("revision") != revision
+
+
+def rebuild_master_snapshot(revision: str | None = None) -> pd.DataFrame:
+    """Paksa baca ulang MasterData dari Google Sheets dan tulis ulang snapshot lokal."""
+    if revision is None:
+        revision = get_master_revision()
+    # Versi dibaca sebelum data: perubahan selama pembacaan akan di-fetch ulang berikutnya
+    version_info = read_master_version()
+    df = read_master_data()
+    save_master_snapshot(df, revision, version_info)
+    return df
+
+
+def is_full_refresh_due(meta: Dict[str, Any]) -> bool:
+    """True jika baca penuh terakhir lebih lama dari MASTER_FULL_REFRESH_SECONDS."""
+    try:
+        full_read_at = datetime.fromisoformat(meta["full_read_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return (datetime.now() - full_read_at).total_seconds() >= MASTER_FULL_REFRESH_SECONDS
+
+
+def read_master_data_snapshot() -> pd.DataFrame:
+    """
+    Baca data master lewat snapshot lokal:
+    - revisi spreadsheet sama dengan snapshot -> snapshot dipakai apa adanya
+    - versi MasterData naik (upload lewat aplikasi) -> hanya baris yang berubah di-fetch
+      lalu di-merge ke snapshot (read_master_changes)
+    - selain itu (edit langsung di sheet tanpa penulisan aplikasi, atau terselip di antara
+      penulisan aplikasi; hapus baris; snapshot terlalu lama) -> baca penuh
+    """
+    revision = get_master_revision()
+    meta = load_master_snapshot_meta()
+    snapshot_df = None
+    if meta and os.path.exists(MASTER_SNAPSHOT_FILE):
+        try:
+            snapshot_df = pd.read_parquet(MASTER_SNAPSHOT_FILE)
+        except Exception as e:
+            logger.warning(f"⚠️ Snapshot lokal tidak bisa dibaca, fetch ulang: {str(e)}")
+    
+    if snapshot_df is not None:
+        if revision is not None and meta.get("revision") == revision:
+            print(f"📦 Data loaded dari snapshot lokal: {len(snapshot_df)} records")
+            return snapshot_df
+        
+        version_info = read_master_version()
+        if (
+            version_info is not None
+            and meta.get("version") is not None
+            and version_info["version"] > meta["version"]
+            and not is_full_refresh_due(meta)
+        ):
+            try:
+                merged = read_master_changes(snapshot_df, meta, version_info)
+            except Exception as e:
+                logger.warning(f"⚠️ Refresh inkremental gagal, baca penuh: {str(e)}")
+                merged = None
+            if merged is not None:
+                save_master_snapshot(
+                    merged, revision, version_info,
+                    header=meta["header"], full_read_at=meta.get("full_read_at"),
+                )
+                return merged
+    
+    return rebuild_master_snapshot(revision)
+
+
+# Lightweight cache wrapper to avoid repeated Google Sheets fetches across pages/reruns
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_read_master_data(limit_rows: int | None = None) -> pd.DataFrame:
+    """
+    Cached wrapper over read_master_data to speed up page switches and initial load.
+    TTL ensures external edits are picked up periodically or can be cleared on upload.
+    Full reads go through the local snapshot, so a TTL expiry only refetches the sheet
+    when its revision has changed.
+    """
+    if limit_rows:
+        return read_master_data(limit_rows)
+    return read_master_data_snapshot()
+
+def apply_targeted_normalization(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplikasikan normalisasi secara targeted untuk mencegah duplikasi tanpa mengubah data asli.
+    Hanya normalisasi kolom yang memang perlu untuk konsistensi data.
+    
+    Args:
+        df: DataFrame yang akan dinormalisasi
+        
+    Returns:
+        pd.DataFrame: DataFrame dengan kolom tertentu yang sudah dinormalisasi
+    """
+    if df.empty:
+        return df
+    
+    # Buat copy untuk menghindari SettingWithCopyWarning
+    df_normalized = df.copy()
+    
+    # Mapping kolom yang WAJIB dinormalisasi untuk mencegah duplikasi
     targeted_normalization = {
         # Kolom yang sering typo dan menyebabkan duplikasi false
         'STATUS EKSEKUSI': normalize_status_execution,
@@ -957,17 +1775,20 @@ def apply_targeted_normalization(df: pd.DataFrame) -> pd.DataFrame:
     }
     
     # Apply normalization hanya untuk kolom yang benar-benar perlu
-    for column in df_normalized.columns:
-        if column in targeted_normalization:
-            try:
-                print(f"   🔄 Normalizing: {column}")
-                df_normalized[column] = df_normalized[column].apply(
-                    targeted_normalization[column]
-                )
-            except Exception as e:
-                print(f"   ⚠️ Warning: Error normalizing {column}: {e}")
-                # Jika error, tetap gunakan nilai asli
-                continue
+    # Normalisasi sekali per nilai unik (STATUS/EQUIPMENT hanya punya sedikit variasi),
+    # nilai unik dibagi ke process pool untuk data besar
+    columns = [column for column in df_normalized.columns if column in targeted_normalization]
+    for column in columns:
+        print(f"   🔄 Normalizing: {column}")
+    results, errors = normalize_series_batch(
+        {column: (df_normalized[column], targeted_normalization[column]) for column in columns}
+    )
+    for column in columns:
+        if column in errors:
+            print(f"   ⚠️ Warning: Error normalizing {column}: {errors[column]}")
+            # Jika error, tetap gunakan nilai asli
+            continue
+        df_normalized[column] = results[column]
     
     return df_normalized
 
@@ -1002,7 +1823,8 @@ def get_filter_options_fast(df: pd.DataFrame | None = None) -> Dict[str, List[st
         for key, col in filter_columns.items():
             if col in df.columns:
                 # Optimasi: gunakan dropna() dan value_counts() untuk performa
-                unique_vals = df[col].dropna().astype(str).str.strip()
+                # Cukup proses nilai unik (murah untuk kolom category)
+                unique_vals = pd.Series(df[col].dropna().unique()).astype(str).str.strip()
                 # Remove empty strings and common null representations
                 unique_vals = unique_vals[unique_vals != '']
                 unique_vals = unique_vals[unique_vals.str.upper() != 'NAN']
@@ -1053,7 +1875,92 @@ def get_filter_options_fast(df: pd.DataFrame | None = None) -> Dict[str, List[st
             'STATUS EKSEKUSI': ['Selesai', 'Belum Selesai']  # Default options
         }
 
-def filter_data_efficiently(df: pd.DataFrame, filters: Dict[str, Any], limit: int | None = 1000) -> pd.DataFrame:
+# Kolom yang di-index untuk filter dashboard & rekap (nilai -> posisi baris)
+FILTER_INDEX_COLUMNS = [
+    'UP3', 'ULP', 'NAMA PENYULANG', 'EQUIPMENT', 'JENIS TEMUAN',
+    'STATUS EKSEKUSI', 'ROLE', 'PROGRAM HAR'
+]
+
+# Nilai filter khusus untuk baris kosong (NaN atau string kosong), contoh PROGRAM HAR
+FILTER_BLANK_VALUE = '(blank)'
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.intp)
+
+
+def build_filter_index(df: pd.DataFrame) -> Dict[str, Dict[Any, np.ndarray]]:
+    """
+    Bangun inverted index untuk FILTER_INDEX_COLUMNS: nilai -> array posisi baris (terurut).
+    Baris kosong (NaN/'') juga dikumpulkan di bawah FILTER_BLANK_VALUE.
+    """
+    index = {}
+    for col in FILTER_INDEX_COLUMNS:
+        if col not in df.columns:
+            continue
+        col_index = {}
+        blank_parts = []
+        groups = df.groupby(col, observed=True, sort=False, dropna=False).indices
+        for value, positions in groups.items():
+            if pd.isna(value):
+                blank_parts.append(positions)
+                continue
+            col_index[value] = positions
+            if value == '':
+                blank_parts.append(positions)
+        col_index[FILTER_BLANK_VALUE] = np.sort(np.concatenate(blank_parts)) if blank_parts else _EMPTY_POSITIONS
+        index[col] = col_index
+    return index
+
+
+def get_filter_positions(
+    df: pd.DataFrame,
+    filters: Dict[str, Any],
+    index: Dict[str, Dict[Any, np.ndarray]] | None = None,
+) -> np.ndarray | None:
+    """
+    Hitung posisi baris yang lolos semua filter sebagai irisan himpunan posisi.
+    Kolom yang ada di index dijawab dari index; kolom lain di-scan sekali.
+
+    Returns:
+        Array posisi terurut, atau None jika tidak ada filter aktif (semua baris).
+    """
+    selections = []
+    for filter_name, filter_value in filters.items():
+        if not filter_value or filter_name not in df.columns:
+            continue
+        values = filter_value if isinstance(filter_value, list) else [filter_value]
+        col_index = index.get(filter_name) if index else None
+        if col_index is not None:
+            parts = [col_index.get(value, _EMPTY_POSITIONS) for value in values]
+        else:
+            column = df[filter_name]
+            parts = []
+            for value in values:
+                if value == FILTER_BLANK_VALUE:
+                    mask = column.isna() | (column == '')
+                else:
+                    mask = column == value
+                parts.append(np.flatnonzero(mask.to_numpy(dtype=bool)))
+        selections.append(parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts)))
+
+    if not selections:
+        return None
+
+    # Mulai dari himpunan terkecil agar irisan secepat mungkin
+    selections.sort(key=len)
+    positions = selections[0]
+    for other in selections[1:]:
+        if len(positions) == 0:
+            break
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
+
+
+def filter_data_efficiently(
+    df: pd.DataFrame,
+    filters: Dict[str, Any],
+    limit: int | None = 1000,
+    index: Dict[str, Dict[Any, np.ndarray]] | None = None,
+) -> pd.DataFrame:
     """
     Filter data dengan optimasi untuk dataset besar.
     
@@ -1061,35 +1968,27 @@ def filter_data_efficiently(df: pd.DataFrame, filters: Dict[str, Any], limit: in
         df: DataFrame untuk difilter
         filters: Dictionary filter conditions
         limit: Batasi hasil maksimal untuk performa (None = tidak ada limit)
+        index: Inverted index dari build_filter_index (optional)
+    
+    Hasil hanya berisi baris yang lolos filter (satu kali take, tanpa salinan antara).
+    Tanpa filter aktif, hasilnya salinan dangkal: menambah kolom aman, tetapi nilai
+    kolom yang ada tidak boleh diubah in-place.
     """
     try:
         if df.empty:
             return df
         
-        filtered_df = df.copy()
-        
-        # Apply filters dengan optimasi
-        for filter_name, filter_value in filters.items():
-            if filter_value and filter_name in filtered_df.columns:
-                if isinstance(filter_value, list):
-                    # Multiple selection filter
-                    mask = filtered_df[filter_name].isin(filter_value)
-                else:
-                    # Single value filter
-                    mask = filtered_df[filter_name] == filter_value
-                
-                filtered_df = filtered_df[mask]
-                
-                # Early termination jika sudah terlalu sedikit data
-                if len(filtered_df) == 0:
-                    break
+        positions = get_filter_positions(df, filters, index)
+        total = len(df) if positions is None else len(positions)
         
         # Limit hasil untuk performa (hanya jika limit diberikan)
-        if limit is not None and len(filtered_df) > limit:
-            print(f"⚠ Menampilkan {limit} dari {len(filtered_df)} hasil (untuk performa)")
-            filtered_df = filtered_df.head(limit)
+        if limit is not None and total > limit:
+            print(f"⚠ Menampilkan {limit} dari {total} hasil (untuk performa)")
+            positions = np.arange(limit) if positions is None else positions[:limit]
         
-        return filtered_df
+        if positions is None:
+            return df.copy(deep=False)
+        return df.take(positions)
         
     except Exception as e:
         print(f"❌ Error filtering data: {str(e)}")
@@ -1125,228 +2024,1037 @@ def get_data_statistics_fast(df: pd.DataFrame | None = None) -> Dict[str, Any]:
         print(f"❌ Error getting statistics: {str(e)}")
         return {"total_records": 0, "last_updated": "Error"}
 
-def process_sheet_data(xls: pd.ExcelFile) -> pd.DataFrame:
-    """
-    Proses dan gabungkan data dari sheet yang valid dengan MEMPERTAHANKAN FORMAT ASLI.
-    
-    PRINSIP PRESERVASI DATA:
-    - Format asli data DIPERTAHANKAN sepenuhnya
-    - Hanya standardisasi tanggal untuk dashboard (diperlukan sistem)
-    - Tidak ada perubahan format lainnya
-    """
-    all_dfs = []
-    
-    for sheet_name in xls.sheet_names:
-        if isinstance(sheet_name, str) and sheet_name.upper() in VALID_SHEETS:
-            try:
-                # Baca sheet dengan mengatur semua kolom sebagai string untuk mempertahankan format asli
-                df = pd.read_excel(
-                    xls,
-                    sheet_name=sheet_name,
-                    header=0,
-                    dtype=str,  # Baca semua kolom sebagai string
-                    na_filter=False  # Mencegah konversi NaN
-                )
-                
-                # Normalisasi nama kolom
-                df.columns = (
-                    df.columns.str.strip()
-                    .str.replace("\u200b", "", regex=False)
-                    .str.replace("\xa0", "", regex=False)
-                    .str.upper()
-                )
-                
-                # Filter dan reorder kolom sesuai VALID_COLUMNS yang ada di file
-                existing_cols = []
-                for col in VALID_COLUMNS:
-                    if col in df.columns:
-                        existing_cols.append(col)
-                
-                if existing_cols:
-                    df = df[existing_cols]
-                    # Tambahkan kolom yang tidak ada dengan nilai kosong
-                    for col in VALID_COLUMNS:
-                        if col not in df.columns:
-                            df[col] = ""
-                    # Reorder kolom sesuai urutan VALID_COLUMNS
-                    df = df.reindex(columns=VALID_COLUMNS)
-                    
-                    # HANYA standardisasi tanggal untuk dashboard (diperlukan sistem)
-                    # Sisanya TETAP FORMAT ASLI
-                    for col in DATE_COLUMNS:
-                        if col in df.columns:
-                            df[col] = df[col].apply(standardize_date_format)
-                    
-                    all_dfs.append(df)
-                else:
-                    print(f"Warning: Tidak ada kolom valid di sheet {sheet_name}")
-                    
-            except Exception as e:
-                print(f"Error membaca sheet {sheet_name}: {str(e)}")
-                continue
-    
-    if not all_dfs:
-        raise ValueError("Tidak ada sheet valid yang dapat diproses")
-    
-    # Gabungkan semua DataFrame
-    combined_df = pd.concat(all_dfs, ignore_index=True)
-    
-    # Pastikan semua kolom ada dan dalam urutan yang benar
-    combined_df = combined_df.reindex(columns=VALID_COLUMNS)
-    combined_df = combined_df.fillna("")
-    
-    return combined_df
+# ===== EXPORT REKAP (STREAMING KE FILE SEMENTARA) =====
+# format -> (label, ekstensi file, MIME type)
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "xlsx": ("Excel (xlsx)", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+# Jumlah baris yang diserialisasi sekaligus saat export
+EXPORT_CHUNK_ROWS = 20000
 
-def validate_and_sync_data(upload_df: pd.DataFrame, sheet_df: pd.DataFrame) -> Tuple[Dict[str, Any], pd.DataFrame]:
+
+def _iter_export_chunks(df: pd.DataFrame, columns: List[str]):
+    """Potong frame per EXPORT_CHUNK_ROWS baris (view, bukan salinan seluruh frame)."""
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield df.iloc[start:start + EXPORT_CHUNK_ROWS][columns]
+
+
+def _write_csv_chunks(df: pd.DataFrame, columns: List[str], text_stream) -> None:
+    """CSV per chunk: header hanya di chunk pertama, tanggal dengan STANDARD_DATE_FORMAT."""
+    for chunk_number, chunk in enumerate(_iter_export_chunks(df, columns)):
+        chunk.to_csv(text_stream, index=False, header=chunk_number == 0, date_format=STANDARD_DATE_FORMAT)
+    if df.empty:
+        pd.DataFrame(columns=columns).to_csv(text_stream, index=False)
+
+
+def _write_xlsx_rows(df: pd.DataFrame, columns: List[str], binary_stream) -> None:
+    """xlsx lewat openpyxl write-only: baris langsung di-stream, tidak ada model sheet di memori."""
+    from openpyxl import Workbook  # dependency optional, hanya untuk export xlsx
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Rekap")
+    sheet.append(columns)
+    for chunk in _iter_export_chunks(df, columns):
+        # Tanggal ditulis sebagai teks YYYY-MM-DD (sama dengan CSV); NaN/NaT menjadi sel kosong
+        chunk = pd.DataFrame({
+            col: chunk[col].dt.strftime(STANDARD_DATE_FORMAT) if pd.api.types.is_datetime64_any_dtype(chunk[col])
+            else chunk[col]
+            for col in columns
+        }).astype(object)
+        values = chunk.where(chunk.notna(), None).to_numpy(dtype=object)
+        for row in values.tolist():
+            sheet.append(row)
+    workbook.save(binary_stream)
+
+
+def _write_parquet_chunks(df: pd.DataFrame, columns: List[str], binary_stream) -> None:
+    """Parquet per row group; schema diambil dari frame penuh agar semua chunk konsisten."""
+    import pyarrow as pa  # dependency optional, hanya untuk export parquet
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0][columns], preserve_index=False)
+    with pq.ParquetWriter(binary_stream, schema) as writer:
+        for chunk in _iter_export_chunks(df, columns):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def build_export_file(df: pd.DataFrame, export_format: str = "csv", columns: List[str] | None = None):
     """
-    Validasi dan sinkronisasi data upload dengan data existing di Google Sheet.
-    
-    Logika dengan VALIDASI 31 KOLOM:
-    1. ID SURVEY belum ada → Tambah sebagai baris baru
-    2. ID SURVEY ada + ada kolom kosong di sheet tapi terisi di upload → Update kolom kosong
-    3. ID SURVEY ada + isi 31 kolom berbeda → Tambah sebagai baris baru (allow duplicate ID)
-    4. ID SURVEY sama + seluruh 31 kolom identik → Skip (duplikasi absolut)
-    
-    Args:
-        upload_df: DataFrame dari file upload
-        sheet_df: DataFrame dari Google Sheet existing
-        
+    Tulis hasil filter rekap ke file sementara secara bertahap (per EXPORT_CHUNK_ROWS baris).
+
+    Dipanggil hanya saat tombol download diklik, jadi rerun halaman tidak lagi
+    membangun seluruh isi CSV sebagai satu string.
+
     Returns:
-        Tuple[dict, DataFrame]: (statistics, final_merged_dataframe)
+        Isi file export (bytes). Tipe file tidak diterima st.download_button sebagai hasil
+        callable (hanya bytes/BytesIO/BufferedReader), dan isinya tetap dibaca penuh oleh
+        Streamlit, sehingga file sementara hanya dipakai selama serialisasi.
     """
-    
-    # Prepare data - pastikan semua data sebagai string dan bersih
-    upload_clean = upload_df.copy().astype(str)
-    sheet_clean = sheet_df.copy().astype(str)
-    
-    # Clean data: replace NaN, None, 'nan' dengan string kosong
-    for df in [upload_clean, sheet_clean]:
-        df.replace(['nan', 'None', 'NaN', 'null'], '', inplace=True)
-        df.fillna('', inplace=True)
-        # Apply string cleaning to each cell - KECUALI KOORDINAT
-        for col in df.columns:
-            if col in ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']:
-                # Untuk koordinat: hanya bersihkan null/nan, JANGAN strip titik
-                df[col] = df[col].apply(lambda x: str(x) if x != '' else '')
-            else:
-                # Untuk kolom lain: bersihkan normal
-                df[col] = df[col].apply(lambda x: str(x).strip() if x != '' else '')
-    
-    # Ensure all validation columns exist in both DataFrames
-    for col in VALIDATION_COLUMNS:
-        if col not in upload_clean.columns:
-            upload_clean[col] = ''
-        if col not in sheet_clean.columns:
-            sheet_clean[col] = ''
-    
-    # Initialize result tracking
-    stats = {
-        "new_rows": 0,
-        "updated_rows": 0, 
-        "skipped_duplicates": 0,
-        "duplicate_ids_with_diff_content": 0,
-        "processed_rows": 0
-    }
-    
-    # Start with existing sheet data - PRESERVE DATA LAMA
-    result_df = sheet_clean.copy()
-    updated_indices = set()  # Track which existing rows got updated
-    
-    print(f"🔍 DEBUG: Memulai dengan data existing: {len(result_df)} baris")
-    print(f"📊 Data yang akan dipreservasi: {len(sheet_clean)} baris existing")
-    print("🔍 Memulai validasi dan sinkronisasi data...")
-    
-    # Process each row in upload data
-    for row_num, (upload_idx, upload_row) in enumerate(upload_clean.iterrows(), 1):
-        stats["processed_rows"] += 1
-        id_survey = str(upload_row.get('ID SURVEY', '')).strip()
-        
-        if not id_survey or pd.isna(id_survey):
-            logger.warning(f"⚠ Baris {row_num}: ID SURVEY kosong, dilewati")
-            continue
-            
-        # Find existing rows with same ID SURVEY
-        matching_rows = sheet_clean[sheet_clean['ID SURVEY'] == id_survey]
-        
-        if matching_rows.empty:
-            # CASE 1: ID SURVEY belum ada → Tambahkan baris baru
-            result_df = pd.concat([result_df, pd.DataFrame([upload_row])], ignore_index=True)
-            stats["new_rows"] += 1
-            logger.info(f"✅ Baris {row_num}: ID {id_survey} - Data baru ditambahkan")
-            recently_uploaded_ids.add(id_survey)
-            
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {export_format}")
+    columns = list(columns) if columns is not None else list(df.columns)
+
+    export_file = tempfile.TemporaryFile()
+    try:
+        if export_format in ("csv", "csv.gz"):
+            binary_stream = gzip.GzipFile(fileobj=export_file, mode="wb", compresslevel=6) if export_format == "csv.gz" else export_file
+            text_stream = io.TextIOWrapper(binary_stream, encoding="utf-8", newline="")
+            _write_csv_chunks(df, columns, text_stream)
+            text_stream.flush()
+            text_stream.detach()
+            if binary_stream is not export_file:
+                binary_stream.close()
+        elif export_format == "xlsx":
+            _write_xlsx_rows(df, columns, export_file)
         else:
-            # Ada record dengan ID SURVEY sama, cek lebih detail
-            exact_match_found = False
-            update_performed = False
-            
-            for sheet_idx, sheet_row in matching_rows.iterrows():
-                # CASE 4: Cek apakah seluruh kolom identik
-                if are_rows_identical(upload_row, sheet_row):
-                    stats["skipped_duplicates"] += 1
-                    exact_match_found = True
-                    logger.info(f"⏭ Baris {row_num}: ID {id_survey} - Duplikasi absolut, dilewati")
-                    break
-                
-                # CASE 2: Cek apakah ada kolom kosong yang bisa di-update
-                elif has_empty_columns_to_update(sheet_row, upload_row):
-                    original_sheet_idx = sheet_clean.index[sheet_clean['ID SURVEY'] == id_survey].tolist()[0]
-                    
-                    if original_sheet_idx not in updated_indices:
-                        update_data = get_update_data(sheet_row, upload_row)
-                        for col, new_val in update_data.items():
-                            result_df.loc[original_sheet_idx, col] = new_val
-                        
-                        updated_indices.add(original_sheet_idx)
-                        stats["updated_rows"] += 1
-                        update_performed = True
-                        logger.info(f"🔄 Baris {row_num}: ID {id_survey} - Data diupdate (mengisi kolom kosong)")
-                        recently_uploaded_ids.add(id_survey)
-                        break
-            
-            if not exact_match_found and not update_performed:
-                # CASE 3: ID sama tapi konten berbeda → Tambah sebagai baris baru
-                result_df = pd.concat([result_df, pd.DataFrame([upload_row])], ignore_index=True)
-                stats["duplicate_ids_with_diff_content"] += 1
-                stats["new_rows"] += 1
-                logger.info(f"➕ Baris {row_num}: ID {id_survey} - Konten berbeda, ditambah sebagai baris baru")
-                recently_uploaded_ids.add(id_survey)
-    
-    # Final cleanup and numbering
-    result_df = result_df.drop(columns=['NO'], errors='ignore')
-    result_df.insert(0, 'NO', range(1, len(result_df) + 1))
-    
-    print(f"\n� DEBUG FINAL: Total baris result_df: {len(result_df)}")
-    print(f"�📊 Breakdown: {len(sheet_clean)} existing + {stats['new_rows']} baru = {len(result_df)} total")
-    
-    print("\n📊 Ringkasan Validasi 31 Kolom:")
-    print(f"   • Data existing dipreservasi: {len(sheet_clean)} baris")
-    print(f"   • Data baru: {stats['new_rows']}")
-    print(f"   • Data diupdate: {stats['updated_rows']}")
-    print(f"   • Duplikasi diabaikan: {stats['skipped_duplicates']}")
-    print(f"   • ID ganda dengan konten berbeda: {stats['duplicate_ids_with_diff_content']}")
-    print(f"   • Total diproses: {stats['processed_rows']}")
-    print(f"   • TOTAL FINAL: {len(result_df)} baris (TIDAK ADA DATA YANG HILANG!)")
-    
-    return stats, result_df
+            _write_parquet_chunks(df, columns, export_file)
+        export_file.seek(0)
+        return export_file.read()
+    finally:
+        export_file.close()
 
+# ===== DASHBOARD FRAME (TYPED) =====
+# Kolom berkardinalitas rendah yang disimpan sebagai category di memori dashboard
+DASHBOARD_CATEGORY_COLUMNS = [
+    "UP3", "ULP", "ROLE", "EQUIPMENT", "JENIS TEMUAN", "STATUS EKSEKUSI",
+    "STATUS ASET", "PROGRAM HAR", "NAMA PENYULANG"
+]
 
-def is_row_identical(row1: pd.Series, row2: pd.Series, validation_columns: List[str]) -> bool:
+# Kolom turunan hasil parsing KOORDINAT TEMUAN (float64, NaN jika tidak bisa diparsing)
+# dan mask validitas untuk peta (bukan 0 dan berada di dalam bounding box Indonesia)
+DASHBOARD_LAT_COLUMN = "KOORDINAT_LAT"
+DASHBOARD_LON_COLUMN = "KOORDINAT_LON"
+DASHBOARD_COORD_VALID_COLUMN = "KOORDINAT_VALID"
+DASHBOARD_DERIVED_COLUMNS = [DASHBOARD_LAT_COLUMN, DASHBOARD_LON_COLUMN, DASHBOARD_COORD_VALID_COLUMN]
+
+# Bounding box Indonesia (derajat) untuk validasi KOORDINAT TEMUAN
+MAP_LAT_RANGE = (-11, 6)
+MAP_LON_RANGE = (95, 141)
+# Jumlah marker maksimum yang digambar di peta
+MAP_MARKER_LIMIT = 1000
+
+
+def parse_coordinate_series(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Periksa apakah dua baris identik berdasarkan kolom validasi.
-    PENTING: Koordinat TIDAK di-strip untuk preservasi format asli (contoh: -531.639)
-    
-    Args:
-        row1: Series pertama
-        row2: Series kedua  
-        validation_columns: List kolom yang digunakan untuk perbandingan
-        
-    Returns:
-        bool: True jika identik, False jika berbeda
+    Parsing KOORDINAT TEMUAN ("lat, lon") sekaligus untuk satu kolom.
+    Aturannya sama dengan parsing per baris di peta dashboard: pisah dengan koma,
+    ambil dua bagian pertama, nilai yang gagal diparsing menjadi NaN.
     """
-    for col in validation_columns:
-        if col in ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']:
-            # Untuk koordinat: jangan strip, hanya konversi ke string
+    text = series.astype(object).fillna("").astype(str).str.strip()
+    parts = text.str.split(",", n=2, expand=True)
+    if parts.shape[1] < 2:
+        empty = np.full(len(series), np.nan)
+        return empty, empty.copy()
+    lat = _parse_float_series(parts[0])
+    lon = _parse_float_series(parts[1])
+    # Baris tanpa koma tidak punya koordinat; koordinat dipakai hanya jika lat & lon valid
+    invalid = parts[1].isna().to_numpy() | np.isnan(lat) | np.isnan(lon)
+    lat[invalid] = np.nan
+    lon[invalid] = np.nan
+    return lat, lon
+
+
+def _parse_float_series(parts: pd.Series) -> np.ndarray:
+    """to_numeric vectorized; sisa teks yang gagal dicoba lagi dengan float() agar sama dengan parsing per baris."""
+    text = parts.str.strip()
+    values = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float, copy=True)
+    retry = np.flatnonzero(np.isnan(values) & text.fillna("").ne("").to_numpy())
+    for pos in retry:
+        try:
+            values[pos] = float(text.iat[pos])
+        except ValueError:
+            pass
+    return values
+
+
+def coordinate_validity_mask(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Koordinat valid: lat/lon tidak 0/NaN dan berada di dalam bounding box Indonesia."""
+    with np.errstate(invalid="ignore"):
+        return (
+            (lat != 0) & (lon != 0)
+            & (lat >= MAP_LAT_RANGE[0]) & (lat <= MAP_LAT_RANGE[1])
+            & (lon >= MAP_LON_RANGE[0]) & (lon <= MAP_LON_RANGE[1])
+        )
+
+
+def build_dashboard_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ubah MasterData (semua kolom string) menjadi frame dashboard yang hemat memori.
+
+    Schema:
+    - DASHBOARD_CATEGORY_COLUMNS -> category
+    - DATE_COLUMNS -> datetime64 (nilai kosong/invalid menjadi NaT)
+    - KOORDINAT TEMUAN -> tambahan KOORDINAT_LAT / KOORDINAT_LON (float64) dan KOORDINAT_VALID (bool)
+    Kolom lain tetap apa adanya.
+    """
+    if df.empty:
+        return df
+
+    typed_df = df.copy()
+
+    for col in DASHBOARD_CATEGORY_COLUMNS:
+        if col in typed_df.columns:
+            typed_df[col] = typed_df[col].astype("category")
+
+    for col in DATE_COLUMNS:
+        if col in typed_df.columns:
+            typed_df[col] = pd.to_datetime(typed_df[col], format=STANDARD_DATE_FORMAT, errors="coerce")
+
+    if "KOORDINAT TEMUAN" in typed_df.columns:
+        lat, lon = parse_coordinate_series(typed_df["KOORDINAT TEMUAN"])
+        typed_df[DASHBOARD_LAT_COLUMN] = lat
+        typed_df[DASHBOARD_LON_COLUMN] = lon
+        typed_df[DASHBOARD_COORD_VALID_COLUMN] = coordinate_validity_mask(lat, lon)
+
+    return typed_df
+
+
+def build_map_markers(df: pd.DataFrame, limit: int = MAP_MARKER_LIMIT) -> Dict[str, Any]:
+    """
+    Siapkan data peta dari kolom koordinat yang sudah diparsing (tanpa loop per baris).
+
+    Returns dict:
+    - markers: list dict (lat, lon, jenis_temuan, status_eksekusi, ulp, penyulang), maks `limit`
+    - valid_count: jumlah baris dengan koordinat valid (semua, bukan hanya yang ditampilkan)
+    - selesai / belum_selesai: jumlah status di antara marker yang ditampilkan
+    """
+    result = {"markers": [], "valid_count": 0, "selesai": 0, "belum_selesai": 0}
+    if DASHBOARD_COORD_VALID_COLUMN not in df.columns:
+        return result
+
+    valid_positions = np.flatnonzero(df[DASHBOARD_COORD_VALID_COLUMN].to_numpy(dtype=bool))
+    result["valid_count"] = int(len(valid_positions))
+    shown = df.take(valid_positions[:limit])
+    if shown.empty:
+        return result
+
+    def column_values(col: str) -> List[Any]:
+        if col not in shown.columns:
+            return ['Unknown'] * len(shown)
+        return shown[col].astype(object).tolist()
+
+    status = [str(value).strip().upper() for value in column_values('STATUS EKSEKUSI')]
+    result["markers"] = [
+        {
+            'lat': lat,
+            'lon': lon,
+            'jenis_temuan': jenis,
+            'status_eksekusi': status_value,
+            'ulp': ulp,
+            'penyulang': penyulang,
+        }
+        for lat, lon, jenis, status_value, ulp, penyulang in zip(
+            shown[DASHBOARD_LAT_COLUMN].tolist(),
+            shown[DASHBOARD_LON_COLUMN].tolist(),
+            column_values('JENIS TEMUAN'),
+            status,
+            column_values('ULP'),
+            column_values('NAMA PENYULANG'),
+        )
+    ]
+    result["selesai"] = status.count('SELESAI')
+    result["belum_selesai"] = status.count('BELUM SELESAI')
+    return result
+
+
+# ===== CLUSTER PETA (GRID PER ZOOM) =====
+# Level zoom Leaflet yang punya grid cluster sendiri; zoom lain memakai level terdekat di bawahnya
+MAP_CLUSTER_ZOOM_LEVELS = (5, 7, 9, 11, 13)
+# Jumlah sel grid per tile 256px (4 -> sel ~64px di layar)
+MAP_CLUSTER_CELLS_PER_TILE = 4
+
+
+def _grid_cell_size(level: int) -> float:
+    """Ukuran sel grid (derajat) untuk satu level zoom."""
+    return 360.0 / (2 ** level) / MAP_CLUSTER_CELLS_PER_TILE
+
+
+def build_map_grid(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Pre-aggregate posisi temuan ke sel grid untuk setiap level di MAP_CLUSTER_ZOOM_LEVELS.
+    Dibangun sekali per data generation; baris tanpa koordinat valid mendapat sel -1.
+
+    Returns dict: lat, lon (float64), selesai (bool), valid (bool), cells {level: int64 array}
+    """
+    n_rows = len(df)
+    if DASHBOARD_COORD_VALID_COLUMN in df.columns:
+        lat = df[DASHBOARD_LAT_COLUMN].to_numpy(dtype=float)
+        lon = df[DASHBOARD_LON_COLUMN].to_numpy(dtype=float)
+        valid = df[DASHBOARD_COORD_VALID_COLUMN].to_numpy(dtype=bool)
+    else:
+        lat = lon = np.full(n_rows, np.nan)
+        valid = np.zeros(n_rows, dtype=bool)
+    if 'STATUS EKSEKUSI' in df.columns:
+        status = normalize_series_unique(df['STATUS EKSEKUSI'], lambda value: str(value).strip().upper())
+        selesai = status.to_numpy() == 'SELESAI'
+    else:
+        selesai = np.zeros(n_rows, dtype=bool)
+
+    cells = {}
+    for level in MAP_CLUSTER_ZOOM_LEVELS:
+        size = _grid_cell_size(level)
+        n_cols = int(np.ceil(360.0 / size))
+        col_idx = np.floor((np.where(valid, lon, 0.0) + 180.0) / size).astype(np.int64)
+        row_idx = np.floor((np.where(valid, lat, 0.0) + 90.0) / size).astype(np.int64)
+        cells[level] = np.where(valid, row_idx * n_cols + col_idx, -1)
+    return {"lat": lat, "lon": lon, "selesai": selesai, "valid": valid, "cells": cells}
+
+
+def get_cluster_level(zoom: int | float | None) -> int:
+    """Pilih level grid terbesar yang tidak melebihi zoom peta."""
+    if zoom is None:
+        return MAP_CLUSTER_ZOOM_LEVELS[0]
+    eligible = [level for level in MAP_CLUSTER_ZOOM_LEVELS if level <= zoom]
+    return eligible[-1] if eligible else MAP_CLUSTER_ZOOM_LEVELS[0]
+
+
+def _positions_in_bounds(grid: Dict[str, Any], positions: np.ndarray, bounds: Dict[str, Any] | None) -> np.ndarray:
+    """Saring posisi yang koordinatnya berada di dalam viewport st_folium (bounds None = semua)."""
+    if not bounds:
+        return positions
+    try:
+        south = float(bounds["_southWest"]["lat"])
+        west = float(bounds["_southWest"]["lng"])
+        north = float(bounds["_northEast"]["lat"])
+        east = float(bounds["_northEast"]["lng"])
+    except (KeyError, TypeError, ValueError):
+        return positions
+    lat = grid["lat"][positions]
+    lon = grid["lon"][positions]
+    inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+    return positions[inside]
+
+
+def aggregate_map_clusters(grid: Dict[str, Any], level: int, positions: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Rollup sel grid untuk baris terpilih (hasil filter dashboard).
+
+    Returns DataFrame kolom lat, lon (rata-rata posisi temuan di sel), jumlah, selesai,
+    urut dari jumlah terbesar.
+    """
+    if positions is None:
+        positions = np.flatnonzero(grid["valid"])
+    else:
+        positions = positions[grid["valid"][positions]]
+    if len(positions) == 0:
+        return pd.DataFrame(columns=['lat', 'lon', 'jumlah', 'selesai'])
+
+    cell_ids, inverse = np.unique(grid["cells"][level][positions], return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(cell_ids))
+    clusters = pd.DataFrame({
+        'lat': np.bincount(inverse, weights=grid["lat"][positions], minlength=len(cell_ids)) / counts,
+        'lon': np.bincount(inverse, weights=grid["lon"][positions], minlength=len(cell_ids)) / counts,
+        'jumlah': counts.astype(np.int64),
+        'selesai': np.bincount(inverse, weights=grid["selesai"][positions], minlength=len(cell_ids)).astype(np.int64),
+    })
+    return clusters.sort_values('jumlah', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def build_map_view(
+    df: pd.DataFrame,
+    grid: Dict[str, Any],
+    zoom: int | float | None = None,
+    bounds: Dict[str, Any] | None = None,
+    positions: np.ndarray | None = None,
+    limit: int = MAP_MARKER_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Data peta untuk mode cluster: semua temuan terpilih diringkas per sel grid,
+    dan titik individual dikirim hanya jika temuan di viewport <= limit.
+
+    Args:
+        df: frame dashboard penuh (posisi sejajar dengan grid)
+        grid: hasil build_map_grid
+        zoom, bounds: viewport terakhir dari st_folium
+        positions: posisi hasil filter (None = semua baris)
+
+    Returns dict: level, center, total_valid, in_view, clusters (DataFrame), markers (list dict)
+    """
+    if positions is None:
+        valid_positions = np.flatnonzero(grid["valid"])
+    else:
+        valid_positions = positions[grid["valid"][positions]]
+    view_positions = _positions_in_bounds(grid, valid_positions, bounds)
+    level = get_cluster_level(zoom)
+
+    view = {
+        "level": level,
+        "center": (
+            float(grid["lat"][valid_positions].mean()), float(grid["lon"][valid_positions].mean())
+        ) if len(valid_positions) else None,
+        "total_valid": int(len(valid_positions)),
+        "in_view": int(len(view_positions)),
+        "clusters": pd.DataFrame(columns=['lat', 'lon', 'jumlah', 'selesai']),
+        "markers": [],
+    }
+    if 0 < len(view_positions) <= limit:
+        view["markers"] = build_map_markers(df.take(view_positions), limit=limit)["markers"]
+    else:
+        # Payload dibatasi: maks `limit` cluster terbesar (viewport tanpa bounds pada zoom tinggi)
+        view["clusters"] = aggregate_map_clusters(grid, level, view_positions).head(limit)
+    return view
+
+
+def get_memory_report(raw_df: pd.DataFrame, typed_df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Bandingkan pemakaian memori (deep) frame mentah dan frame dashboard.
+    Returns dict berisi total MB sebelum/sesudah dan rincian per kolom.
+    """
+    raw_usage = raw_df.memory_usage(deep=True, index=True)
+    typed_usage = typed_df.memory_usage(deep=True, index=True)
+    columns = {}
+    for col in typed_usage.index:
+        columns[col] = {
+            "dtype": str(typed_df[col].dtype) if col in typed_df.columns else "index",
+            "before_mb": round(float(raw_usage.get(col, 0)) / 1024 ** 2, 3),
+            "after_mb": round(float(typed_usage[col]) / 1024 ** 2, 3),
+        }
+    before_mb = float(raw_usage.sum()) / 1024 ** 2
+    after_mb = float(typed_usage.sum()) / 1024 ** 2
+    return {
+        "rows": len(typed_df),
+        "before_mb": round(before_mb, 2),
+        "after_mb": round(after_mb, 2),
+        "saved_pct": round((1 - after_mb / before_mb) * 100, 1) if before_mb else 0.0,
+        "columns": columns,
+    }
+
+# ===== AGGREGATE CUBE UNTUK KPI & GRAFIK DASHBOARD =====
+# Dimensi cube = kolom filter dashboard + bulan survey
+CUBE_DIMENSIONS = [
+    'ROLE', 'UP3', 'ULP', 'EQUIPMENT', 'STATUS EKSEKUSI', 'JENIS TEMUAN',
+    'NAMA PENYULANG', 'PROGRAM HAR'
+]
+CUBE_MONTH_COLUMN = 'BULAN_SURVEY'
+
+# Posisi pengganti untuk sel cube yang tidak punya baris aset BURUK/KURANG
+_NO_POSITION = np.iinfo(np.int64).max
+
+
+def build_aggregate_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Materialisasi jumlah temuan per kombinasi CUBE_DIMENSIONS + bulan survey.
+
+    Measure per sel:
+    - JUMLAH: jumlah baris
+    - ASET_BURUK / ASET_KURANG: jumlah baris dengan STATUS ASET (strip+upper) BURUK/KURANG
+    - POS_BURUK / POS_KURANG: posisi baris pertama BURUK/KURANG (untuk urutan seri yang sama persis)
+    Nilai kosong (NaN/NaT) tetap menjadi sel tersendiri agar total tidak berubah.
+    """
+    dims = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    work = pd.DataFrame({col: df[col].astype('category') for col in dims}, index=pd.RangeIndex(len(df)))
+    if 'TANGGAL SURVEY' in df.columns:
+        survey_dates = pd.to_datetime(df['TANGGAL SURVEY'], errors='coerce')
+        work[CUBE_MONTH_COLUMN] = survey_dates.dt.to_period('M').dt.to_timestamp().to_numpy()
+    else:
+        work[CUBE_MONTH_COLUMN] = pd.NaT
+
+    if 'STATUS ASET' in df.columns:
+        status_aset = normalize_series_unique(df['STATUS ASET'], lambda value: str(value).strip().upper())
+        # NaN dianggap 'NAN' seperti astype(str), jadi tidak pernah BURUK/KURANG
+        status_aset = status_aset.where(df['STATUS ASET'].notna(), 'NAN').to_numpy()
+    else:
+        status_aset = np.full(len(df), '', dtype=object)
+    positions = np.arange(len(df), dtype=np.int64)
+    is_buruk = status_aset == 'BURUK'
+    is_kurang = status_aset == 'KURANG'
+    work['JUMLAH'] = 1
+    work['ASET_BURUK'] = is_buruk.astype(np.int64)
+    work['ASET_KURANG'] = is_kurang.astype(np.int64)
+    work['POS_BURUK'] = np.where(is_buruk, positions, _NO_POSITION)
+    work['POS_KURANG'] = np.where(is_kurang, positions, _NO_POSITION)
+
+    keys = dims + [CUBE_MONTH_COLUMN]
+    cube = work.groupby(keys, observed=True, dropna=False, sort=False).agg(
+        JUMLAH=('JUMLAH', 'sum'),
+        ASET_BURUK=('ASET_BURUK', 'sum'),
+        ASET_KURANG=('ASET_KURANG', 'sum'),
+        POS_BURUK=('POS_BURUK', 'min'),
+        POS_KURANG=('POS_KURANG', 'min'),
+    ).reset_index()
+    return cube
+
+
+def filter_aggregate_cube(cube: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
+    """Terapkan filter dashboard ke cube (semantik sama dengan filter_data_efficiently)."""
+    mask = np.ones(len(cube), dtype=bool)
+    for filter_name, filter_value in filters.items():
+        if not filter_value or filter_name not in cube.columns:
+            continue
+        values = filter_value if isinstance(filter_value, list) else [filter_value]
+        column = cube[filter_name]
+        selected = np.zeros(len(cube), dtype=bool)
+        for value in values:
+            if value == FILTER_BLANK_VALUE:
+                selected |= (column.isna() | (column == '')).to_numpy(dtype=bool)
+            else:
+                selected |= (column == value).to_numpy(dtype=bool)
+        mask &= selected
+    return cube if mask.all() else cube[mask]
+
+
+def _category_mask(series: pd.Series, predicate: Callable[[Any], bool]) -> np.ndarray:
+    """Evaluasi predicate sekali per kategori lalu sebarkan ke baris cube (NaN -> False)."""
+    flags = np.array([bool(predicate(value)) for value in series.cat.categories] + [False], dtype=bool)
+    return flags[series.cat.codes.to_numpy()]
+
+
+def rollup_dashboard_kpis(cube: pd.DataFrame) -> Dict[str, int]:
+    """
+    Hitung KPI card dari cube: total temuan, selesai, belum selesai, total status valid,
+    dan total aset buruk. Aturan normalisasinya sama dengan perhitungan per baris.
+    """
+    counts = cube['JUMLAH'].to_numpy()
+    kpis = {"total_temuan": 0, "selesai": 0, "belum_selesai": 0, "status_valid": 0, "aset_buruk": 0}
+    if 'JENIS TEMUAN' in cube.columns:
+        valid_temuan = _category_mask(cube['JENIS TEMUAN'], lambda value: str(value).strip() != '')
+        kpis["total_temuan"] = int(counts[valid_temuan].sum())
+    if 'STATUS EKSEKUSI' in cube.columns:
+        selesai = _category_mask(cube['STATUS EKSEKUSI'], lambda value: str(value).strip().upper() == 'SELESAI')
+        belum = _category_mask(cube['STATUS EKSEKUSI'], lambda value: str(value).strip().upper() == 'BELUM SELESAI')
+        kpis["selesai"] = int(counts[selesai].sum())
+        kpis["belum_selesai"] = int(counts[belum].sum())
+        kpis["status_valid"] = kpis["selesai"] + kpis["belum_selesai"]
+    kpis["aset_buruk"] = int(cube['ASET_BURUK'].sum())
+    return kpis
+
+
+def rollup_group_counts(cube: pd.DataFrame, dims: List[str], name: str) -> pd.DataFrame:
+    """Setara df.groupby(dims, observed=True).size().reset_index(name=name), dijawab dari cube."""
+    return cube.groupby(dims, observed=True)['JUMLAH'].sum().reset_index(name=name)
+
+
+def rollup_value_counts(cube: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Setara df[column].value_counts() untuk kolom category, dijawab dari cube.
+    Urutan (termasuk nilai yang jumlahnya sama) identik karena dibangun dari array yang sama.
+    """
+    values = cube[column]
+    codes = values.cat.codes.to_numpy()
+    present = codes >= 0
+    counts = np.bincount(
+        codes[present], weights=cube['JUMLAH'].to_numpy()[present], minlength=len(values.cat.categories)
+    ).astype(np.int64)
+    index = pd.CategoricalIndex(
+        values.cat.categories, categories=values.cat.categories, ordered=values.cat.ordered, name=column
+    )
+    return pd.Series(counts, index=index, name='count').sort_values(ascending=False, kind='stable')
+
+
+def rollup_status_aset_counts(cube: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jumlah aset BURUK vs KURANG (kolom 'Status Aset', 'Jumlah'), urut dari terbesar.
+    Jumlah yang sama diurutkan menurut kemunculan pertama, seperti value_counts per baris.
+    """
+    rows = []
+    for label, count_col, pos_col in [('BURUK', 'ASET_BURUK', 'POS_BURUK'), ('KURANG', 'ASET_KURANG', 'POS_KURANG')]:
+        count = int(cube[count_col].sum())
+        if count > 0:
+            rows.append((label, count, int(cube[pos_col].min())))
+    rows.sort(key=lambda row: (-row[1], row[2]))
+    return pd.DataFrame([(label, count) for label, count, _ in rows], columns=['Status Aset', 'Jumlah'])
+
+
+# ===== SHARED DATA STORE (PROCESS-WIDE) =====
+# Detik sebelum store mengecek ulang revisi spreadsheet (menangkap edit langsung di sheet)
+DATA_STORE_TTL = 60
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_store() -> Dict[str, Any]:
+    """
+    Store read-only yang dipakai bersama oleh semua sesi Streamlit dalam satu proses.
+    Frame dashboard hanya disimpan sekali di sini; sesi cukup menyimpan nomor generation.
+    """
+    return {
+        "lock": threading.RLock(),
+        "generation": 0,
+        "data": None,
+        "revision": None,
+        "checked_at": 0.0,
+    }
+
+
+def bump_data_generation() -> int:
+    """
+    Tandai MasterData berubah (upload/hapus). Semua sesi memuat frame baru pada rerun
+    berikutnya tanpa perlu fetch per sesi. Snapshot lokal tidak dihapus: revisinya sudah
+    berbeda, sehingga pembacaan berikutnya mengambil perubahan lewat jurnal versi.
+    """
+    try:
+        cached_read_master_data.clear()
+    except Exception:
+        pass
+    store = get_data_store()
+    with store["lock"]:
+        store["generation"] += 1
+        return store["generation"]
+
+
+def build_dashboard_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """Bangun frame dashboard bertipe + opsi filter dari frame MasterData (tidak diubah in-place)."""
+    df = df.copy(deep=False)
+    # Normalisasi nama kolom sekali di sini
+    df.columns = (
+        df.columns.str.strip().str.replace("\u200b", "", regex=False)
+        .str.replace("\xa0", "", regex=False).str.upper()
+    )
+    frame = build_dashboard_frame(df)
+    return frame, get_filter_options_fast(frame)
+
+
+def load_dashboard_frame() -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """Baca MasterData (via snapshot) lalu bangun frame dashboard bertipe + opsi filter."""
+    return build_dashboard_data(read_master_data_snapshot())
+
+
+def build_shared_data(frame: pd.DataFrame, filters: Dict[str, List[str]], generation: int) -> Dict[str, Any]:
+    """Isi store bersama: frame dashboard beserta struktur turunannya untuk satu generation."""
+    return {
+        "frame": frame,
+        "filters": filters,
+        "filter_index": build_filter_index(frame),
+        "cube": build_aggregate_cube(frame),
+        "map_grid": build_map_grid(frame),
+        "generation": generation,
+    }
+
+
+def seed_data_store(master_df: pd.DataFrame, revision: str | None) -> int:
+    """
+    Seperti bump_data_generation, tetapi frame generation baru langsung dibangun dari
+    `master_df` (hasil upload yang sudah diterapkan ke snapshot), sehingga sesi berikutnya
+    tidak perlu membaca ulang MasterData.
+    """
+    try:
+        cached_read_master_data.clear()
+    except Exception:
+        pass
+    # Struktur turunan dibangun di luar lock agar sesi lain tidak tertahan
+    frame, filters = build_dashboard_data(master_df)
+    data = build_shared_data(frame, filters, generation=0)
+    store = get_data_store()
+    with store["lock"]:
+        store["generation"] += 1
+        data["generation"] = store["generation"]
+        store["data"] = data
+        store["revision"] = revision
+        store["checked_at"] = time.time()
+        return store["generation"]
+
+
+def get_shared_dashboard_data(force_reload: bool = False) -> Dict[str, Any]:
+    """
+    Ambil data dashboard dari store bersama.
+
+    Data dimuat ulang jika generation naik (upload/hapus lewat aplikasi) atau, setelah
+    DATA_STORE_TTL, jika revisi spreadsheet berubah karena edit dari luar aplikasi.
+    Semua struktur turunan (index filter, aggregate cube, grid peta) dibangun sekali per generation.
+
+    Returns:
+        dict berisi "frame", "filters", "filter_index", "cube", "map_grid" dan "generation".
+        Isinya dipakai bersama oleh semua sesi dan tidak boleh dimodifikasi in-place.
+    """
+    store = get_data_store()
+    with store["lock"]:
+        data = store["data"]
+        fresh = not force_reload and data is not None and data["generation"] == store["generation"]
+        if fresh and time.time() - store["checked_at"] >= DATA_STORE_TTL:
+            revision = get_master_revision()
+            store["checked_at"] = time.time()
+            if revision is not None and revision != store["revision"]:
+                # Sheet diedit dari luar aplikasi -> generation baru
+                store["generation"] += 1
+                fresh = False
+        if not fresh:
+            frame, filters = load_dashboard_frame()
+            store["data"] = build_shared_data(frame, filters, store["generation"])
+            store["revision"] = load_master_snapshot_meta().get("revision")
+            store["checked_at"] = time.time()
+        return store["data"]
+
+
+def process_sheet_data(
+    xls: pd.ExcelFile | bytes,
+    progress_callback: ProgressCallback | None = None,
+) -> pd.DataFrame:
+    """
+    Proses dan gabungkan data dari sheet yang valid dengan MEMPERTAHANKAN FORMAT ASLI.
+    
+    PRINSIP PRESERVASI DATA:
+    - Format asli data DIPERTAHANKAN sepenuhnya
+    - Hanya standardisasi tanggal untuk dashboard (diperlukan sistem)
+    - Tidak ada perubahan format lainnya
+
+    Jika `xls` berupa isi file (bytes), sheet TGK/PSW/KTB/MTR diparsing paralel
+    di process pool (read_excel_sheets_parallel); progress_callback dipanggil per sheet.
+    """
+    cache_key = None
+    if not isinstance(xls, pd.ExcelFile):
+        # Workbook yang sama pernah diproses -> langsung pakai hasil dari cache upload
+        cache_key = f"{compute_upload_hash(xls)}-valid-sheets"
+        cached = load_cached_upload(cache_key)
+        if cached is not None:
+            print("📦 Workbook sama dengan upload sebelumnya, parsing dilewati (cache)")
+            return cached
+    
+    if isinstance(xls, pd.ExcelFile):
+        sheet_names = [name for name in xls.sheet_names if isinstance(name, str) and name.upper() in VALID_SHEETS]
+        sheets, errors = {}, {}
+        for done, sheet_name in enumerate(sheet_names, start=1):
+            try:
+                # Baca sheet dengan mengatur semua kolom sebagai string untuk mempertahankan format asli
+                sheets[sheet_name] = normalize_column_names(
+                    pd.read_excel(xls, sheet_name=sheet_name, header=0, dtype=str, na_filter=False)
+                )
+            except Exception as e:
+                errors[sheet_name] = str(e)
+            if progress_callback:
+                progress_callback(done, len(sheet_names), sheet_name)
+    else:
+        with pd.ExcelFile(io.BytesIO(xls), engine=get_excel_engine()) as workbook:
+            sheet_names = [
+                name for name in workbook.sheet_names if isinstance(name, str) and name.upper() in VALID_SHEETS
+            ]
+        sheets, errors = read_excel_sheets_parallel(xls, sheet_names, progress_callback=progress_callback)
+
+    for sheet_name, error in errors.items():
+        print(f"Error membaca sheet {sheet_name}: {error}")
+
+    all_dfs = []
+    for sheet_name, df in sheets.items():
+        # Filter dan reorder kolom sesuai VALID_COLUMNS yang ada di file
+        existing_cols = [col for col in VALID_COLUMNS if col in df.columns]
+        
+        if existing_cols:
+            df = df[existing_cols]
+            # Tambahkan kolom yang tidak ada dengan nilai kosong, urutan sesuai VALID_COLUMNS
+            df = df.reindex(columns=VALID_COLUMNS, fill_value="")
+            
+            # HANYA standardisasi tanggal untuk dashboard (diperlukan sistem)
+            # Sisanya TETAP FORMAT ASLI
+            for col in DATE_COLUMNS:
+                if col in df.columns:
+                    df[col] = standardize_date_series(df[col])
+            
+            all_dfs.append(df)
+        else:
+            print(f"Warning: Tidak ada kolom valid di sheet {sheet_name}")
+    
+    if not all_dfs:
+        raise ValueError("Tidak ada sheet valid yang dapat diproses")
+    
+    # Gabungkan semua DataFrame
+    combined_df = pd.concat(all_dfs, ignore_index=True)
+    
+    # Pastikan semua kolom ada dan dalam urutan yang benar
+    combined_df = combined_df.reindex(columns=VALID_COLUMNS)
+    combined_df = combined_df.fillna("")
+    
+    # Hasil parsial (ada sheet gagal dibaca) tidak di-cache agar error tetap terlihat saat upload ulang
+    if cache_key and not errors:
+        save_cached_upload(cache_key, combined_df)
+    return combined_df
+
+
+# Penanda di DataFrame.attrs: kolom tanggal upload sudah distandardisasi
+UPLOAD_DATES_STANDARDIZED_ATTR = "dates_standardized"
+
+
+def load_upload_frame(
+    file_bytes: bytes,
+    file_name: str,
+    progress_callback: ProgressCallback | None = None,
+    file_hash: str | None = None,
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Parsing file upload halaman upload (CSV atau semua sheet Excel) menjadi satu DataFrame
+    string dengan DATE_COLUMNS sudah distandardisasi.
+    
+    Hasilnya di-cache di disk per SHA-256 isi file (.cache/uploads/<sha>.parquet, LRU per
+    ukuran). Upload ulang file yang sama langsung memakai cache tanpa parsing; attrs
+    "from_cache" bernilai True.
+    
+    Raises:
+        ValueError: tidak ada sheet yang bisa dibaca atau kolom ID SURVEY tidak ada
+    
+    Returns:
+        (DataFrame gabungan semua sheet, dict nama sheet -> pesan error)
+    """
+    file_hash = file_hash or compute_upload_hash(file_bytes)
+    cached = load_cached_upload(file_hash)
+    if cached is not None:
+        print(f"📦 File upload sama dengan sebelumnya ({file_hash[:12]}), parsing dilewati")
+        cached.attrs.update({UPLOAD_DATES_STANDARDIZED_ATTR: True, "from_cache": True})
+        return cached, {}
+    
+    if file_name.lower().endswith(".csv"):
+        # Parsing Arrow multithread; nama kolom dinormalisasi dan hanya VALID_COLUMNS yang dibaca
+        sheets = {"CSV": read_csv_upload(file_bytes, columns=VALID_COLUMNS)}
+        errors: Dict[str, str] = {}
+    else:
+        # Semua sheet diparsing paralel (satu proses per sheet)
+        sheets, errors = read_excel_sheets_parallel(file_bytes, progress_callback=progress_callback)
+    if not sheets:
+        raise ValueError("Tidak ada sheet yang dapat dibaca!")
+    
+    combined_df = pd.concat(sheets.values(), ignore_index=True)
+    if "ID SURVEY" not in combined_df.columns:
+        raise ValueError("Kolom 'ID SURVEY' tidak ditemukan!")
+    combined_df = combined_df.fillna("")
+    for col in DATE_COLUMNS:
+        if col in combined_df.columns:
+            combined_df[col] = standardize_date_series(combined_df[col].astype(str))
+    
+    # Hasil parsial (ada sheet gagal dibaca) tidak di-cache agar error tetap terlihat saat upload ulang
+    if not errors:
+        save_cached_upload(file_hash, combined_df)
+    combined_df.attrs.update({UPLOAD_DATES_STANDARDIZED_ATTR: True, "from_cache": False})
+    return combined_df, errors
+
+# ===== SYNC ENGINE (HASH-INDEXED) =====
+# Kolom koordinat tidak di-strip agar format asli tetap terjaga (contoh: -531.639)
+COORDINATE_COLUMNS = ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']
+# Nama case sinkronisasi (CASE 1, 2, 3, 4) untuk posisi baris per case
+SYNC_CASES = ["new", "updated", "duplicate_diff_content", "skipped_duplicates"]
+
+
+def clean_sync_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Siapkan DataFrame untuk sinkronisasi: semua nilai jadi string bersih,
+    placeholder null jadi string kosong, dan kolom validasi selalu tersedia.
+    """
+    clean = df.astype(str)
+    clean = clean.replace(['nan', 'None', 'NaN', 'null'], '')
+    clean = clean.fillna('')
+    for col in clean.columns:
+        if col not in COORDINATE_COLUMNS:
+            clean[col] = clean[col].str.strip()
+    for col in VALIDATION_COLUMNS:
+        if col not in clean.columns:
+            clean[col] = ''
+    return clean
+
+
+def compute_validation_hashes(clean_df: pd.DataFrame) -> np.ndarray:
+    """
+    Hitung hash per baris dari 31 VALIDATION_COLUMNS setelah normalisasi.
+    Setiap kolom di-hash secara vectorized lalu digabung menjadi satu digest per baris,
+    sehingga dua baris identik (CASE 4) cukup dibandingkan dengan satu angka uint64.
+    """
+    normalized = pd.DataFrame(
+        {
+            col: normalize_series_unique(clean_df[col], get_comparison_normalizer(col))
+            for col in VALIDATION_COLUMNS
+        },
+        index=clean_df.index,
+    )
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def build_sync_index(sheet_clean: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Bangun index sekali untuk data master: ID SURVEY → posisi baris, hash validasi
+    per baris, dan mask kolom validasi yang masih kosong (untuk CASE 2).
+    """
+    id_positions = {
+        id_survey: positions
+        for id_survey, positions in sheet_clean.groupby('ID SURVEY', sort=False).indices.items()
+        if id_survey != ''
+    }
+    return {
+        "id_positions": id_positions,
+        "row_hashes": compute_validation_hashes(sheet_clean),
+        "empty_mask": sheet_clean[VALIDATION_COLUMNS].to_numpy(dtype=object) == '',
+        "updated_positions": set(),
+        "row_count": len(sheet_clean),
+    }
+
+
+def sync_upload_rows(
+    sync_index: Dict[str, Any],
+    upload_clean: pd.DataFrame,
+    uploaded_ids: Set[str] | None = None,
+    case_positions: Dict[str, List[int]] | None = None,
+) -> Tuple[Dict[str, Any], List[int], List[Tuple[int, str, str]]]:
+    """
+    Jalankan logika 4 case untuk data upload terhadap index master.
+    
+    Args:
+        uploaded_ids: Set penampung ID yang ditambah/diupdate (default: recently_uploaded_ids).
+            Dry-run memberi set sendiri agar tracking global tidak berubah.
+        case_positions: Jika diberikan, diisi posisi baris upload per case
+            ("new", "updated", "duplicate_diff_content", "skipped_duplicates")
+    
+    Returns:
+        Tuple[dict, list, list]: (statistics, posisi baris upload yang di-append,
+        daftar pengisian kolom kosong berupa (posisi baris master, kolom, nilai baru))
+    """
+    stats = {
+        "new_rows": 0,
+        "updated_rows": 0, 
+        "skipped_duplicates": 0,
+        "duplicate_ids_with_diff_content": 0,
+        "processed_rows": len(upload_clean)
+    }
+    append_positions: List[int] = []
+    fills: List[Tuple[int, str, str]] = []
+    if uploaded_ids is None:
+        uploaded_ids = recently_uploaded_ids
+    cases = case_positions if case_positions is not None else {}
+    for case in SYNC_CASES:
+        cases.setdefault(case, [])
+    
+    if upload_clean.empty:
+        return stats, append_positions, fills
+    
+    id_positions = sync_index["id_positions"]
+    row_hashes = sync_index["row_hashes"]
+    empty_mask = sync_index["empty_mask"]
+    updated_positions = sync_index["updated_positions"]
+    
+    upload_ids = upload_clean['ID SURVEY'].to_numpy(dtype=object)
+    has_id = upload_ids != ''
+    known_id = upload_clean['ID SURVEY'].isin(id_positions.keys()).to_numpy()
+    
+    for row_num in np.flatnonzero(~has_id):
+        logger.warning(f"⚠ Baris {row_num + 1}: ID SURVEY kosong, dilewati")
+    
+    # CASE 1: ID SURVEY belum ada → langsung jadi baris baru (vectorized)
+    new_positions = np.flatnonzero(has_id & ~known_id)
+    stats["new_rows"] += len(new_positions)
+    append_positions.extend(new_positions.tolist())
+    cases["new"].extend(new_positions.tolist())
+    uploaded_ids.update(upload_ids[new_positions].tolist())
+    
+    # Baris dengan ID yang sudah ada: bandingkan hanya dengan kandidat dari index
+    existing_positions = np.flatnonzero(has_id & known_id)
+    if len(existing_positions) > 0:
+        existing_upload = upload_clean.iloc[existing_positions]
+        upload_hashes = compute_validation_hashes(existing_upload)
+        upload_values = existing_upload[VALIDATION_COLUMNS].to_numpy(dtype=object)
+        upload_filled = upload_values != ''
+        
+        for i, upload_pos in enumerate(existing_positions):
+            id_survey = upload_ids[upload_pos]
+            exact_match_found = False
+            update_performed = False
+            
+            for sheet_pos in id_positions[id_survey]:
+                # CASE 4: seluruh kolom validasi identik
+                if row_hashes[sheet_pos] == upload_hashes[i]:
+                    stats["skipped_duplicates"] += 1
+                    cases["skipped_duplicates"].append(int(upload_pos))
+                    exact_match_found = True
+                    break
+                
+                # CASE 2: ada kolom kosong di sheet yang terisi di upload
+                fillable = empty_mask[sheet_pos] & upload_filled[i]
+                if fillable.any() and sheet_pos not in updated_positions:
+                    for col_idx in np.flatnonzero(fillable):
+                        fills.append((int(sheet_pos), VALIDATION_COLUMNS[col_idx], upload_values[i, col_idx]))
+                    updated_positions.add(sheet_pos)
+                    stats["updated_rows"] += 1
+                    cases["updated"].append(int(upload_pos))
+                    update_performed = True
+                    uploaded_ids.add(id_survey)
+                    break
+            
+            if not exact_match_found and not update_performed:
+                # CASE 3: ID sama tapi konten berbeda → tambah sebagai baris baru
+                append_positions.append(int(upload_pos))
+                stats["duplicate_ids_with_diff_content"] += 1
+                stats["new_rows"] += 1
+                cases["duplicate_diff_content"].append(int(upload_pos))
+                uploaded_ids.add(id_survey)
+    
+    # Pertahankan urutan baris sesuai file upload
+    append_positions.sort()
+    
+    logger.info(
+        f"✅ {stats['new_rows'] - stats['duplicate_ids_with_diff_content']} baru | "
+        f"🔄 {stats['updated_rows']} diupdate | "
+        f"➕ {stats['duplicate_ids_with_diff_content']} konten berbeda | "
+        f"⏭ {stats['skipped_duplicates']} duplikasi absolut"
+    )
+    return stats, append_positions, fills
+
+
+def validate_and_sync_data(upload_df: pd.DataFrame, sheet_df: pd.DataFrame) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """
+    Validasi dan sinkronisasi data upload dengan data existing di Google Sheet.
+    
+    Logika dengan VALIDASI 31 KOLOM:
+    1. ID SURVEY belum ada → Tambah sebagai baris baru
+    2. ID SURVEY ada + ada kolom kosong di sheet tapi terisi di upload → Update kolom kosong
+    3. ID SURVEY ada + isi 31 kolom berbeda → Tambah sebagai baris baru (allow duplicate ID)
+    4. ID SURVEY sama + seluruh 31 kolom identik → Skip (duplikasi absolut)
+    
+    Index ID SURVEY dan hash 31 kolom dibangun sekali, sehingga biaya sinkronisasi
+    linear terhadap jumlah baris upload + master (bukan upload × master).
+    
+    Args:
+        upload_df: DataFrame dari file upload
+        sheet_df: DataFrame dari Google Sheet existing
+        
+    Returns:
+        Tuple[dict, DataFrame]: (statistics, final_merged_dataframe)
+    """
+    
+    # Prepare data - pastikan semua data sebagai string dan bersih
+    upload_clean = clean_sync_frame(upload_df)
+    sheet_clean = clean_sync_frame(sheet_df)
+    
+    logger.debug(f"Memulai dengan data existing: {len(sheet_clean)} baris")
+    print("🔍 Memulai validasi dan sinkronisasi data...")
+    
+    sync_index = build_sync_index(sheet_clean)
+    stats, append_positions, fills = sync_upload_rows(sync_index, upload_clean)
+    
+    # Start with existing sheet data - PRESERVE DATA LAMA; baris baru digabung sekali saja
+    result_df = pd.concat(
+        [sheet_clean, upload_clean.iloc[append_positions]], ignore_index=True
+    )
+    for sheet_pos, col, new_val in fills:
+        result_df.iat[sheet_pos, result_df.columns.get_loc(col)] = new_val
+    
+    # Final cleanup and numbering
+    result_df = result_df.drop(columns=['NO'], errors='ignore')
+    result_df.insert(0, 'NO', range(1, len(result_df) + 1))
+    
+    print(f"📊 Breakdown: {len(sheet_clean)} existing + {stats['new_rows']} baru = {len(result_df)} total")
+    
+    print("\n📊 Ringkasan Validasi 31 Kolom:")
+    print(f"   • Data existing dipreservasi: {len(sheet_clean)} baris")
+    print(f"   • Data baru: {stats['new_rows']}")
+    print(f"   • Data diupdate: {stats['updated_rows']}")
+    print(f"   • Duplikasi diabaikan: {stats['skipped_duplicates']}")
+    print(f"   • ID ganda dengan konten berbeda: {stats['duplicate_ids_with_diff_content']}")
+    print(f"   • Total diproses: {stats['processed_rows']}")
+    print(f"   • TOTAL FINAL: {len(result_df)} baris (TIDAK ADA DATA YANG HILANG!)")
+    
+    return stats, result_df
+
+
+def is_row_identical(row1: pd.Series, row2: pd.Series, validation_columns: List[str]) -> bool:
+    """
+    Periksa apakah dua baris identik berdasarkan kolom validasi.
+    PENTING: Koordinat TIDAK di-strip untuk preservasi format asli (contoh: -531.639)
+    
+    Args:
+        row1: Series pertama
+        row2: Series kedua  
+        validation_columns: List kolom yang digunakan untuk perbandingan
+        
+    Returns:
+        bool: True jika identik, False jika berbeda
+    """
+    for col in validation_columns:
+        if col in ['KOORDINAT X', 'KOORDINAT Y', 'KOORDINAT TEMUAN']:
+            # Untuk koordinat: jangan strip, hanya konversi ke string
             val1 = str(row1.get(col, ''))
             val2 = str(row2.get(col, ''))
         else:
@@ -1450,52 +3158,713 @@ def debug_row_comparison(upload_row: pd.Series, sheet_row: pd.Series, validation
         "has_updatable": len(comparison["updatable_fields"]) > 0
     }
     
-    return comparison
+    return comparison
+
+
+def validate_data_integrity(df: pd.DataFrame) -> Tuple[bool, List[str]]:
+    """
+    Validasi integritas data untuk memastikan konsistensi.
+    
+    Args:
+        df: DataFrame untuk divalidasi
+        
+    Returns:
+        Tuple[bool, List[str]]: (is_valid, error_messages)
+    """
+    errors = []
+    
+    # Check for required columns
+    missing_required = [col for col in ["ID SURVEY"] if col not in df.columns]
+    if missing_required:
+        errors.append(f"Kolom wajib tidak ada: {missing_required}")
+    
+    # Check for empty ID SURVEY
+    if 'ID SURVEY' in df.columns:
+        empty_ids = df[df['ID SURVEY'].astype(str).str.strip() == '']
+        if not empty_ids.empty:
+            errors.append(f"Ditemukan {len(empty_ids)} baris dengan ID SURVEY kosong")
+    
+    # Check for completely empty rows
+    empty_rows = df[df.astype(str).apply(lambda x: x.str.strip().eq('').all(), axis=1)]
+    if not empty_rows.empty:
+        errors.append(f"Ditemukan {len(empty_rows)} baris yang sepenuhnya kosong")
+    
+    # Check data types consistency
+    non_string_cols = []
+    for col in df.columns:
+        if not df[col].dtype == 'object':
+            non_string_cols.append(col)
+    
+    if non_string_cols:
+        errors.append(f"Kolom dengan tipe data non-string: {non_string_cols}")
+    
+    is_valid = len(errors) == 0
+    return is_valid, errors
+
+# ===== DELTA WRITER UNTUK MASTERDATA =====
+# Jumlah baris per panggilan append_rows agar payload tetap di bawah batas request Sheets
+APPEND_BATCH_SIZE = 500
+
+
+def get_master_header(worksheet) -> List[str]:
+    """
+    Ambil header MasterData; tulis header VALID_COLUMNS jika sheet masih kosong.
+    Kolom ROW_VERSION_COLUMN ditambahkan (tersembunyi) di ujung kanan jika belum ada.
+    """
+    header = worksheet.row_values(1)
+    if not header:
+        worksheet.update([VALID_COLUMNS], "A1")
+        header = list(VALID_COLUMNS)
+    if ROW_VERSION_COLUMN not in header:
+        header = header + [ROW_VERSION_COLUMN]
+        if worksheet.col_count < len(header):
+            worksheet.add_cols(len(header) - worksheet.col_count)
+        worksheet.update([[ROW_VERSION_COLUMN]], gspread.utils.rowcol_to_a1(1, len(header)))
+        worksheet.hide_columns(len(header) - 1, len(header))
+    return header
+
+
+def _appended_row_range(response: Dict[str, Any]) -> Tuple[int, int] | None:
+    """Rentang baris hasil append_rows dari updatedRange respons, mis. 'MasterData!A201:AL210'."""
+    try:
+        start_cell, end_cell = response["updates"]["updatedRange"].split("!")[-1].split(":")
+        return gspread.utils.a1_to_rowcol(start_cell)[0], gspread.utils.a1_to_rowcol(end_cell)[0]
+    except (KeyError, TypeError, ValueError, AttributeError, gspread.exceptions.IncorrectCellLabel):
+        return None
+
+
+def next_master_no(master_df: pd.DataFrame) -> int:
+    """
+    Nomor NO untuk baris baru pertama. Bukan len(master) + 1: read_master_data membuang baris
+    kosong, sehingga jumlah baris bisa lebih kecil dari nomor yang sudah terpakai.
+    Diambil yang terbesar dari NO numerik yang ada dan nomor baris sheet terakhir - 1
+    (index master = baris sheet - 2), lalu + 1.
+    """
+    if master_df.empty:
+        return 1
+    last_no = int(master_df.index.max()) + 1
+    if 'NO' in master_df.columns:
+        existing_no = pd.to_numeric(master_df['NO'], errors='coerce').max()
+        if pd.notna(existing_no):
+            last_no = max(last_no, int(existing_no))
+    return last_no + 1
+
+
+def master_row_values(
+    header: List[str], rows_df: pd.DataFrame, start_no: int, row_version: int | None = None
+) -> List[List[Any]]:
+    """Nilai baris baru persis seperti yang ditulis ke sheet (urutan header, NO, versi baris)."""
+    rows = rows_df.reindex(columns=header, fill_value='')
+    if 'NO' in header:
+        rows['NO'] = range(start_no, start_no + len(rows))
+    if row_version is not None and ROW_VERSION_COLUMN in header:
+        rows[ROW_VERSION_COLUMN] = row_version
+    return rows.fillna('').to_numpy(dtype=object).tolist()
+
+
+def append_master_rows(
+    worksheet, header: List[str], rows_df: pd.DataFrame, start_no: int, row_version: int | None = None
+) -> Tuple[int, Tuple[int, int] | None]:
+    """
+    Tambahkan baris baru ke bawah MasterData lewat append_rows per batch.
+    
+    Args:
+        row_version: Nilai ROW_VERSION_COLUMN untuk semua baris baru (None = kosong)
+    
+    Returns:
+        (jumlah sel yang ditulis, rentang baris sheet yang ditambahkan atau None jika
+        tidak diketahui dari respons)
+    """
+    if rows_df.empty:
+        return 0, None
+    
+    values = master_row_values(header, rows_df, start_no, row_version)
+    
+    appended = []
+    for batch_start in range(0, len(values), APPEND_BATCH_SIZE):
+        response = worksheet.append_rows(
+            values[batch_start:batch_start + APPEND_BATCH_SIZE],
+            value_input_option="RAW",
+            insert_data_option="INSERT_ROWS",
+            table_range="A1",
+        )
+        appended.append(_appended_row_range(response))
+    
+    # Batch berurutan -> satu rentang; selain itu rentang tidak bisa dipastikan
+    contiguous = all(appended) and all(
+        appended[i][0] == appended[i - 1][1] + 1 for i in range(1, len(appended))
+    )
+    appended_range = (appended[0][0], appended[-1][1]) if contiguous else None
+    return len(values) * len(header), appended_range
+
+
+def update_master_cells(worksheet, header: List[str], cell_updates: List[Tuple[int, str, str]]) -> int:
+    """
+    Isi sel kosong di MasterData dengan satu batch_update berisi range A1 persis.
+    
+    Args:
+        cell_updates: List (nomor baris sheet, nama kolom, nilai baru)
+        
+    Returns:
+        int: Jumlah sel yang ditulis
+    """
+    data = []
+    for row_num, col, value in cell_updates:
+        if col not in header:
+            logger.warning(f"⚠ Kolom {col} tidak ada di header MasterData, update dilewati")
+            continue
+        data.append({
+            "range": gspread.utils.rowcol_to_a1(row_num, header.index(col) + 1),
+            "values": [[value]],
+        })
+    
+    if data:
+        worksheet.batch_update(data, value_input_option="RAW")
+    return len(data)
+
+
+def delete_master_rows(worksheet, row_numbers: List[int]) -> int:
+    """
+    Hapus baris MasterData per rentang berurutan lewat delete_rows.
+    Rentang dihapus dari bawah ke atas agar nomor baris lain tidak bergeser.
+    
+    Returns:
+        int: Jumlah baris yang dihapus
+    """
+    ranges = row_ranges(row_numbers)
+    for start_row, end_row in reversed(ranges):
+        worksheet.delete_rows(start_row, end_row)
+    return sum(end_row - start_row + 1 for start_row, end_row in ranges)
+
+
+def renumber_master_rows(worksheet, header: List[str], first_row: int, last_row: int) -> int:
+    """
+    Tulis ulang kolom NO hanya untuk baris first_row..last_row (satu range).
+    
+    Returns:
+        int: Jumlah sel yang ditulis
+    """
+    col_letter = gspread.utils.rowcol_to_a1(1, header.index('NO') + 1).rstrip('1')
+    values = [[row_num - 1] for row_num in range(first_row, last_row + 1)]
+    worksheet.update(values, f"{col_letter}{first_row}:{col_letter}{last_row}")
+    return len(values)
+
+
+def write_master_delta(
+    worksheet,
+    new_rows: pd.DataFrame,
+    cell_updates: List[Tuple[int, str, str]],
+    start_no: int,
+    header: List[str] | None = None,
+    version_state: Tuple[Any, Dict[str, int] | None] | None = None,
+    revision: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Tulis hanya perubahan ke MasterData: baris baru via append_rows dan pengisian
+    kolom kosong via batch_update. Tidak ada worksheet.clear(), sehingga sheet tidak
+    pernah kosong meskipun penulisan gagal di tengah jalan.
+    
+    Setiap penulisan mendapat satu versi baru: baris yang disentuh diberi nilai versi di
+    ROW_VERSION_COLUMN dan rentangnya dicatat di jurnal sheet meta untuk refresh inkremental.
+    
+    Args:
+        header: Header MasterData yang sudah diketahui (None = dibaca dari sheet)
+        version_state: (sheet meta, versi saat ini) yang sudah diketahui (None = dibaca dari sheet)
+        revision: Revisi spreadsheet yang dicek tepat sebelum penulisan (None = dibaca sekarang),
+            dicatat di jurnal sebagai awal rantai revisi
+    
+    Returns:
+        Dict[str, Any]: Jumlah baris/sel yang ditulis per operasi, rentang baris hasil append,
+        serta versi & epoch baru (None jika sheet meta tidak tersedia)
+    """
+    if header is None:
+        header = get_master_header(worksheet)
+    meta_ws, current = version_state if version_state is not None else open_master_version()
+    version = current["version"] + 1 if current else None
+    if revision is None and meta_ws is not None:
+        revision = get_master_revision()
+    
+    updated_rows = sorted({row_num for row_num, _, _ in cell_updates})
+    if version is not None:
+        cell_updates = cell_updates + [(row_num, ROW_VERSION_COLUMN, str(version)) for row_num in updated_rows]
+    update_cells = update_master_cells(worksheet, header, cell_updates)
+    append_cells, appended = append_master_rows(worksheet, header, new_rows, start_no, row_version=version)
+    
+    # Rentang append tidak diketahui -> epoch naik agar reader baca penuh
+    structural = not new_rows.empty and appended is None
+    if meta_ws is not None:
+        record_master_change(
+            meta_ws, current, appended=appended, updated_rows=updated_rows, structural=structural,
+            revision=revision, grid_rows=worksheet.row_count,
+        )
+    return {
+        "appended_rows": len(new_rows),
+        "append_cells": append_cells,
+        "update_cells": update_cells,
+        "appended_range": appended,
+        "version": version,
+        "epoch": current["epoch"] + (1 if structural else 0) if current else None,
+    }
+
+
+def prepare_upload_frame(new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Siapkan data upload untuk sinkronisasi - PERTAHANKAN FORMAT ASLI:
+    drop NO, konversi ke string, standardisasi DATE_COLUMNS, dan buang baris tanpa ID SURVEY.
+    """
+    upload_df = new_df.drop(columns=['NO'], errors='ignore')
+    
+    # HANYA konversi ke string untuk keperluan validasi, TIDAK mengubah format
+    upload_df = upload_df.astype(str)
+    
+    # HANYA standardisasi tanggal untuk konsistensi sistem dashboard - ini diperlukan
+    # (dilewati jika frame dari load_upload_frame, yang sudah distandardisasi / dari cache)
+    if new_df.attrs.get(UPLOAD_DATES_STANDARDIZED_ATTR):
+        date_columns = []
+    else:
+        logger.info("📅 Standardisasi format tanggal untuk dashboard (diperlukan sistem)...")
+        date_columns = DATE_COLUMNS
+    for col in date_columns:
+        if col in upload_df.columns:
+            # Simpan nilai asli sebagai backup
+            original_values = upload_df[col]
+            upload_df[col] = standardize_date_series(upload_df[col])
+            # Log berapa nilai yang diubah
+            changed_count = int((original_values != upload_df[col]).sum())
+            if changed_count > 0:
+                print(f"   ℹ️ {col}: {changed_count} tanggal distandardisasi untuk dashboard")
+    
+    # Filter data yang valid (ID SURVEY tidak kosong)
+    upload_df = upload_df.loc[upload_df['ID SURVEY'].notna()]
+    upload_df = upload_df.loc[upload_df['ID SURVEY'].astype(str).str.strip() != '']
+    return upload_df
+
+
+def build_upload_summary(stats: Dict[str, Any]) -> str:
+    """Buat pesan ringkasan upload yang informatif dengan 4 case."""
+    summary_parts = []
+    if stats['new_rows'] > 0:
+        summary_parts.append(f"✅ {stats['new_rows']} record baru ditambahkan")
+    if stats['updated_rows'] > 0:
+        summary_parts.append(f"🔄 {stats['updated_rows']} record di-update")
+    if stats['duplicate_ids_with_diff_content'] > 0:
+        summary_parts.append(f"📋 {stats['duplicate_ids_with_diff_content']} duplikasi ID diizinkan")
+    if stats['skipped_duplicates'] > 0:
+        summary_parts.append(f"⏭️ {stats['skipped_duplicates']} record identik diabaikan")
+    
+    summary = " | ".join(summary_parts) if summary_parts else "Tidak ada perubahan data"
+    return f"✅ Upload selesai!\n📊 {summary}\n🎯 Total diproses: {stats['processed_rows']} baris"
+
+
+# ===== SESI SINKRONISASI (SATU BACA MASTER PER UPLOAD) =====
+@st.cache_resource(show_spinner=False)
+def get_sync_session_store() -> Dict[str, Any]:
+    """Sesi sinkronisasi terakhir yang belum menulis, dipakai ulang oleh upload berikutnya."""
+    return {"lock": threading.Lock(), "session": None}
+
+
+def open_sync_session() -> Dict[str, Any]:
+    """
+    Buka sesi sinkronisasi: snapshot MasterData dibaca sekali dan index ID SURVEY dibangun
+    sekali, lalu dipakai oleh validasi, penulisan, log dan refresh cache satu upload.
+    
+    Header sheet serta versi/epoch diambil dari metadata snapshot (hanya jika revisinya
+    diketahui), sehingga penulisan tidak perlu membaca header atau sheet meta lagi.
+    """
+    # Generation dicatat sebelum membaca master: upload lain di tengah jalan membuat sesi stale
+    generation = get_data_store()["generation"]
+    logger.info("📖 Membaca data existing (snapshot) untuk sesi sinkronisasi...")
+    master_df = read_master_data_snapshot()
+    meta = load_master_snapshot_meta()
+    if master_df.empty:
+        sheet_df = pd.DataFrame(columns=VALID_COLUMNS)
+    else:
+        sheet_df = master_df.drop(columns=['NO'], errors='ignore')
+    sheet_clean = clean_sync_frame(sheet_df)
+    revision = meta.get("revision")
+    version_info = None
+    if revision is not None and meta.get("version") is not None:
+        version_info = {"version": meta["version"], "epoch": meta["epoch"]}
+    return {
+        "generation": generation,
+        "revision": revision,
+        # Revisi saat frame sesi sama persis dengan isi sheet; maju setiap penulisan sesi
+        "expected_revision": revision,
+        "full_read_at": meta.get("full_read_at"),
+        "master_df": master_df,
+        "sheet_clean": sheet_clean,
+        "sync_index": build_sync_index(sheet_clean),
+        "header": meta.get("header") or master_df.attrs.get("master_header"),
+        "version_info": version_info,
+        "worksheets": None,
+        "written": False,
+        "seedable": True,
+        # Baris hasil delta (sudah diproses) yang digabung ke master_df saat commit
+        "changed_frames": [],
+        "stale_index": [],
+    }
+
+
+def get_sync_session() -> Dict[str, Any]:
+    """
+    Sesi sinkronisasi untuk generation data master saat ini. Sesi dipakai ulang selama
+    generation dan revisi spreadsheet belum berubah (satu panggilan revisi, tanpa baca sheet).
+    """
+    generation = get_data_store()["generation"]
+    store = get_sync_session_store()
+    with store["lock"]:
+        session = store["session"]
+    if (
+        session is not None
+        and session["generation"] == generation
+        and session["revision"] is not None
+        and get_master_revision() == session["revision"]
+    ):
+        return session
+    
+    session = open_sync_session()
+    with store["lock"]:
+        store["session"] = session
+    return session
+
+
+def new_sync_index(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Index sesi dengan penanda CASE 2 sendiri (sync_upload_rows mengisi updated_positions)."""
+    return dict(session["sync_index"], updated_positions=set())
+
+
+def get_session_worksheet(session: Dict[str, Any], name: str):
+    """
+    Handle worksheet sesi. Semua handle diambil sekali lewat sh.worksheets() (satu request
+    metadata), bukan satu request sh.worksheet() per sheet.
+    
+    Raises:
+        gspread.exceptions.WorksheetNotFound: sheet tidak ada
+    """
+    worksheets = session["worksheets"]
+    if worksheets is None:
+        worksheets = session["worksheets"] = {ws.title: ws for ws in get_spreadsheet().worksheets()}
+    if name not in worksheets:
+        worksheets[name] = get_spreadsheet().worksheet(name)
+    return worksheets[name]
 
 
-def validate_data_integrity(df: pd.DataFrame) -> Tuple[bool, List[str]]:
+def open_session_version(session: Dict[str, Any]) -> Tuple[Any, Dict[str, int] | None]:
+    """Seperti open_master_version, tetapi memakai handle dan versi yang sudah diketahui sesi."""
+    try:
+        meta_ws = get_session_worksheet(session, MASTER_META_SHEET_NAME)
+    except gspread.exceptions.WorksheetNotFound:
+        meta_ws, current = open_master_version()
+        if meta_ws is not None:
+            session["worksheets"][MASTER_META_SHEET_NAME] = meta_ws
+        return meta_ws, current
+    except Exception as e:
+        logger.warning(f"⚠️ Sheet meta versi MasterData tidak tersedia: {str(e)}")
+        return None, None
+    if session["version_info"] is None:
+        session["version_info"] = read_master_version(meta_ws) or {"version": 0, "epoch": 0}
+    return meta_ws, session["version_info"]
+
+
+def apply_session_delta(
+    session: Dict[str, Any],
+    new_rows: pd.DataFrame,
+    cell_updates: List[Tuple[int, str, str]],
+    start_no: int,
+    write_report: Dict[str, Any],
+) -> None:
     """
-    Validasi integritas data untuk memastikan konsistensi.
+    Proses delta yang baru ditulis seperti read_master_changes, tetapi tanpa fetch: baris baru
+    diambil dari nilai yang ditulis, baris yang kolom kosongnya diisi dibangun dari frame sesi.
+    Hasilnya ditampung di sesi dan digabung sekali saat commit_sync_session.
+    Jika rentang append atau versi tidak diketahui, sesi ditandai tidak bisa di-seed.
+    """
+    appended = write_report["appended_range"]
+    if write_report["version"] is None or (not new_rows.empty and appended is None):
+        session["seedable"] = False
+    if not session["seedable"]:
+        return
+    
+    header = session["header"]
+    if not new_rows.empty:
+        row_numbers = list(range(appended[0], appended[1] + 1))
+        values = master_row_values(header, new_rows, start_no, write_report["version"])
+        session["changed_frames"].append(process_master_values(header, values, row_numbers))
+    if cell_updates:
+        # Index sync tidak berubah selama sesi, sehingga baris yang diisi selalu baris master asli
+        updated_rows = sorted({row_num for row_num, _, _ in cell_updates})
+        stale_index = [row_num - 2 for row_num in updated_rows]
+        rows = session["master_df"].reindex(index=stale_index).reindex(columns=header)
+        for row_num, col, value in cell_updates:
+            if col in header:
+                rows.at[row_num - 2, col] = value
+        values = rows.fillna('').astype(str).to_numpy(dtype=object).tolist()
+        session["changed_frames"].append(process_master_values(header, values, updated_rows))
+        session["stale_index"].extend(stale_index)
+
+
+def write_session_delta(
+    session: Dict[str, Any],
+    new_rows: pd.DataFrame,
+    cell_updates: List[Tuple[int, str, str]],
+    start_no: int,
+    revision_before: str | None,
+) -> Dict[str, Any]:
+    """
+    write_master_delta dengan handle worksheet, header dan versi dari sesi; versi sesi
+    dimajukan setelah penulisan dan delta diterapkan ke frame master sesi.
     
     Args:
-        df: DataFrame untuk divalidasi
-        
+        revision_before: Revisi spreadsheet yang dicek tepat sebelum penulisan. Jika berbeda
+            dengan revisi yang diharapkan sesi (sheet diedit dari luar sejak sesi dibuka atau
+            sejak penulisan sebelumnya), frame sesi tidak lagi sama dengan sheet sehingga sesi
+            ditandai tidak bisa di-seed.
+    """
+    # Sesi yang sudah menulis tidak lagi mencerminkan index master -> jangan dipakai ulang
+    if not session["written"]:
+        session["written"] = True
+        store = get_sync_session_store()
+        with store["lock"]:
+            if store["session"] is session:
+                store["session"] = None
+    
+    if revision_before is None or revision_before != session["expected_revision"]:
+        print("🔀 Sheet berubah di luar sesi sebelum penulisan, snapshot akan dibaca ulang")
+        session["seedable"] = False
+    
+    worksheet = get_session_worksheet(session, MASTER_SHEET_NAME)
+    if not session["header"] or ROW_VERSION_COLUMN not in session["header"]:
+        session["header"] = get_master_header(worksheet)
+    try:
+        write_report = write_master_delta(
+            worksheet, new_rows, cell_updates, start_no,
+            header=session["header"], version_state=open_session_version(session),
+            revision=revision_before,
+        )
+    except Exception:
+        # Penulisan sebagian tidak bisa direkonstruksi -> commit kembali ke baca ulang
+        session["seedable"] = False
+        raise
+    if write_report["version"] is not None:
+        session["version_info"] = {"version": write_report["version"], "epoch": write_report["epoch"]}
+    apply_session_delta(session, new_rows, cell_updates, start_no, write_report)
+    if session["seedable"]:
+        # Penulisan berikutnya (chunk streaming) harus dimulai dari revisi hasil penulisan ini
+        session["expected_revision"] = get_master_revision()
+    return write_report
+
+
+def commit_sync_session(session: Dict[str, Any]) -> int | None:
+    """
+    Selesaikan sesi yang sudah menulis: frame master sesi disimpan sebagai snapshot lokal
+    dan dipakai langsung sebagai data store bersama (seed_data_store), sehingga tidak ada
+    baca ulang MasterData setelah upload. Jika delta tidak bisa diterapkan, kembali ke
+    bump_data_generation (data dibaca ulang lewat jurnal versi).
+    
+    Seed hanya dilakukan jika setiap penulisan sesi dimulai tepat dari revisi yang diharapkan
+    sesi (write_session_delta). Jika sheet diedit dari luar sejak sesi dibuka, snapshot tidak
+    disimpan dengan revisi setelah penulisan (edit tersebut akan tercatat sebagai sudah
+    termuat); data dibaca ulang lewat bump_data_generation dan jurnal menolak snapshot lama
+    sehingga terjadi baca penuh.
+    
     Returns:
-        Tuple[bool, List[str]]: (is_valid, error_messages)
+        Generation baru, atau None jika sesi tidak menulis apa pun
     """
-    errors = []
+    if not session["written"]:
+        return None
+    if session["seedable"]:
+        merged = pd.concat([
+            session["master_df"].drop(index=session["stale_index"], errors="ignore"),
+            *session["changed_frames"],
+        ]).sort_index()
+        merged.attrs["master_header"] = list(session["header"])
+        session["master_df"] = merged
+        session["changed_frames"], session["stale_index"] = [], []
+        revision = get_master_revision()
+        if save_master_snapshot(
+            merged, revision, session["version_info"],
+            header=session["header"], full_read_at=session["full_read_at"],
+        ):
+            return seed_data_store(merged, revision)
+    return bump_data_generation()
+
+
+# ===== RENCANA SINKRONISASI (DRY-RUN) =====
+# Jumlah rencana yang disimpan di memori proses (LRU); rencana generation lama dibuang
+SYNC_PLAN_CACHE_SIZE = 8
+# stage_callback(nama_tahap) dipanggil saat tahap upload berganti (lihat UPLOAD_JOB_STAGES)
+StageCallback = Callable[[str], None]
+
+
+@st.cache_resource(show_spinner=False)
+def get_sync_plan_cache() -> Dict[str, Any]:
+    """Cache rencana sinkronisasi per (hash file, generation), dipakai bersama semua sesi."""
+    return {"lock": threading.Lock(), "plans": OrderedDict()}
+
+
+def build_sync_plan(
+    new_df: pd.DataFrame, file_hash: str | None = None, stage_callback: StageCallback | None = None
+) -> Dict[str, Any]:
+    """
+    Jalankan logika 4 case validate_and_sync_data secara read-only (dry-run).
+    Tidak ada penulisan ke sheet dan recently_uploaded_ids tidak berubah.
     
-    # Check for required columns
-    missing_required = [col for col in ["ID SURVEY"] if col not in df.columns]
-    if missing_required:
-        errors.append(f"Kolom wajib tidak ada: {missing_required}")
+    Raises:
+        ValueError: struktur upload tidak valid atau tidak ada baris dengan ID SURVEY
     
-    # Check for empty ID SURVEY
-    if 'ID SURVEY' in df.columns:
-        empty_ids = df[df['ID SURVEY'].astype(str).str.strip() == '']
-        if not empty_ids.empty:
-            errors.append(f"Ditemukan {len(empty_ids)} baris dengan ID SURVEY kosong")
+    Returns:
+        dict rencana:
+        - stats: statistik 4 case (sama dengan validate_and_sync_data)
+        - cases: label baris upload per case (SYNC_CASES)
+        - fills: list (nomor baris sheet, kolom, nilai baru) untuk CASE 2
+        - new_rows: DataFrame baris yang akan di-append (CASE 1 + CASE 3)
+        - start_no, uploaded_ids, generation, revision, file_hash, created_at
+        - session: sesi sinkronisasi (snapshot, index, handle worksheet) untuk eksekusi
+    """
+    is_valid, msg = validate_sheet_structure(new_df)
+    if not is_valid:
+        raise ValueError(msg)
     
-    # Check for completely empty rows
-    empty_rows = df[df.astype(str).apply(lambda x: x.str.strip().eq('').all(), axis=1)]
-    if not empty_rows.empty:
-        errors.append(f"Ditemukan {len(empty_rows)} baris yang sepenuhnya kosong")
+    if stage_callback:
+        stage_callback("standardize")
+    upload_df = prepare_upload_frame(new_df)
+    if upload_df.empty:
+        raise ValueError("Tidak ada data valid untuk diproses (ID SURVEY kosong semua)")
     
-    # Check data types consistency
-    non_string_cols = []
-    for col in df.columns:
-        if not df[col].dtype == 'object':
-            non_string_cols.append(col)
+    if stage_callback:
+        stage_callback("sync")
+    session = get_sync_session()
+    sheet_clean = session["sheet_clean"]
+    upload_clean = clean_sync_frame(upload_df)
+    uploaded_ids: Set[str] = set()
+    case_positions: Dict[str, List[int]] = {}
+    stats, append_positions, fills = sync_upload_rows(
+        new_sync_index(session), upload_clean, uploaded_ids, case_positions
+    )
     
-    if non_string_cols:
-        errors.append(f"Kolom dengan tipe data non-string: {non_string_cols}")
+    return {
+        "file_hash": file_hash,
+        "generation": session["generation"],
+        "revision": session["revision"],
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "stats": stats,
+        "cases": {case: upload_clean.index[positions].tolist() for case, positions in case_positions.items()},
+        # Index read_master_data = posisi baris data, sehingga baris sheet = index + 2
+        "fills": [(int(sheet_clean.index[sheet_pos]) + 2, col, new_val) for sheet_pos, col, new_val in fills],
+        "new_rows": upload_clean.iloc[append_positions],
+        "start_no": next_master_no(session["master_df"]),
+        "uploaded_ids": sorted(uploaded_ids),
+        "session": session,
+        "executed": False,
+    }
+
+
+def get_sync_plan(
+    new_df: pd.DataFrame, file_hash: str, stage_callback: StageCallback | None = None
+) -> Dict[str, Any]:
+    """
+    Rencana sinkronisasi untuk file upload, di-cache per (hash file, generation data master).
+    File yang sama terhadap data master yang sama tidak pernah dibandingkan dua kali.
+    """
+    generation = get_data_store()["generation"]
+    key = (file_hash, generation)
+    cache = get_sync_plan_cache()
+    with cache["lock"]:
+        plan = cache["plans"].get(key)
+        if plan is not None:
+            cache["plans"].move_to_end(key)
+            return plan
     
-    is_valid = len(errors) == 0
-    return is_valid, errors
+    plan = build_sync_plan(new_df, file_hash, stage_callback)
+    with cache["lock"]:
+        plans = cache["plans"]
+        for stale_key in [k for k in plans if k[1] != plan["generation"]]:
+            del plans[stale_key]
+        plans[(file_hash, plan["generation"])] = plan
+        while len(plans) > SYNC_PLAN_CACHE_SIZE:
+            plans.popitem(last=False)
+    return plan
+
+
+def has_sync_changes(plan: Dict[str, Any]) -> bool:
+    """True jika rencana berisi baris baru atau pengisian kolom kosong."""
+    return plan["stats"]["new_rows"] > 0 or plan["stats"]["updated_rows"] > 0
+
+
+def is_sync_plan_current(plan: Dict[str, Any]) -> bool:
+    """
+    False jika data master berubah sejak rencana dibuat (generation naik / revisi berbeda).
+    Revisi yang dicek disimpan di plan["checked_revision"] untuk penulisan sesudahnya.
+    """
+    if get_data_store()["generation"] != plan["generation"]:
+        return False
+    current_revision = plan["checked_revision"] = get_master_revision()
+    return not (plan["revision"] and current_revision and current_revision != plan["revision"])
+
+
+def execute_sync_plan(plan: Dict[str, Any], stage_callback: StageCallback | None = None) -> Tuple[bool, str]:
+    """
+    Tulis rencana sinkronisasi ke MasterData tanpa membandingkan ulang data.
+    
+    Rencana ditolak jika sudah pernah dieksekusi, atau jika data master berubah sejak rencana
+    dibuat (generation naik atau revisi spreadsheet berbeda) karena nomor baris pengisian
+    kolom kosong bisa sudah bergeser.
+    """
+    cache = get_sync_plan_cache()
+    with cache["lock"]:
+        if plan["executed"]:
+            return False, "Rencana upload ini sudah disimpan sebelumnya"
+        plan["executed"] = True
+        cache["plans"].pop((plan["file_hash"], plan["generation"]), None)
+    
+    try:
+        recently_uploaded_ids.clear()
+        stats = plan["stats"]
+        
+        if has_sync_changes(plan):
+            if not is_sync_plan_current(plan):
+                return False, "Data master berubah sejak preview dibuat. Silakan tinjau ulang rencana upload."
+            
+            # SAFE UPDATE - TIDAK HAPUS DATA LAMA, HANYA APPEND/UPDATE (delta)
+            if stage_callback:
+                stage_callback("write")
+            print("💾 Menyimpan perubahan ke Google Sheet (delta write)...")
+            session = plan["session"]
+            try:
+                write_report = write_session_delta(
+                    session, plan["new_rows"], plan["fills"], plan["start_no"],
+                    revision_before=plan["checked_revision"],
+                )
+            except Exception:
+                commit_sync_session(session)
+                raise
+            recently_uploaded_ids.update(plan["uploaded_ids"])
+            print(f"✅ Data berhasil disimpan dengan preservasi data existing: {write_report}")
+            if stage_callback:
+                stage_callback("log")
+            simpan_log(
+                "Upload Data", stats["new_rows"] + stats["updated_rows"],
+                worksheet=(session["worksheets"] or {}).get(LOG_SHEET_NAME),
+            )
+            # Commit setelah log: sheet log ada di spreadsheet yang sama, sehingga revisi
+            # yang dicatat snapshot hasil seed sudah mencakup penulisan log
+            commit_sync_session(session)
+        else:
+            print("ℹ️ Tidak ada perubahan data, database existing tetap utuh")
+        
+        logger.info("✅ Sinkronisasi dengan validasi 4 case selesai - DATA LAMA AMAN!")
+        return True, build_upload_summary(stats)
+    
+    except Exception as e:
+        recently_uploaded_ids.clear()
+        print(f"❌ Error: {str(e)}")
+        return False, f"Gagal memproses data: {str(e)}"
+
 
 def append_or_update_data(new_df: pd.DataFrame) -> Tuple[bool, str]:
     """
     Proses upload data dengan VALIDASI 31 KOLOM CANGGIH dan PRESERVASI FORMAT ASLI.
+    Rencana sinkronisasi dibuat (build_sync_plan) lalu langsung dieksekusi.
     
     PRINSIP PRESERVASI DATA:
     - Format asli data DIPERTAHANKAN sepenuhnya
@@ -1509,120 +3878,297 @@ def append_or_update_data(new_df: pd.DataFrame) -> Tuple[bool, str]:
     4. ID SURVEY sama + seluruh 31 kolom identik → Skip (duplikasi absolut)
     """
     try:
-        # Reset recently uploaded IDs
+        recently_uploaded_ids.clear()
+        plan = build_sync_plan(new_df)
+    except ValueError as e:
+        return False, str(e)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False, f"Gagal memproses data: {str(e)}"
+    return execute_sync_plan(plan)
+
+def append_or_update_data_streaming(
+    file_bytes: bytes,
+    file_name: str,
+    chunk_rows: int = UPLOAD_CHUNK_ROWS,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> Tuple[bool, str]:
+    """
+    Mode upload streaming: file dibaca per `chunk_rows` baris, setiap chunk distandardisasi,
+    disinkronkan terhadap index ID SURVEY master, lalu delta-nya langsung ditulis ke sheet.
+    Memori puncak sisi upload dibatasi ukuran chunk, bukan total isi file.
+
+    Header semua sheet dicek sekali di awal dengan select_upload_sheets (aturan ID SURVEY
+    yang sama dengan load_upload_frame), sebelum chunk pertama ditulis. Logika 4 case sama dengan
+    append_or_update_data: setiap baris upload dibandingkan dengan data master (index tidak
+    berubah antar chunk).
+
+    Args:
+        progress_callback: dipanggil setelah setiap chunk ditulis (nomor chunk, total baris diproses)
+    """
+    try:
         recently_uploaded_ids.clear()
         
-        # VALIDASI STRUKTUR DATA
-        is_valid, msg = validate_sheet_structure(new_df)
-        if not is_valid:
-            return False, msg
-        
-        # Inisialisasi koneksi jika belum ada
-        global sh
-        if sh is None:
-            sh = get_google_sheet_connection()
+        # Header tidak valid -> ditolak sebelum master dibaca dan sebelum ada yang ditulis
+        sheet_names = set(select_upload_sheets(read_upload_headers(file_bytes, file_name)))
         
-        # Baca data existing dari Google Sheet
-        logger.info("📖 Membaca data existing dari Google Sheet...")
-        existing_df = read_master_data()
+        # Snapshot dan index master dari sesi (dibaca sekali); index tidak berubah antar chunk
+        session = get_sync_session()
+        sync_index = new_sync_index(session)
+        sheet_row_numbers = session["sheet_clean"].index.to_numpy()
+        next_no = next_master_no(session["master_df"])
         
-        # Persiapan data upload - PERTAHANKAN FORMAT ASLI
-        logger.info("🔧 Mempersiapkan data upload dengan mempertahankan format asli...")
-        upload_df = new_df.copy()
-        upload_df = upload_df.drop(columns=['NO'], errors='ignore')
+        totals = {
+            "new_rows": 0,
+            "updated_rows": 0,
+            "skipped_duplicates": 0,
+            "duplicate_ids_with_diff_content": 0,
+            "processed_rows": 0,
+        }
+        chunk_number = 0
+        try:
+            for sheet_name, chunk in iter_upload_chunks(file_bytes, file_name, chunk_rows):
+                chunk_number += 1
+                if sheet_name not in sheet_names:
+                    continue
+                upload_clean = clean_sync_frame(prepare_upload_frame(chunk))
+                if upload_clean.empty:
+                    continue
+                
+                stats, append_positions, fills = sync_upload_rows(sync_index, upload_clean)
+                for key in totals:
+                    totals[key] += stats[key]
+                if stats["new_rows"] > 0 or stats["updated_rows"] > 0:
+                    # Index read_master_data = posisi baris data, sehingga baris sheet = index + 2
+                    cell_updates = [
+                        (int(sheet_row_numbers[sheet_pos]) + 2, col, new_val)
+                        for sheet_pos, col, new_val in fills
+                    ]
+                    write_session_delta(
+                        session, upload_clean.iloc[append_positions], cell_updates, next_no,
+                        revision_before=get_master_revision(),
+                    )
+                    next_no += len(append_positions)
+                if progress_callback:
+                    progress_callback(chunk_number, totals["processed_rows"])
+        except Exception:
+            # Chunk yang sudah ditulis tetap harus terlihat meskipun chunk berikutnya gagal
+            commit_sync_session(session)
+            raise
         
-        # HANYA konversi ke string untuk keperluan validasi, TIDAK mengubah format
-        upload_df = upload_df.astype(str)
+        total_changes = totals["new_rows"] + totals["updated_rows"]
+        if total_changes > 0:
+            simpan_log("Upload Data", total_changes, worksheet=(session["worksheets"] or {}).get(LOG_SHEET_NAME))
+        # Commit setelah log agar revisi snapshot hasil seed sudah mencakup penulisan log
+        commit_sync_session(session)
         
-        # HANYA standardisasi tanggal untuk konsistensi sistem dashboard - ini diperlukan
-        logger.info("📅 Standardisasi format tanggal untuk dashboard (diperlukan sistem)...")
-        for col in DATE_COLUMNS:
-            if col in upload_df.columns:
-                # Simpan nilai asli sebagai backup
-                original_values = upload_df[col].copy()
-                upload_df[col] = upload_df[col].apply(standardize_date_format)
-                # Log berapa nilai yang diubah
-                changed_count = sum(original_values != upload_df[col])
-                if changed_count > 0:
-                    print(f"   ℹ️ {col}: {changed_count} tanggal distandardisasi untuk dashboard")
-        
-        # Filter data yang valid (ID SURVEY tidak kosong)
-        upload_df = upload_df.loc[upload_df['ID SURVEY'].notna()]
-        upload_df = upload_df.loc[upload_df['ID SURVEY'].astype(str).str.strip() != '']
-        
-        if upload_df.empty:
+        if totals["processed_rows"] == 0:
             return False, "Tidak ada data valid untuk diproses (ID SURVEY kosong semua)"
         
-        # FAST READ - baca existing data minimal processing
-        print("� Reading existing data...")
-        # Persiapan data existing - PRESERVE DATA LAMA
-        existing_df = read_master_data()
-        
-        print(f"🔍 DEBUG: Data existing ditemukan: {len(existing_df)} baris")
+        logger.info(f"✅ Upload streaming selesai: {chunk_number} chunk, {totals['processed_rows']} baris")
+        return True, build_upload_summary(totals)
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False, f"Gagal memproses data: {str(e)}"
+
+# ===== JOB UPLOAD (WORKER LATAR BELAKANG) =====
+# Tahap job upload berurutan; progress = posisi tahap aktif terhadap total tahap
+UPLOAD_JOB_STAGES = ["parse", "standardize", "sync", "write", "log"]
+UPLOAD_JOB_STAGE_LABELS = {
+    "parse": "Membaca file",
+    "standardize": "Standardisasi data",
+    "sync": "Sinkronisasi 4 case",
+    "write": "Menulis ke database",
+    "log": "Mencatat log aktivitas",
+}
+# Status: queued -> running -> awaiting_confirmation -> queued -> running -> done / failed / cancelled
+UPLOAD_JOB_FINAL_STATUSES = {"done", "failed", "cancelled"}
+# Jumlah job selesai yang tetap disimpan di tabel job
+UPLOAD_JOB_HISTORY = 50
+
+
+@st.cache_resource(show_spinner=False)
+def get_upload_job_store() -> Dict[str, Any]:
+    """
+    Tabel job upload dan worker-nya, dipakai bersama semua sesi dalam satu proses.
+    Worker hanya satu thread sehingga beberapa upload mengantre, tidak saling menimpa.
+    """
+    return {
+        "lock": threading.Lock(),
+        "jobs": OrderedDict(),
+        "executor": ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-worker"),
+    }
+
+
+def _update_upload_job(job_id: str, **changes: Any) -> None:
+    store = get_upload_job_store()
+    with store["lock"]:
+        job = store["jobs"].get(job_id)
+        if job is not None:
+            job.update(changes, updated_at=time.time())
+
+
+def _set_upload_job_stage(job_id: str, stage: str, fraction: float = 0.0) -> None:
+    """Catat tahap aktif; fraction = kemajuan di dalam tahap (0..1)."""
+    position = UPLOAD_JOB_STAGES.index(stage) + min(max(fraction, 0.0), 1.0)
+    _update_upload_job(
+        job_id, stage=stage, progress=int(100 * position / len(UPLOAD_JOB_STAGES)),
+        message=UPLOAD_JOB_STAGE_LABELS[stage],
+    )
+
+
+def get_upload_job(job_id: str) -> Dict[str, Any] | None:
+    """Salinan dangkal status job (None jika tidak ada, mis. setelah server restart)."""
+    store = get_upload_job_store()
+    with store["lock"]:
+        job = store["jobs"].get(job_id)
+        return dict(job) if job is not None else None
+
+
+def list_upload_jobs(limit: int = 10) -> List[Dict[str, Any]]:
+    """Job terbaru lebih dulu."""
+    store = get_upload_job_store()
+    with store["lock"]:
+        return [dict(job) for job in reversed(store["jobs"].values())][:limit]
+
+
+def submit_upload_job(file_bytes: bytes, file_name: str, streaming: bool = False) -> str:
+    """
+    Masukkan upload ke antrean worker latar belakang dan kembalikan ID job.
+    Job non-streaming berhenti di status awaiting_confirmation dengan rencana sinkronisasi;
+    penulisan baru dijalankan setelah confirm_upload_job. Job streaming langsung menulis.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    now = time.time()
+    job = {
+        "id": job_id,
+        "file_name": file_name,
+        "file_hash": None,
+        "streaming": streaming,
+        "status": "queued",
+        "stage": None,
+        "progress": 0,
+        "message": "Menunggu antrean upload",
+        "submitted_at": now,
+        "updated_at": now,
+        "plan": None,
+        "stats": None,
+        "preview": None,
+        "warnings": {},
+        "result": None,
+        # Isi file disimpan selama job belum final, untuk menyusun ulang rencana yang stale
+        "file_bytes": file_bytes,
+    }
+    store = get_upload_job_store()
+    with store["lock"]:
+        store["jobs"][job_id] = job
+        finished = [key for key, item in store["jobs"].items() if item["status"] in UPLOAD_JOB_FINAL_STATUSES]
+        for key in finished[:max(0, len(store["jobs"]) - UPLOAD_JOB_HISTORY)]:
+            del store["jobs"][key]
+    store["executor"].submit(_run_upload_job, job_id, file_bytes, file_name, streaming)
+    return job_id
+
+
+def _finish_upload_job(job_id: str, success: bool, message: str, status: str | None = None, **changes: Any) -> None:
+    _update_upload_job(
+        job_id, status=status or ("done" if success else "failed"), progress=100, plan=None, file_bytes=None,
+        message=message, result=(success, message), **changes,
+    )
+
+
+def _run_upload_job(job_id: str, file_bytes: bytes, file_name: str, streaming: bool) -> None:
+    """Tahap parse -> standardize -> sync (di worker). Job streaming sekalian menulis per chunk."""
+    try:
+        # Hash dihitung di worker agar submit tidak memblokir halaman untuk file besar
+        file_hash = compute_upload_hash(file_bytes)
+        _update_upload_job(job_id, status="running", file_hash=file_hash)
+        _set_upload_job_stage(job_id, "parse")
         
-        if existing_df.empty:
-            print("⚠️ DATABASE KOSONG - Akan membuat data baru")
-            sheet_df = pd.DataFrame(columns=VALID_COLUMNS)
-        else:
-            print(f"✅ DATA EXISTING BERHASIL DIBACA: {len(existing_df)} baris")
-            print(f"📊 Kolom existing: {list(existing_df.columns)}")
-            sheet_df = existing_df.drop(columns=['NO'], errors='ignore')
-            print(f"📊 Setelah drop NO: {len(sheet_df)} baris akan dipreservasi")
-        
-        # STREAMLINED SYNC - tanpa validasi berlebihan
-        print("🔄 Syncing data dengan validasi 31 kolom...")
-        new_rows = 0
-        updated_rows = 0
-        processed_rows = len(upload_df)
-        
-        # VALIDASI DAN SINKRONISASI DENGAN SISTEM 31 KOLOM
-        stats, result_df = validate_and_sync_data(upload_df, sheet_df)
-        
-        # SAFE UPDATE - TIDAK HAPUS DATA LAMA, HANYA APPEND/UPDATE
-        print("💾 Menyimpan hasil ke Google Sheet dengan PRESERVASI data lama...")
-        worksheet = sh.worksheet(MASTER_SHEET_NAME)
+        if streaming:
+            def report_chunk(chunk_number: int, processed_rows: int) -> None:
+                _update_upload_job(
+                    job_id, stage="write", progress=min(95, 40 + chunk_number * 5),
+                    message=f"Chunk {chunk_number} tersimpan ({processed_rows:,} baris diproses)",
+                )
+            success, msg = append_or_update_data_streaming(file_bytes, file_name, progress_callback=report_chunk)
+            _finish_upload_job(job_id, success, msg)
+            return
         
-        # HANYA UPDATE JIKA ADA PERUBAHAN NYATA
-        if stats["new_rows"] > 0 or stats["updated_rows"] > 0:
-            # Backup current header
-            current_headers = result_df.columns.tolist()
-            
-            # Clear dan upload dengan preservasi data existing
-            worksheet.clear()
-            data_to_upload = [current_headers]
-            data_to_upload.extend(result_df.values.tolist())
-            worksheet.update(data_to_upload)
-            
-            print(f"✅ Data berhasil disimpan dengan preservasi data existing")
+        combined_df, sheet_errors = load_upload_frame(
+            file_bytes,
+            file_name,
+            progress_callback=lambda done, total, sheet: _set_upload_job_stage(job_id, "parse", done / total),
+            file_hash=file_hash,
+        )
+        plan = get_sync_plan(combined_df, file_hash, lambda stage: _set_upload_job_stage(job_id, stage))
+        changes = {
+            "stats": plan["stats"],
+            "preview": combined_df.head(10),
+            "warnings": sheet_errors,
+            "from_cache": bool(combined_df.attrs.get("from_cache")),
+        }
+        if has_sync_changes(plan):
+            _set_upload_job_stage(job_id, "sync", 1.0)
+            _update_upload_job(
+                job_id, status="awaiting_confirmation", plan=plan,
+                message="Rencana sinkronisasi siap, menunggu konfirmasi", **changes,
+            )
         else:
-            print("ℹ️ Tidak ada perubahan data, database existing tetap utuh")
-        
-        # Catat aktivitas ke log
-        total_changes = stats["new_rows"] + stats["updated_rows"]
-        if total_changes > 0:
-            simpan_log("Upload Data", total_changes)
-        
-        # Buat pesan ringkasan yang informatif dengan 4 case
-        summary_parts = []
-        if stats['new_rows'] > 0:
-            summary_parts.append(f"✅ {stats['new_rows']} record baru ditambahkan")
-        if stats['updated_rows'] > 0:
-            summary_parts.append(f"🔄 {stats['updated_rows']} record di-update")
-        if stats['duplicate_ids_with_diff_content'] > 0:
-            summary_parts.append(f"📋 {stats['duplicate_ids_with_diff_content']} duplikasi ID diizinkan")
-        if stats['skipped_duplicates'] > 0:
-            summary_parts.append(f"⏭️ {stats['skipped_duplicates']} record identik diabaikan")
-        
-        summary = " | ".join(summary_parts) if summary_parts else "Tidak ada perubahan data"
-        message = f"✅ Upload selesai!\n📊 {summary}\n🎯 Total diproses: {stats['processed_rows']} baris"
-        
-        logger.info("✅ Sinkronisasi dengan validasi 4 case selesai - DATA LAMA AMAN!")
-        return True, message
+            _finish_upload_job(job_id, True, "Tidak ada perubahan data: semua baris sudah ada di database.", **changes)
+    except ValueError as e:
+        _finish_upload_job(job_id, False, str(e))
+    except Exception as e:
+        logger.error(f"❌ Job upload {job_id} gagal: {traceback.format_exc()}")
+        _finish_upload_job(job_id, False, f"Gagal memproses data: {e}")
+
+
+def confirm_upload_job(job_id: str) -> bool:
+    """Antrekan tahap write -> log untuk job yang menunggu konfirmasi. False jika status tidak sesuai."""
+    store = get_upload_job_store()
+    with store["lock"]:
+        job = store["jobs"].get(job_id)
+        if job is None or job["status"] != "awaiting_confirmation":
+            return False
+        job.update(status="queued", message="Menunggu antrean penulisan", updated_at=time.time())
+    store["executor"].submit(_commit_upload_job, job_id)
+    return True
+
+
+def cancel_upload_job(job_id: str) -> bool:
+    """Batalkan job yang masih menunggu konfirmasi (rencananya dibuang, tidak ada penulisan)."""
+    store = get_upload_job_store()
+    with store["lock"]:
+        job = store["jobs"].get(job_id)
+        if job is None or job["status"] != "awaiting_confirmation":
+            return False
+        job.update(status="cancelled", plan=None, file_bytes=None, message="Upload dibatalkan", updated_at=time.time())
+        return True
+
 
+def _commit_upload_job(job_id: str) -> None:
+    """
+    Tahap write -> log (di worker): eksekusi rencana yang sudah dikonfirmasi.
+    Jika data master berubah sejak preview (mis. upload lain di antrean sudah menulis),
+    rencana disusun ulang dan job kembali menunggu konfirmasi dengan preview terbaru.
+    """
+    job = get_upload_job(job_id)
+    try:
+        _update_upload_job(job_id, status="running")
+        if not is_sync_plan_current(job["plan"]):
+            logger.info(f"🔁 Rencana job {job_id} stale, disusun ulang")
+            _run_upload_job(job_id, job["file_bytes"], job["file_name"], streaming=False)
+            if get_upload_job(job_id)["status"] == "awaiting_confirmation":
+                _update_upload_job(
+                    job_id, message="Data master berubah sejak preview; rencana disusun ulang, silakan konfirmasi lagi"
+                )
+            return
+        success, msg = execute_sync_plan(job["plan"], lambda stage: _set_upload_job_stage(job_id, stage))
+        _finish_upload_job(job_id, success, msg)
     except Exception as e:
-        recently_uploaded_ids.clear()
-        print(f"❌ Error: {str(e)}")
-        return False, f"Gagal memproses data: {str(e)}"
+        logger.error(f"❌ Job upload {job_id} gagal: {traceback.format_exc()}")
+        _finish_upload_job(job_id, False, f"Gagal memproses data: {e}")
+
 
 def delete_last_rows(count: int | None = None) -> Tuple[bool, str]:
     """Hapus data yang baru diupload dari data master."""
@@ -1630,118 +4176,248 @@ def delete_last_rows(count: int | None = None) -> Tuple[bool, str]:
         if not recently_uploaded_ids:
             return False, "Tidak ada data baru yang dapat dihapus. Silakan upload data terlebih dahulu."
 
-        worksheet = sh.worksheet(MASTER_SHEET_NAME)
-        existing_data = worksheet.get_all_records()
-        df = pd.DataFrame(existing_data)
+        worksheet = get_spreadsheet().worksheet(MASTER_SHEET_NAME)
+        existing_data = worksheet.get_all_values()
 
-        if df.empty:
+        if len(existing_data) < 2:
             return False, "Database kosong"
 
-        # Filter baris yang baru diupload
-        mask = df['ID SURVEY'].astype(str).isin(recently_uploaded_ids)
-        rows_to_delete = df[mask]
-        
-        if rows_to_delete.empty:
-            return False, "Tidak ditemukan data yang baru diupload"
+        header = existing_data[0]
+        if 'ID SURVEY' not in header:
+            return False, "Kolom ID SURVEY tidak ditemukan di data master"
 
-        # Hapus baris yang baru diupload
-        df_new = df[~mask]
+        # Cari baris sheet (1-based, header = baris 1) yang baru diupload
+        id_col = header.index('ID SURVEY')
+        rows_to_delete = [
+            row_num
+            for row_num, row in enumerate(existing_data[1:], start=2)
+            if id_col < len(row) and str(row[id_col]) in recently_uploaded_ids
+        ]
         
-        # Reset nomor urut
-        df_new = df_new.drop(columns=['NO'], errors='ignore')
-        df_new.insert(0, 'NO', range(1, len(df_new) + 1))
+        if not rows_to_delete:
+            return False, "Tidak ditemukan data yang baru diupload"
 
-        # Update worksheet
-        worksheet.clear()
-        worksheet.update([df_new.columns.tolist()] + df_new.values.tolist())
+        # Hapus per rentang baris lalu rapikan nomor urut di bawah baris pertama yang terhapus
+        deleted_count = delete_master_rows(worksheet, rows_to_delete)
+        renumbered_cells = 0
+        if 'NO' in header:
+            first_row = min(rows_to_delete)
+            last_row = len(existing_data) - deleted_count
+            if last_row >= first_row:
+                renumbered_cells = renumber_master_rows(worksheet, header, first_row, last_row)
+        # Posisi baris bergeser -> epoch baru, snapshot di semua instance dibaca ulang penuh
+        meta_ws, current = open_master_version()
+        if meta_ws is not None:
+            record_master_change(meta_ws, current, structural=True, grid_rows=worksheet.row_count)
+        delete_report = {"deleted_rows": deleted_count, "renumbered_cells": renumbered_cells}
+        print(f"🗑️ Data berhasil dihapus: {delete_report}")
 
         # Catat di log dan clear tracking
-        deleted_count = len(rows_to_delete)
         simpan_log("Hapus Data Baru", deleted_count)
         recently_uploaded_ids.clear()
+        bump_data_generation()
 
         return True, f"Berhasil menghapus {deleted_count} data yang baru diupload"
 
     except Exception as e:
         return False, f"Gagal menghapus data: {str(e)}"
 
+# ===== LOG AKTIVITAS (APPEND-ONLY) =====
+# Sheet log disimpan append-only (lama -> baru) dengan nomor urut monoton di kolom SEQ;
+# urutan terbaru-di-atas dan nomor NO tampilan dihitung saat dibaca
+LOG_HEADER = ['SEQ', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']
+LOG_DISPLAY_COLUMNS = ['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']
+# Format lama: baris terbaru disisipkan di baris 2 dan kolom NO dinomori ulang
+LEGACY_LOG_HEADER = ['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']
+LOG_TIMESTAMP_FORMAT = "%A, %d %B %Y %H:%M"
+
+# Jumlah entri per halaman pada halaman log (dibaca per range, bukan seluruh sheet)
+LOG_PAGE_SIZE = 100
+# Detik sebelum halaman log yang di-cache dibaca ulang (menangkap edit langsung di sheet)
+LOG_CACHE_TTL = 300
+
+_log_lock = threading.Lock()
+_log_state = {"last_seq": 0, "header_ready": False}
+
+
+def next_log_sequence() -> int:
+    """
+    Nomor urut log berikutnya: epoch milidetik, dipaksa naik minimal 1 dari nomor terakhir
+    di proses ini sehingga monoton tanpa perlu membaca sheet.
+    """
+    with _log_lock:
+        seq = max(int(time.time() * 1000), _log_state["last_seq"] + 1)
+        _log_state["last_seq"] = seq
+        return seq
+
+
+def migrate_log_rows(all_data: List[List[str]]) -> List[List[Any]]:
+    """
+    Ubah isi sheet log format lama (terbaru di atas) menjadi baris append-only (lama -> baru)
+    dengan SEQ 1..n. Header lama 3 kolom [timestamp, aksi, keterangan] ikut didukung.
+    """
+    if all_data and all_data[0] == LEGACY_LOG_HEADER:
+        rows = [row[1:4] for row in all_data[1:] if any(row)]
+    else:
+        # Asumsikan format lama: [timestamp, aksi, keterangan]
+        rows = [row[:3] for row in all_data if len(row) >= 3]
+    rows = [list(row) + [''] * (3 - len(row)) for row in reversed(rows)]
+    return [[seq] + row for seq, row in enumerate(rows, start=1)]
+
+
+def ensure_log_structure(log_ws, all_data: List[List[str]] | None = None) -> List[List[str]] | None:
+    """
+    Pastikan sheet log memakai LOG_HEADER. Sheet format lama dimigrasi sekali dengan satu
+    penulisan batch (clear + update). Return isi sheet setelah migrasi, atau None jika
+    header sudah benar dan all_data tidak diberikan.
+    """
+    if all_data is None:
+        header = log_ws.row_values(1)
+        if header == LOG_HEADER:
+            _log_state["header_ready"] = True
+            return None
+        all_data = log_ws.get_all_values()
+    if all_data and all_data[0] == LOG_HEADER:
+        _log_state["header_ready"] = True
+        return all_data
+    
+    print("🔧 Memigrasi sheet log ke format append-only...")
+    migrated = [LOG_HEADER] + migrate_log_rows(all_data)
+    log_ws.clear()
+    log_ws.update(migrated, "A1", value_input_option="RAW")
+    # Ukuran grid = header + entri, sehingga jumlah entri bisa dibaca dari metadata sheet
+    log_ws.resize(rows=len(migrated))
+    _log_state["header_ready"] = True
+    return [[str(value) for value in row] for row in migrated]
+
+
+def build_log_frame(rows: List[List[str]], first_no: int = 1) -> pd.DataFrame:
+    """
+    Baris log append-only -> DataFrame tampilan: terbaru di atas dengan NO berurutan
+    mulai first_no (halaman berikutnya melanjutkan nomor halaman sebelumnya).
+    """
+    rows = [list(row[:4]) + [''] * (4 - len(row)) for row in rows if any(row)]
+    if not rows:
+        return pd.DataFrame(columns=LOG_DISPLAY_COLUMNS)
+    df = pd.DataFrame(rows, columns=LOG_HEADER)
+    df['SEQ'] = pd.to_numeric(df['SEQ'], errors='coerce').fillna(0).astype('int64')
+    # Urutan baris sheet = urutan tulis; SEQ sebagai kunci utama, posisi baris pemecah seri
+    df = df.iloc[::-1].sort_values('SEQ', ascending=False, kind='stable')
+    df.insert(0, 'NO', range(first_no, first_no + len(df)))
+    return df.drop(columns=['SEQ']).reset_index(drop=True)
+
+
+def get_log_entry_count(log_ws) -> int:
+    """
+    Jumlah entri log dari metadata grid (tanpa membaca nilai): append_rows dengan
+    INSERT_ROWS menambah baris grid tepat sebanyak entri yang ditulis.
+    """
+    return max(log_ws.row_count - 1, 0)
+
+
+def trim_log_sheet(log_ws) -> int:
+    """
+    Buang baris grid kosong di bawah entri terakhir (mis. 1000 baris bawaan sheet baru)
+    agar get_log_entry_count akurat. Hanya dipanggil jika jendela terakhir ternyata kosong.
+    
+    Returns:
+        int: Jumlah entri setelah dirapikan
+    """
+    # API memangkas baris kosong di akhir -> panjang kolom A = baris terakhir berisi data
+    last_row = max(len(log_ws.get_values("A:A")), 1)
+    if last_row < log_ws.row_count:
+        log_ws.resize(rows=last_row)
+    return last_row - 1
+
+
+def read_log_page(page: int = 0, page_size: int = LOG_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Baca satu halaman log (page 0 = entri terbaru) lewat satu range read dari ekor sheet.
+    
+    Returns:
+        dict berisi "rows" (DataFrame tampilan, NO global terbaru = 1), "total" (jumlah entri),
+        "page" dan "pages"
+    """
+    log_ws = get_spreadsheet().worksheet(LOG_SHEET_NAME)
+    if not _log_state["header_ready"] and ensure_log_structure(log_ws) is not None:
+        # Sheet baru dimigrasi -> ambil ulang metadata (ukuran grid berubah)
+        log_ws = get_spreadsheet().worksheet(LOG_SHEET_NAME)
+    
+    total = get_log_entry_count(log_ws)
+    trimmed = False
+    while True:
+        pages = max((total + page_size - 1) // page_size, 1)
+        page = min(max(int(page), 0), pages - 1)
+        if total == 0:
+            return {"rows": build_log_frame([]), "total": 0, "page": 0, "pages": 1}
+        
+        # Baris sheet entri terbaru = total + 1 (baris 1 = header)
+        last_row = total + 1 - page * page_size
+        first_row = max(last_row - page_size + 1, 2)
+        values = log_ws.get_values(f"A{first_row}:D{last_row}")
+        if len(values) == last_row - first_row + 1 or trimmed:
+            break
+        # Ada baris kosong di ekor grid -> rapikan sekali lalu baca ulang
+        total = trim_log_sheet(log_ws)
+        trimmed = True
+    
+    return {
+        "rows": build_log_frame(values, first_no=page * page_size + 1),
+        "total": total,
+        "page": page,
+        "pages": pages,
+    }
+
+
+@st.cache_data(ttl=LOG_CACHE_TTL, show_spinner=False)
+def cached_read_log_page(page: int = 0, page_size: int = LOG_PAGE_SIZE) -> Dict[str, Any]:
+    """Cache halaman log; dikosongkan setiap simpan_log menulis entri baru."""
+    return read_log_page(page, page_size)
+
+
+def invalidate_log_cache() -> None:
+    """Kosongkan cache halaman log setelah log ditulis/direset."""
+    try:
+        cached_read_log_page.clear()
+    except Exception:
+        pass
+
+
 def read_log() -> pd.DataFrame:
-    """Baca log aktivitas dari Google Sheets dengan header yang benar."""
+    """Baca log aktivitas dari Google Sheets: terbaru di atas, NO dihitung saat dibaca."""
     try:
         # Initialize connection if needed
-        global sh
-        if sh is None:
-            sh = get_google_sheet_connection()
+        sh = get_spreadsheet()
             
         worksheet = sh.worksheet(LOG_SHEET_NAME)
         all_data = worksheet.get_all_values()
         
         if not all_data:
             # Sheet kosong, return DataFrame dengan header yang benar
-            return pd.DataFrame(columns=['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data'])
+            return pd.DataFrame(columns=LOG_DISPLAY_COLUMNS)
         
-        # Cek apakah header sudah benar
-        expected_header = ['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']
-        
-        if all_data[0] != expected_header:
-            # Header tidak sesuai, perbaiki struktur
-            print("🔧 Memperbaiki struktur header log...")
-            
-            # Backup data lama jika ada
-            old_data = []
-            for i, row in enumerate(all_data):
-                if len(row) >= 3:  # Minimal ada data di 3 kolom
-                    # Asumsikan format lama: [timestamp, aksi, keterangan]
-                    old_data.append([
-                        i + 1,  # NO
-                        row[0] if len(row) > 0 else "",  # Tanggal & Waktu
-                        row[1] if len(row) > 1 else "",  # Jenis Aktivitas
-                        row[2] if len(row) > 2 else ""   # Jumlah Data (dari keterangan lama)
-                    ])
-            
-            # Reset sheet dengan header yang benar
-            worksheet.clear()
-            worksheet.insert_row(expected_header, 1)
-            
-            # Masukkan kembali data lama dengan penomoran yang benar
-            for row_data in old_data:
-                worksheet.append_row(row_data)
-            
-            # Baca ulang data yang sudah diperbaiki
-            all_data = worksheet.get_all_values()
+        if all_data[0] != LOG_HEADER:
+            # Format lama -> migrasi sekali ke format append-only
+            all_data = ensure_log_structure(worksheet, all_data)
         
-        # Buat DataFrame dari data (header sudah benar)
-        if len(all_data) > 1:
-            df = pd.DataFrame(all_data[1:], columns=all_data[0])
-            
-            # Pastikan kolom NO adalah integer dan berurutan
-            try:
-                df['NO'] = pd.to_numeric(df['NO'], errors='coerce').fillna(0).astype(int)
-            except:
-                # Jika gagal konversi, buat penomoran ulang
-                df['NO'] = range(1, len(df) + 1)
-            
-            return df
-        else:
-            # Hanya ada header
-            return pd.DataFrame(columns=expected_header)
+        return build_log_frame(all_data[1:])
             
     except Exception as e:
         print(f"❌ Error membaca log: {str(e)}")
         # Return DataFrame kosong dengan header yang benar sebagai fallback
-        return pd.DataFrame(columns=['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data'])
+        return pd.DataFrame(columns=LOG_DISPLAY_COLUMNS)
 
 def reset_log_structure() -> bool:
     """Reset struktur log sheet dengan header yang benar."""
     try:
-        log_ws = sh.worksheet(LOG_SHEET_NAME)
+        log_ws = get_spreadsheet().worksheet(LOG_SHEET_NAME)
         
-        # Clear semua data
+        # Clear semua data lalu set header yang benar
         log_ws.clear()
-        
-        # Set header yang benar
-        header = ['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']
-        log_ws.insert_row(header, 1)
+        log_ws.update([LOG_HEADER], "A1")
+        log_ws.resize(rows=1)
+        _log_state["header_ready"] = True
+        invalidate_log_cache()
         
         print("✅ Struktur log berhasil direset dengan header yang benar")
         return True
@@ -1750,45 +4426,67 @@ def reset_log_structure() -> bool:
         print(f"❌ Gagal reset struktur log: {str(e)}")
         return False
 
-def simpan_log(aksi: str, jumlah: int) -> None:
-    """Simpan aktivitas ke log dengan format yang benar dan data terbaru di atas."""
+def simpan_log_batch(events: List[Tuple[str, int]], worksheet=None) -> None:
+    """
+    Simpan beberapa aktivitas sekaligus dengan satu append_rows (urutan events = urutan waktu).
+    Tidak ada baca ulang atau penomoran ulang sheet: NO tampilan dihitung di read_log.
+    
+    Args:
+        worksheet: Handle sheet log yang sudah dibuka (mis. dari sesi sinkronisasi)
+    """
+    if not events:
+        return
     try:
-        # Initialize connection if needed
-        global sh
-        if sh is None:
-            sh = get_google_sheet_connection()
-            
-        log_ws = sh.worksheet(LOG_SHEET_NAME)
-        timestamp = datetime.now().strftime("%A, %d %B %Y %H:%M")
-        
-        # Cek apakah sheet sudah memiliki header yang benar
-        try:
-            all_data = log_ws.get_all_values()
-            if not all_data or all_data[0] != ['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data']:
-                # Reset sheet dengan header yang benar
-                log_ws.clear()
-                log_ws.insert_row(['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data'], 1)
-                existing_data_rows = []
-            else:
-                # Ambil data existing (tanpa header)
-                existing_data_rows = all_data[1:] if len(all_data) > 1 else []
-        except:
-            # Jika error, reset sheet
-            log_ws.clear()
-            log_ws.insert_row(['NO', 'Tanggal & Waktu', 'Jenis Aktivitas', 'Jumlah Data'], 1)
-            existing_data_rows = []
-        
-        # Tambahkan data baru di posisi kedua (setelah header) - ini akan jadi nomor 1
-        new_row = [1, timestamp, aksi, jumlah]
-        log_ws.insert_row(new_row, 2)
+        log_ws = worksheet if worksheet is not None else get_spreadsheet().worksheet(LOG_SHEET_NAME)
+        # Header dicek sekali per proses (migrasi format lama jika perlu)
+        if not _log_state["header_ready"]:
+            ensure_log_structure(log_ws)
         
-        # Update nomor urut untuk data lama (geser ke bawah)
-        for i, row in enumerate(existing_data_rows, 2):  # Mulai dari row 2 (karena header di row 1)
-            if len(row) >= 4:  # Pastikan row memiliki 4 kolom
-                # Update nomor urut (kolom A) untuk data lama
-                log_ws.update_cell(i + 1, 1, i)  # i + 1 karena sudah ada data baru di row 2
+        timestamp = datetime.now().strftime(LOG_TIMESTAMP_FORMAT)
+        rows = [[next_log_sequence(), timestamp, aksi, jumlah] for aksi, jumlah in events]
+        log_ws.append_rows(rows, value_input_option="RAW", insert_data_option="INSERT_ROWS", table_range="A1")
+        invalidate_log_cache()
         
-        print(f"✅ Log berhasil disimpan: {aksi} - {jumlah} data")
+        for aksi, jumlah in events:
+            print(f"✅ Log berhasil disimpan: {aksi} - {jumlah} data")
         
     except Exception as e:
-        print(f"❌ Gagal menyimpan log: {str(e)}")
\ No newline at end of file
+        print(f"❌ Gagal menyimpan log: {str(e)}")
+
+def simpan_log(aksi: str, jumlah: int, worksheet=None) -> None:
+    """Simpan satu aktivitas ke log (satu append, O(1) terhadap jumlah log)."""
+    simpan_log_batch([(aksi, jumlah)], worksheet)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilitas data inspeksi PLN UID Lampung")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = subparsers.add_parser("snapshot", help="Kelola snapshot lokal MasterData")
+    snapshot_parser.add_argument("action", choices=["rebuild", "status"])
+    subparsers.add_parser("memory", help="Laporan memori MasterData sebelum/sesudah build_dashboard_frame")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        if args.action == "rebuild":
+            snapshot_df = rebuild_master_snapshot()
+            print(f"✅ Snapshot dibangun ulang: {len(snapshot_df)} baris → {MASTER_SNAPSHOT_FILE}")
+        else:
+            current_revision = get_master_revision()
+            snapshot_meta = load_master_snapshot_meta()
+            print(f"Revisi spreadsheet : {current_revision}")
+            print(f"Revisi snapshot    : {snapshot_meta.get('revision')}")
+            print(f"Jumlah baris       : {snapshot_meta.get('rows')}")
+            print(f"Disimpan pada      : {snapshot_meta.get('saved_at')}")
+            print(f"Versi snapshot     : {snapshot_meta.get('version')} (epoch {snapshot_meta.get('epoch')})")
+            print(f"Baca penuh terakhir: {snapshot_meta.get('full_read_at')}")
+            print(f"Status             : {'STALE' if is_master_snapshot_stale(current_revision) else 'UP TO DATE'}")
+    elif args.command == "memory":
+        raw_master = read_master_data_snapshot()
+        report = get_memory_report(raw_master, build_dashboard_frame(raw_master))
+        print(f"{'Kolom':<32} {'dtype':<16} {'sebelum MB':>11} {'sesudah MB':>11}")
+        for col, info in report["columns"].items():
+            print(f"{col:<32} {info['dtype']:<16} {info['before_mb']:>11.3f} {info['after_mb']:>11.3f}")
+        print(f"Total {report['rows']} baris: {report['before_mb']} MB → {report['after_mb']} MB "
+              f"(hemat {report['saved_pct']}%)")
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Modul aplikasi ada di root proyek (bukan package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    """Snapshot MasterData lokal di folder sementara per test."""
+    import sheets_utils
+
+    monkeypatch.setattr(sheets_utils, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(sheets_utils, "MASTER_SNAPSHOT_FILE", str(tmp_path / "master_snapshot.parquet"))
+    monkeypatch.setattr(sheets_utils, "MASTER_SNAPSHOT_META_FILE", str(tmp_path / "master_snapshot.json"))
+    return tmp_path
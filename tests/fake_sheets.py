@@ -0,0 +1,122 @@
+"""Spreadsheet palsu di memori untuk test (subset API gspread yang dipakai sheets_utils)."""
+import re
+
+import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, grid, rows=None, cols=None):
+        self.spreadsheet, self.title = spreadsheet, title
+        self.grid = [[str(value) for value in row] for row in grid]
+        self.row_count = rows or len(self.grid)
+        self.col_count = cols or max((len(row) for row in self.grid), default=1)
+
+    def _touch(self):
+        self.spreadsheet.revision += 1
+
+    def _rect(self, range_name):
+        range_name = range_name.split("!")[-1]
+        start, _, end = range_name.partition(":")
+        start_row, start_col = a1_to_rowcol(start)
+        end_row, end_col = start_row, start_col
+        if end:
+            match = re.match(r"([A-Z]+)(\d*)$", end)
+            end_col = a1_to_rowcol(match.group(1) + "1")[1]
+            end_row = int(match.group(2)) if match.group(2) else len(self.grid)
+        block = []
+        for row_num in range(start_row, end_row + 1):
+            row = self.grid[row_num - 1][start_col - 1:end_col] if row_num <= len(self.grid) else []
+            while row and row[-1] == "":
+                row = row[:-1]
+            block.append(row)
+        while block and not block[-1]:
+            block.pop()
+        return block
+
+    def _write(self, range_name, values):
+        row_num, col = a1_to_rowcol(range_name.split("!")[-1].split(":")[0])
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                while len(self.grid) < row_num + i:
+                    self.grid.append([])
+                target = self.grid[row_num + i - 1]
+                target.extend([""] * (col + j - len(target)))
+                target[col + j - 1] = str(value)
+
+    def row_values(self, row_num):
+        row = list(self.grid[row_num - 1]) if row_num <= len(self.grid) else []
+        while row and row[-1] == "":
+            row.pop()
+        return row
+
+    def get_all_values(self):
+        width = max((len(row) for row in self.grid), default=0)
+        return [row + [""] * (width - len(row)) for row in self.grid if any(row)]
+
+    def get_values(self, range_name):
+        return self._rect(range_name)
+
+    def batch_get(self, ranges):
+        return [self._rect(range_name) for range_name in ranges]
+
+    def append_rows(self, values, **kwargs):
+        self._touch()
+        last = len(self.grid)
+        while last and not any(self.grid[last - 1]):
+            last -= 1
+        self.grid[last:last] = [[str(value) for value in row] for row in values]
+        self.row_count += len(values)
+        end_col = rowcol_to_a1(1, len(values[0])).rstrip("1")
+        return {"updates": {"updatedRange": f"{self.title}!A{last + 1}:{end_col}{last + len(values)}"}}
+
+    def batch_update(self, data, **kwargs):
+        self._touch()
+        for item in data:
+            self._write(item["range"], item["values"])
+
+    def update(self, values, range_name=None, **kwargs):
+        self._touch()
+        self._write(range_name, values)
+
+    def delete_rows(self, start_row, end_row=None):
+        self._touch()
+        end_row = end_row or start_row
+        del self.grid[start_row - 1:end_row]
+        self.row_count -= end_row - start_row + 1
+
+    def add_rows(self, rows):
+        self.row_count += rows
+
+    def add_cols(self, cols):
+        self.col_count += cols
+
+    def hide_columns(self, start, end):
+        pass
+
+    def hide(self):
+        pass
+
+
+class FakeSpreadsheet:
+    """revision naik di setiap penulisan, seperti modifiedTime Drive."""
+
+    def __init__(self, sheets):
+        self.revision = 0
+        self.sheets = {title: FakeWorksheet(self, title, grid) for title, grid in sheets.items()}
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.revision += 1
+        self.sheets[title] = FakeWorksheet(self, title, [], rows, cols)
+        return self.sheets[title]
+
+    def get_lastUpdateTime(self):
+        return f"rev{self.revision}"
@@ -0,0 +1,48 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import sheets_utils
+
+
+def make_rekap_frame(n_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "ID SURVEY": [f"S{i}" for i in range(n_rows)],
+        "ULP": ["KEDATON" if i % 2 else None for i in range(n_rows)],
+        "TANGGAL SURVEY": pd.to_datetime(["2025-01-02"] * n_rows),
+    })
+
+
+def read_export(data: bytes, export_format: str) -> pd.DataFrame:
+    if export_format == "csv":
+        return pd.read_csv(io.BytesIO(data))
+    if export_format == "csv.gz":
+        return pd.read_csv(io.BytesIO(gzip.decompress(data)))
+    if export_format == "xlsx":
+        return pd.read_excel(io.BytesIO(data))
+    return pd.read_parquet(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("export_format", list(sheets_utils.EXPORT_FORMATS))
+@pytest.mark.parametrize("n_rows", [0, 3, sheets_utils.EXPORT_CHUNK_ROWS + 5])
+def test_export_file_accepted_by_download_button(export_format, n_rows):
+    if export_format == "parquet":
+        pytest.importorskip("pyarrow")
+    df = make_rekap_frame(n_rows)
+
+    data = sheets_utils.build_export_file(df, export_format)
+    # Konversi yang sama dengan st.download_button untuk hasil callable
+    data_as_bytes, _ = convert_data_to_bytes_and_infer_mime(data, TypeError("unsupported"))
+
+    exported = read_export(data_as_bytes, export_format)
+    assert list(exported.columns) == list(df.columns)
+    assert len(exported) == n_rows
+    assert exported["ID SURVEY"].astype(str).tolist() == df["ID SURVEY"].tolist()
+
+
+def test_export_unknown_format():
+    with pytest.raises(ValueError):
+        sheets_utils.build_export_file(make_rekap_frame(1), "json")
@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+import sheets_utils
+from fake_sheets import FakeSpreadsheet
+
+HEADER = sheets_utils.VALID_COLUMNS
+
+
+def make_row(survey_id: str, no: int) -> list[str]:
+    row = [f"{col} {survey_id}" for col in HEADER]
+    row[HEADER.index("NO")] = str(no)
+    row[HEADER.index("ID SURVEY")] = survey_id
+    row[HEADER.index("TANGGAL HAR")] = ""
+    return row
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch, snapshot_dir):
+    fake = FakeSpreadsheet({
+        sheets_utils.MASTER_SHEET_NAME: [list(HEADER)] + [make_row(f"S{i}", i) for i in range(1, 21)],
+    })
+    monkeypatch.setattr(sheets_utils, "sh", fake)
+    return fake
+
+
+@pytest.fixture
+def full_reads(monkeypatch):
+    calls = []
+    read_master_data = sheets_utils.read_master_data
+
+    def counting_read(*args, **kwargs):
+        calls.append(args)
+        return read_master_data(*args, **kwargs)
+
+    monkeypatch.setattr(sheets_utils, "read_master_data", counting_read)
+    return calls
+
+
+def app_write(new_ids: list[str], fill_rows: list[int]) -> None:
+    worksheet = sheets_utils.get_spreadsheet().worksheet(sheets_utils.MASTER_SHEET_NAME)
+    new_rows = pd.DataFrame([make_row(survey_id, 0) for survey_id in new_ids], columns=HEADER)
+    cell_updates = [(row_num, "TANGGAL HAR", "2025-12-31") for row_num in fill_rows]
+    start_no = len(worksheet.get_all_values())
+    sheets_utils.write_master_delta(worksheet, new_rows.drop(columns=["NO"]), cell_updates, start_no)
+
+
+def refresh_matches_sheet(full_reads: list) -> bool:
+    """Refresh snapshot; True jika baca penuh dipakai. Hasilnya harus sama dengan isi sheet."""
+    before = len(full_reads)
+    snapshot_df = sheets_utils.read_master_data_snapshot()
+    used_full_read = len(full_reads) > before
+    expected = sheets_utils.read_master_data()
+    del full_reads[before:]
+    pd.testing.assert_frame_equal(snapshot_df.astype(str), expected.astype(str), check_index_type=False)
+    return used_full_read
+
+
+def test_app_writes_only_use_journal(spreadsheet, full_reads):
+    app_write(["N1"], [3])
+    assert refresh_matches_sheet(full_reads)  # snapshot pertama dan sheet meta baru
+    app_write(["N2", "N3"], [4, 5])
+    app_write([], [6])
+    assert not refresh_matches_sheet(full_reads)
+    assert not refresh_matches_sheet(full_reads)
+
+
+def test_app_write_plus_external_row_deletion_forces_full_read(spreadsheet, full_reads):
+    app_write(["N1"], [3])
+    refresh_matches_sheet(full_reads)
+
+    master = spreadsheet.worksheet(sheets_utils.MASTER_SHEET_NAME)
+    app_write(["N2"], [4])
+    master.delete_rows(2)
+    assert refresh_matches_sheet(full_reads)
+
+
+def test_external_deletion_between_app_writes_forces_full_read(spreadsheet, full_reads):
+    app_write(["N1"], [3])
+    refresh_matches_sheet(full_reads)
+
+    master = spreadsheet.worksheet(sheets_utils.MASTER_SHEET_NAME)
+    app_write(["N2"], [4])
+    master.delete_rows(2)
+    app_write(["N3"], [5])
+    assert refresh_matches_sheet(full_reads)
+
+
+def test_external_edit_before_app_write_forces_full_read(spreadsheet, full_reads):
+    app_write(["N1"], [3])
+    refresh_matches_sheet(full_reads)
+
+    master = spreadsheet.worksheet(sheets_utils.MASTER_SHEET_NAME)
+    master.update([["DIEDIT DI SHEET"]], "C10")
+    app_write(["N2"], [4])
+    assert refresh_matches_sheet(full_reads)
+
+
+def test_legacy_journal_without_revision_forces_full_read(spreadsheet, full_reads):
+    app_write(["N1"], [3])
+    refresh_matches_sheet(full_reads)
+
+    meta_ws = spreadsheet.worksheet(sheets_utils.MASTER_META_SHEET_NAME)
+    app_write(["N2"], [4])
+    journal_row = sheets_utils.read_master_version(meta_ws)["version"] + sheets_utils.MASTER_JOURNAL_OFFSET
+    meta_ws.update([["", ""]], f"F{journal_row}")
+    assert refresh_matches_sheet(full_reads)
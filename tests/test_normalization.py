@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from hypothesis import given, settings, strategies as st
+
+import sheets_utils
+
+NORMALIZERS = {
+    "text": sheets_utils.normalize_text_advanced,
+    "equipment": sheets_utils.normalize_equipment_name,
+    "status_execution": sheets_utils.normalize_status_execution,
+    "asset_status": sheets_utils.normalize_asset_status,
+    "location": sheets_utils.normalize_location_name,
+    "inspector": sheets_utils.normalize_inspector_name,
+    "asset_name": sheets_utils.normalize_asset_name,
+    "teks": sheets_utils.normalisasi_teks,
+}
+
+# Potongan teks yang memicu aturan normalisasi (kamus, singkatan lokasi, gelar, keyword status)
+VOCABULARY = (
+    list(sheets_utils.NORMALIZATION_DICTIONARY)
+    + list(sheets_utils.EQUIPMENT_NORMALIZATION_DICTIONARY)
+    + list(sheets_utils.LOCATION_PREFIX_ABBREVIATIONS)
+    + sheets_utils.ACADEMIC_TITLES
+    + sheets_utils.STATUS_BELUM_KEYWORDS + sheets_utils.STATUS_SELESAI_KEYWORDS
+    + sheets_utils.ASSET_BURUK_KEYWORDS + sheets_utils.ASSET_BAIK_KEYWORDS
+    + ["jl. merdeka", "Ir. Budi, S.T", "  lbs  ", "ok!", "N/A", "-", "0", "12.5", "é"]
+)
+BLANKS = [np.nan, None, "", "   "]
+
+
+# Nilai sel: teks acak, frasa dari VOCABULARY (memicu aturan normalisasi), atau kosong
+CELL_VALUES = st.one_of(
+    st.text(alphabet=st.characters(exclude_categories=("Cs",)), max_size=12),
+    st.lists(st.sampled_from(VOCABULARY), min_size=1, max_size=3).map(" ".join),
+    st.lists(st.sampled_from(VOCABULARY), min_size=1, max_size=3).map(lambda parts: f"  {' '.join(parts).upper()} "),
+    st.sampled_from(BLANKS),
+)
+
+
+@st.composite
+def cell_series(draw) -> pd.Series:
+    """Series object berisi string/None/NaN dengan nilai berulang dan index acak."""
+    values = draw(st.lists(CELL_VALUES, max_size=120))
+    if values:
+        repeats = draw(st.lists(st.integers(0, len(values) - 1), max_size=60))
+        values += [values[pos] for pos in repeats]
+    index = draw(st.permutations(range(1000, 1000 + len(values))))
+    return pd.Series(values, index=pd.Index(index, dtype="int64"), dtype=object)
+
+
+def run_parallel(tasks, max_workers: int):
+    """normalize_series_batch lewat process pool; gagal jika diam-diam jatuh ke jalur serial."""
+    def no_serial(_tasks):
+        raise AssertionError("jalur paralel jatuh ke serial")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(sheets_utils, "_normalize_series_serial", no_serial)
+        return sheets_utils.normalize_series_batch(tasks, max_workers=max_workers, min_rows=0)
+
+
+# Setiap contoh membuat process pool sendiri -> jumlah contoh dibatasi, tanpa deadline
+@settings(max_examples=60, deadline=None)
+@given(series=cell_series(), min_shard=st.integers(1, 64), max_workers=st.integers(2, 4))
+def test_parallel_batch_identical_to_serial(series, min_shard, max_workers):
+    tasks = {name: (series, func) for name, func in NORMALIZERS.items()}
+
+    with pytest.MonkeyPatch.context() as patch:
+        # Ukuran shard = max(nilai unik / worker, NORMALIZATION_MIN_SHARD) -> shard acak
+        patch.setattr(sheets_utils, "NORMALIZATION_MIN_SHARD", min_shard)
+        results, errors = run_parallel(tasks, max_workers)
+
+    assert errors == {}
+    assert set(results) == set(NORMALIZERS)
+    for name, func in NORMALIZERS.items():
+        pd.testing.assert_series_equal(results[name], sheets_utils.normalize_series_unique(series, func))
+
+
+def test_parallel_batch_all_blank():
+    series = pd.Series([np.nan, None, "", "  "] * 5, dtype=object)
+    tasks = {name: (series, func) for name, func in NORMALIZERS.items()}
+
+    results, errors = run_parallel(tasks, max_workers=2)
+
+    assert errors == {}
+    for name, func in NORMALIZERS.items():
+        pd.testing.assert_series_equal(results[name], sheets_utils.normalize_series_unique(series, func))
+
+
+def test_serial_below_threshold_matches_unique():
+    series = pd.Series((VOCABULARY + BLANKS) * 2, dtype=object)
+    results, errors = sheets_utils.normalize_series_batch(
+        {"text": (series, sheets_utils.normalize_text_advanced)}, min_rows=len(series) + 1
+    )
+    assert errors == {}
+    pd.testing.assert_series_equal(
+        results["text"], sheets_utils.normalize_series_unique(series, sheets_utils.normalize_text_advanced)
+    )
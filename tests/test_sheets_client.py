@@ -0,0 +1,102 @@
+import json
+
+import gspread
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+import sheets_client
+
+BASE = "https://sheets.googleapis.com/v4/spreadsheets/abc"
+APPEND = BASE + "/values/MasterData!A1:append"
+STRUCTURAL = BASE + ":batchUpdate"
+VALUES_UPDATE = BASE + "/values:batchUpdate"
+VALUES_GET = BASE + "/values/MasterData!A1:Z10"
+
+
+def api_error(status_code: int, error: dict | None = None) -> APIError:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({"error": error or {"code": status_code, "message": "x"}}).encode()
+    return APIError(response)
+
+
+def ok_response() -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    return response
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(sheets_client.time, "sleep", lambda seconds: None)
+    return sheets_client.QuotaAwareHTTPClient(auth=None, session=requests.Session())
+
+
+def fail_then_ok(monkeypatch, failure: Exception, failures: int = 1) -> list:
+    """Request pertama gagal dengan `failure`, berikutnya sukses. Return daftar panggilan."""
+    calls = []
+
+    def fake_request(self, method, endpoint, *args, **kwargs):
+        calls.append((method, endpoint))
+        if len(calls) <= failures:
+            raise failure
+        return ok_response()
+
+    monkeypatch.setattr(gspread.HTTPClient, "request", fake_request)
+    return calls
+
+
+@pytest.mark.parametrize("method, endpoint, idempotent", [
+    ("get", VALUES_GET, True),
+    ("put", BASE + "/values/MasterData!A1", True),
+    ("post", VALUES_UPDATE, True),
+    ("post", BASE + "/values/LogAktivitas:clear", True),
+    ("post", APPEND, False),
+    ("post", STRUCTURAL, False),
+])
+def test_is_idempotent_request(method, endpoint, idempotent):
+    assert sheets_client.is_idempotent_request(method, endpoint) is idempotent
+
+
+@pytest.mark.parametrize("failure", [
+    api_error(503),
+    api_error(408),
+    requests.ReadTimeout(),
+    requests.ConnectionError(),
+])
+@pytest.mark.parametrize("endpoint", [APPEND, STRUCTURAL])
+def test_non_idempotent_write_not_retried_after_possible_execution(client, monkeypatch, failure, endpoint):
+    calls = fail_then_ok(monkeypatch, failure)
+    with pytest.raises(type(failure)):
+        client.request("post", endpoint)
+    assert len(calls) == 1
+    assert client.get_stats()["failures"] == 1
+
+
+@pytest.mark.parametrize("failure", [
+    api_error(429),
+    api_error(403, {"code": 403, "message": "quota", "errors": [{"domain": "usageLimits"}]}),
+    requests.ConnectTimeout(),
+])
+@pytest.mark.parametrize("endpoint", [APPEND, STRUCTURAL])
+def test_non_idempotent_write_retried_when_rejected_before_execution(client, monkeypatch, failure, endpoint):
+    calls = fail_then_ok(monkeypatch, failure)
+    assert client.request("post", endpoint).status_code == 200
+    assert len(calls) == 2
+    assert client.get_stats()["retries"] == 1
+
+
+@pytest.mark.parametrize("failure", [api_error(503), api_error(429), requests.ReadTimeout(), requests.ConnectionError()])
+@pytest.mark.parametrize("method, endpoint", [("get", VALUES_GET), ("post", VALUES_UPDATE)])
+def test_idempotent_request_retried(client, monkeypatch, failure, method, endpoint):
+    calls = fail_then_ok(monkeypatch, failure, failures=2)
+    assert client.request(method, endpoint).status_code == 200
+    assert len(calls) == 3
+
+
+def test_client_error_not_retried(client, monkeypatch):
+    calls = fail_then_ok(monkeypatch, api_error(400))
+    with pytest.raises(APIError):
+        client.request("get", VALUES_GET)
+    assert len(calls) == 1
@@ -0,0 +1,44 @@
+import os
+import threading
+
+import pandas as pd
+
+import sheets_utils
+
+
+def test_concurrent_snapshot_writers_leave_consistent_pair(snapshot_dir):
+    frames = {
+        f"rev-{writer}": pd.DataFrame({"ID SURVEY": [f"S{writer}-{i}" for i in range(200 + writer)]})
+        for writer in range(8)
+    }
+    start = threading.Barrier(len(frames))
+    results = []
+
+    def save(revision: str, df: pd.DataFrame) -> None:
+        start.wait()
+        for _ in range(5):
+            results.append(sheets_utils.save_master_snapshot(df, revision))
+
+    threads = [threading.Thread(target=save, args=item) for item in frames.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results)
+    assert sorted(os.listdir(snapshot_dir)) == ["master_snapshot.json", "master_snapshot.parquet"]
+    meta = sheets_utils.load_master_snapshot_meta()
+    snapshot_df = pd.read_parquet(sheets_utils.MASTER_SNAPSHOT_FILE)
+    pd.testing.assert_frame_equal(snapshot_df, frames[meta["revision"]])
+    assert meta["rows"] == len(snapshot_df)
+
+
+def test_failed_snapshot_write_keeps_previous_snapshot(snapshot_dir):
+    assert sheets_utils.save_master_snapshot(pd.DataFrame({"ID SURVEY": ["A"]}), "rev-1")
+
+    unserializable = pd.DataFrame({"ID SURVEY": [object()]})
+    assert not sheets_utils.save_master_snapshot(unserializable, "rev-2")
+
+    assert sorted(os.listdir(snapshot_dir)) == ["master_snapshot.json", "master_snapshot.parquet"]
+    assert sheets_utils.load_master_snapshot_meta()["revision"] == "rev-1"
+    assert pd.read_parquet(sheets_utils.MASTER_SNAPSHOT_FILE)["ID SURVEY"].tolist() == ["A"]
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+import sheets_utils
+
+
+def make_master(row_numbers: list[int], numbers: list[str]) -> pd.DataFrame:
+    header = sheets_utils.VALID_COLUMNS
+    rows = []
+    for row_num, no in zip(row_numbers, numbers):
+        row = [f"{col}-{row_num}" for col in header]
+        row[header.index("NO")] = no
+        rows.append(row)
+    return sheets_utils.process_master_values(header, rows, row_numbers)
+
+
+@pytest.mark.parametrize(
+    "row_numbers, numbers, expected",
+    [
+        # Baris sheet 4 dan 6 kosong (dibuang read_master_data): len + 1 = 4 sudah terpakai
+        ([2, 3, 5, 7], ["1", "2", "4", "6"], 7),
+        # NO diedit manual lebih besar dari nomor baris
+        ([2, 3], ["1", "40"], 41),
+        # NO tidak numerik -> nomor baris sheet terakhir - 1
+        ([2, 3, 9], ["A", "", "x"], 9),
+    ],
+)
+def test_next_master_no_skips_numbers_already_used(row_numbers, numbers, expected):
+    master_df = make_master(row_numbers, numbers)
+    assert len(master_df) < expected - 1
+    assert sheets_utils.next_master_no(master_df) == expected
+
+
+def test_next_master_no_empty_master():
+    assert sheets_utils.next_master_no(pd.DataFrame(columns=sheets_utils.VALID_COLUMNS)) == 1
+
+
+def test_sync_plan_start_no_with_blank_rows(monkeypatch):
+    master_df = make_master([2, 3, 5, 7], ["1", "2", "4", "6"])
+    monkeypatch.setattr(sheets_utils, "read_master_data_snapshot", lambda: master_df)
+    monkeypatch.setattr(sheets_utils, "load_master_snapshot_meta", lambda: {})
+    monkeypatch.setattr(sheets_utils, "get_sync_session", sheets_utils.open_sync_session)
+
+    upload = pd.DataFrame([{col: f"{col}-new" for col in sheets_utils.VALID_COLUMNS}])
+    plan = sheets_utils.build_sync_plan(upload)
+
+    assert plan["stats"]["new_rows"] == 1
+    assert plan["start_no"] == 7
+    values = sheets_utils.master_row_values(sheets_utils.VALID_COLUMNS, plan["new_rows"], plan["start_no"])
+    assert [row[sheets_utils.VALID_COLUMNS.index("NO")] for row in values] == [7]
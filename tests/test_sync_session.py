@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+import sheets_utils
+from fake_sheets import FakeSpreadsheet
+
+HEADER = sheets_utils.VALID_COLUMNS
+
+
+def make_row(survey_id: str, no: int, tanggal_har: str = "") -> list[str]:
+    row = [f"{col} {survey_id}" for col in HEADER]
+    row[HEADER.index("NO")] = str(no)
+    row[HEADER.index("ID SURVEY")] = survey_id
+    row[HEADER.index("TANGGAL HAR")] = tanggal_har
+    return row
+
+
+def make_upload(survey_ids: list[str]) -> pd.DataFrame:
+    return pd.DataFrame([make_row(survey_id, 0, "2025-12-31") for survey_id in survey_ids], columns=HEADER)
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch, snapshot_dir):
+    fake = FakeSpreadsheet({
+        sheets_utils.MASTER_SHEET_NAME: [list(HEADER)] + [make_row(f"S{i}", i) for i in range(1, 11)],
+    })
+    monkeypatch.setattr(sheets_utils, "sh", fake)
+    # Log ditulis ke spreadsheet yang sama: revisi ikut naik
+    monkeypatch.setattr(sheets_utils, "simpan_log", lambda *args, **kwargs: setattr(fake, "revision", fake.revision + 1))
+    sheets_utils.get_sync_session_store()["session"] = None
+    # Snapshot awal + sheet meta versi (penulisan pertama membuat sheet meta)
+    sheets_utils.append_or_update_data(make_upload(["N0"]))
+    sheets_utils.read_master_data_snapshot()
+    return fake
+
+
+def snapshot_revision() -> str | None:
+    return sheets_utils.load_master_snapshot_meta().get("revision")
+
+
+def test_clean_upload_seeds_snapshot(spreadsheet):
+    generation = sheets_utils.get_data_store()["generation"]
+    success, _ = sheets_utils.append_or_update_data(make_upload(["N1", "S2"]))
+
+    assert success
+    assert snapshot_revision() == spreadsheet.get_lastUpdateTime()
+    assert sheets_utils.get_data_store()["generation"] == generation + 1
+    assert sheets_utils.get_data_store()["revision"] == snapshot_revision()
+
+
+def test_external_edit_during_streaming_is_not_stamped_into_snapshot(spreadsheet, monkeypatch):
+    master = spreadsheet.worksheet(sheets_utils.MASTER_SHEET_NAME)
+    revision_before = snapshot_revision()
+    iter_upload_chunks = sheets_utils.iter_upload_chunks
+
+    def edit_after_session_open(*args, **kwargs):
+        # Sesi sudah dibuka (snapshot dibaca); edit langsung terjadi sebelum chunk pertama ditulis
+        master.update([["DIEDIT DI SHEET"]], "C5")
+        yield from iter_upload_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(sheets_utils, "iter_upload_chunks", edit_after_session_open)
+    file_bytes = make_upload(["N1", "N2", "S3"]).to_csv(index=False).encode()
+    success, _ = sheets_utils.append_or_update_data_streaming(file_bytes, "upload.csv", chunk_rows=2)
+
+    assert success
+    # Tidak ada snapshot baru dengan revisi setelah penulisan
+    assert snapshot_revision() == revision_before
+    snapshot_df = sheets_utils.read_master_data_snapshot()
+    assert "DIEDIT DI SHEET" in snapshot_df.iloc[:, 2].tolist()
+    pd.testing.assert_frame_equal(
+        snapshot_df.astype(str), sheets_utils.read_master_data().astype(str), check_index_type=False
+    )
+
+
+def test_streaming_chunks_without_external_edit_seed_snapshot(spreadsheet):
+    file_bytes = make_upload(["N1", "N2", "N3", "S4"]).to_csv(index=False).encode()
+    success, _ = sheets_utils.append_or_update_data_streaming(file_bytes, "upload.csv", chunk_rows=2)
+
+    assert success
+    assert snapshot_revision() == spreadsheet.get_lastUpdateTime()
+    seeded = sheets_utils.read_master_data_snapshot()
+    pd.testing.assert_frame_equal(
+        seeded.astype(str), sheets_utils.read_master_data().astype(str), check_index_type=False
+    )
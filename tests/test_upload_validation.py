@@ -0,0 +1,114 @@
+import io
+
+import pandas as pd
+import pytest
+
+import sheets_utils
+from fake_sheets import FakeSpreadsheet
+
+
+def make_sheet(n_rows: int, drop: list[str] = ()) -> pd.DataFrame:
+    columns = [col for col in sheets_utils.VALID_COLUMNS if col not in drop]
+    return pd.DataFrame({col: [f"{col}-{i}" for i in range(n_rows)] for col in columns})
+
+
+def make_xlsx(sheets: dict[str, pd.DataFrame]) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def no_upload_cache(monkeypatch):
+    monkeypatch.setattr(sheets_utils, "load_cached_upload", lambda key: None)
+    monkeypatch.setattr(sheets_utils, "save_cached_upload", lambda key, df: True)
+
+
+@pytest.fixture
+def no_master_read(monkeypatch):
+    def fail():
+        raise AssertionError("master dibaca padahal header tidak valid")
+    monkeypatch.setattr(sheets_utils, "get_sync_session", fail)
+
+
+def test_select_upload_sheets_skips_sheets_without_id_survey():
+    headers = {"TGK": list(sheets_utils.VALID_COLUMNS), "Keterangan": ["CATATAN"]}
+    assert sheets_utils.select_upload_sheets(headers) == ["TGK"]
+
+
+def test_select_upload_sheets_only_requires_id_survey():
+    headers = {"TGK": list(sheets_utils.VALID_COLUMNS), "PSW": ["ID SURVEY", "ULP"]}
+    assert sheets_utils.select_upload_sheets(headers) == ["TGK", "PSW"]
+
+
+def test_select_upload_sheets_requires_id_survey():
+    with pytest.raises(ValueError, match="ID SURVEY"):
+        sheets_utils.select_upload_sheets({"TGK": ["ULP", "UP3"]})
+
+
+@pytest.mark.parametrize("file_name", ["upload.xlsx", "upload.csv"])
+def test_streaming_rejects_same_headers_as_non_streaming(file_name, no_master_read):
+    sheet = make_sheet(3, drop=["ID SURVEY"])
+    if file_name.endswith(".csv"):
+        file_bytes = sheet.to_csv(index=False).encode()
+    else:
+        file_bytes = make_xlsx({"TGK": sheet, "Keterangan": pd.DataFrame({"CATATAN": ["x"]})})
+
+    with pytest.raises(ValueError, match="Kolom 'ID SURVEY' tidak ditemukan!"):
+        sheets_utils.load_upload_frame(file_bytes, file_name)
+    success, msg = sheets_utils.append_or_update_data_streaming(file_bytes, file_name, chunk_rows=2)
+    assert not success
+    assert "Kolom 'ID SURVEY' tidak ditemukan!" in msg
+
+
+def upload_to_fake_sheet(monkeypatch, upload) -> list[list[str]]:
+    master_grid = [list(sheets_utils.VALID_COLUMNS)] + make_sheet(2).astype(str).values.tolist()
+    fake = FakeSpreadsheet({sheets_utils.MASTER_SHEET_NAME: master_grid})
+    monkeypatch.setattr(sheets_utils, "sh", fake)
+    sheets_utils.get_sync_session_store()["session"] = None
+    success, msg = upload()
+    assert success, msg
+    grid = fake.worksheet(sheets_utils.MASTER_SHEET_NAME).get_all_values()
+    # Streaming menulis per chunk sehingga versi baris (_ROW_VERSION) berbeda; isi data harus sama
+    version_col = grid[0].index(sheets_utils.ROW_VERSION_COLUMN)
+    return [row[:version_col] + row[version_col + 1:] for row in grid]
+
+
+def test_streaming_writes_same_rows_as_non_streaming(monkeypatch, snapshot_dir):
+    monkeypatch.setattr(sheets_utils, "simpan_log", lambda *args, **kwargs: None)
+    psw = make_sheet(4, drop=["UP3", "FOTO HAR"])
+    psw["ID SURVEY"] = [f"PSW-{i}" for i in range(len(psw))]
+    file_bytes = make_xlsx({
+        "TGK": make_sheet(3),
+        "PSW": psw,
+        "Keterangan": pd.DataFrame({"CATATAN": ["bukan data"]}),
+    })
+
+    streamed = upload_to_fake_sheet(
+        monkeypatch,
+        lambda: sheets_utils.append_or_update_data_streaming(file_bytes, "upload.xlsx", chunk_rows=2),
+    )
+    planned = upload_to_fake_sheet(
+        monkeypatch,
+        lambda: sheets_utils.append_or_update_data(sheets_utils.load_upload_frame(file_bytes, "upload.xlsx")[0]),
+    )
+
+    assert streamed == planned
+    header = streamed[0]
+    psw_rows = [row for row in streamed if row[header.index("ID SURVEY")].startswith("PSW-")]
+    assert len(psw_rows) == 4
+    assert {row[header.index("UP3")] for row in psw_rows} == {""}
+
+
+def test_read_upload_headers_normalizes_column_names():
+    sheet = make_sheet(1).rename(columns={"ID SURVEY": " id survey​"})
+    xlsx = make_xlsx({"TGK": sheet, "Kosong": pd.DataFrame()})
+    csv = sheet.to_csv(index=False).encode("utf-8-sig")
+
+    for file_bytes, file_name in [(xlsx, "upload.xlsx"), (csv, "upload.csv")]:
+        headers = sheets_utils.read_upload_headers(file_bytes, file_name)
+        assert headers[next(iter(headers))] == sheets_utils.VALID_COLUMNS
+        chunk_columns = [list(chunk.columns) for _, chunk in sheets_utils.iter_upload_chunks(file_bytes, file_name)]
+        assert chunk_columns == [sheets_utils.VALID_COLUMNS]